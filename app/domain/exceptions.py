@@ -8,6 +8,20 @@ class InvalidPromptException(AIClientException):
     """Exception for invalid prompt inputs."""
     pass
 
+class AIProviderException(AIClientException):
+    """Exception for a failed provider call, carrying what a retry decision needs."""
+    def __init__(
+        self,
+        message: str,
+        status_code: int = None,
+        retry_after: float = None,
+        retryable: bool = False
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.retryable = retryable
+
 class ValidationException(Exception):
     """Base exception for validation errors."""
     pass
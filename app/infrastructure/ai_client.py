@@ -2,15 +2,24 @@
 Modified ai_client.py to include Gemini API integration.
 """
 import os
+import json
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, AsyncIterator
 from dotenv import load_dotenv
 from abacusai import ApiClient
-import requests
-
-from app.infrastructure.interfaces import AIClientInterface, AIResponse
+from abacusai.client import ApiException
+import httpx
+
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, Validator
+from app.infrastructure.http_transport import post_json, provider_error, stream_sse
+from app.infrastructure.sdk_executor import SDKExecutor, get_abacus_executor
+from app.infrastructure.ai_resilience import RetryingAIClient, RetryPolicy, is_retryable_status
+from app.infrastructure.rate_limiter import RateLimitedAIClient, get_rate_limiter
+from app.infrastructure.response_cache import CachingAIClient
+from app.utils.config import ABACUS_EXECUTOR_CONFIG, AI_RESPONSE_CACHE_CONFIG
 from app.utils.logger import get_logger
-from app.domain.exceptions import AIClientException
+from app.domain.exceptions import AIClientException, AIProviderException
 
 # Use a type alias for better readability
 JSONType = Dict[str, Any]
@@ -18,6 +27,27 @@ JSONType = Dict[str, Any]
 logger = get_logger(__name__)
 load_dotenv()
 
+async def _stream_chat_completion(
+    url: str,
+    headers: Dict[str, str],
+    payload: JSONType,
+    http_client: Optional[httpx.AsyncClient],
+    provider: str
+) -> AsyncIterator[str]:
+    """Yield the content deltas of an OpenAI-compatible chat completion stream."""
+    try:
+        async for chunk in stream_sse(url, headers, {**payload, "stream": True}, http_client):
+            for choice in chunk.get("choices") or []:
+                text = (choice.get("delta") or {}).get("content")
+                if text:
+                    yield text
+    except httpx.HTTPError as e:
+        logger.error(f"{provider} API error: {e}")
+        raise provider_error(e, provider)
+    except json.JSONDecodeError as e:
+        logger.error(f"{provider} API stream event not valid JSON: {e}")
+        raise AIClientException(f"{provider} API stream event was not valid JSON: {str(e)}")
+
 
 
 class AbacusAIClient(AIClientInterface):
@@ -31,6 +61,8 @@ class AbacusAIClient(AIClientInterface):
         model_name: str = "claude-3-sonnet",
         max_tokens: int = 1000,
         temperature: float = 0.7,
+        executor: Optional[SDKExecutor] = None,
+        timeout: Optional[float] = ABACUS_EXECUTOR_CONFIG['timeout'],
         **kwargs: Any,  # Add kwargs for compatibility
     ):
         self._api_key = api_key or os.getenv("ABACUS_API_KEY")
@@ -40,31 +72,46 @@ class AbacusAIClient(AIClientInterface):
         self._model_name = model_name if model_name is not None else self.DEFAULT_MODEL_NAME  # Use default if None
         self._max_tokens = max_tokens
         self._temperature = temperature
-
-        try:
-            self._sdk_client = ApiClient(api_key=self._api_key)
-            logger.info("Successfully initialized Abacus.AI SDK client")
-        except Exception as e:
-            logger.error(f"Failed to initialize Abacus.AI SDK client: {str(e)}")
-            raise AIClientException(f"SDK initialization failed: {str(e)}")
+        # The SDK is synchronous; calls run on this pool, each worker with its own ApiClient,
+        # built (and authenticated) on the worker's first call.
+        self._executor = executor or get_abacus_executor()
+        self._timeout = timeout
 
     async def send_prompt(self, prompt: str) -> AIResponse:
         """Send a prompt using the Abacus.AI SDK."""
         try:
             logger.debug(f"Sending prompt to Abacus.AI (model: {self._model_name})")
 
-            # Call evaluatePrompt using the SDK
-            response = self._sdk_client.evaluate_prompt(
-                prompt=prompt,
-                llm_name=self._model_name,
-                max_tokens=self._max_tokens,
-                temperature=self._temperature
+            model_name, max_tokens, temperature = self._model_name, self._max_tokens, self._temperature
+
+            def evaluate() -> Dict:
+                sdk_client = self._executor.thread_client(self._api_key, lambda: ApiClient(api_key=self._api_key))
+                # Call evaluatePrompt using the SDK
+                response = sdk_client.evaluate_prompt(
+                    prompt=prompt,
+                    llm_name=model_name,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+                # Convert response to dictionary off the event loop as well
+                return response.to_dict()
+
+            response_dict, timing = await self._executor.run(evaluate, self._timeout)
+            ai_response = self._process_response(response_dict)
+            ai_response.metadata["queue_wait"] = timing.queue_wait
+            ai_response.metadata["call_time"] = timing.call_time
+            return ai_response
+
+        except asyncio.TimeoutError:
+            logger.error(f"Abacus.AI call timed out after {self._timeout}s")
+            raise AIProviderException(f"Abacus.AI request timed out after {self._timeout}s", retryable=True)
+        except ApiException as e:
+            logger.error(f"AI client error: {str(e)}")
+            raise AIProviderException(
+                f"Failed to send prompt: {str(e)}",
+                status_code=e.http_status,
+                retryable=is_retryable_status(e.http_status)
             )
-
-            # Convert response to dictionary and process
-            response_dict = response.to_dict()
-            return self._process_response(response_dict)
-
         except Exception as e:
             logger.error(f"AI client error: {str(e)}")
             raise AIClientException(f"Failed to send prompt: {str(e)}")
@@ -134,6 +181,7 @@ class GeminiAIClient(AIClientInterface):
         model_name: str = "gemini-2.0-flash",  # Use gemini-2.0-flash
         max_tokens: int = 2048,  #  set a default value
         temperature: float = 0.7,
+        http_client: Optional[httpx.AsyncClient] = None,
         **kwargs: Any,
     ):
         """
@@ -144,6 +192,7 @@ class GeminiAIClient(AIClientInterface):
             model_name: The name of the Gemini model to use.
             max_tokens: Maximum number of tokens in the generated text.
             temperature: Sampling temperature for the model.
+            http_client: AsyncClient to send requests with; defaults to the shared pooled client.
         """
         self._api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self._api_key:
@@ -154,23 +203,13 @@ class GeminiAIClient(AIClientInterface):
         self._max_tokens = max_tokens
         self._temperature = temperature
         self._base_url = "https://generativelanguage.googleapis.com/v1beta/models/{}:generateContent".format(self._model_name) # Use dynamic url
+        self._http_client = http_client
 
         logger.info(f"Successfully initialized Gemini API client with model: {self._model_name}")
 
 
-    async def send_prompt(self, prompt: str) -> AIResponse:
-        """
-        Sends a prompt to the Gemini API and retrieves the response.
-
-        Args:
-            prompt: The prompt to send to the API.
-
-        Returns:
-            An AIResponse object containing the generated text.
-
-        Raises:
-            AIClientException: If there is an error communicating with the API.
-        """
+    def _request(self, prompt: str) -> Tuple[Dict[str, str], JSONType]:
+        """Headers and JSON payload of a Gemini completion request."""
         headers = {
             "Content-Type": "application/json",
             "x-goog-api-key": self._api_key,
@@ -208,18 +247,32 @@ class GeminiAIClient(AIClientInterface):
                 "temperature": self._temperature
             },
         }
+        return headers, payload
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        """
+        Sends a prompt to the Gemini API and retrieves the response.
+
+        Args:
+            prompt: The prompt to send to the API.
+
+        Returns:
+            An AIResponse object containing the generated text.
+
+        Raises:
+            AIClientException: If there is an error communicating with the API.
+        """
+        headers, payload = self._request(prompt)
 
         logger.debug(f"Sending prompt to Gemini API: {self._base_url}")
         try:
-            response = requests.post(self._base_url, headers=headers, json=payload)
-            response.raise_for_status()  # Raise for bad status codes
-            data = response.json()
+            data = await post_json(self._base_url, headers, payload, self._http_client)
             #logger.debug(f"Received response from Gemini API: {data}")
             return self._process_response(data)
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Gemini API error: {e}")
-            raise AIClientException(f"Gemini API request failed: {e}.  Check your API endpoint and parameters.  Error Details: {e}.  Response Content: {response.text if hasattr(response, 'text') else 'No response text available.  Status Code: {response.status_code}'}. URL: {response.request.url}")
+            raise provider_error(e, "Gemini")
         except json.JSONDecodeError as e:
             logger.error(f"Gemini API error: {e}")
             raise AIClientException(f"Gemini API response was not valid JSON: {e}")
@@ -227,6 +280,24 @@ class GeminiAIClient(AIClientInterface):
             logger.error(f"Unexpected error: {e}")
             raise AIClientException(f"An unexpected error occurred: {e}")
 
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the completion over server-sent events (streamGenerateContent), yielding text."""
+        headers, payload = self._request(prompt)
+        url = self._base_url.replace(":generateContent", ":streamGenerateContent") + "?alt=sse"
+        logger.debug(f"Streaming prompt to Gemini API: {url}")
+        try:
+            async for chunk in stream_sse(url, headers, payload, self._http_client):
+                for candidate in chunk.get("candidates") or []:
+                    for part in (candidate.get("content") or {}).get("parts") or []:
+                        if part.get("text"):
+                            yield part["text"]
+        except httpx.HTTPError as e:
+            logger.error(f"Gemini API error: {e}")
+            raise provider_error(e, "Gemini")
+        except json.JSONDecodeError as e:
+            logger.error(f"Gemini API stream event not valid JSON: {e}")
+            raise AIClientException(f"Gemini API stream event was not valid JSON: {e}")
+
     def _process_response(self, response: Dict) -> AIResponse:
         """
         Processes the response from the Gemini API into the AIResponse format.
@@ -310,6 +381,7 @@ class GrokAIClient(AIClientInterface):
         model_name: str = "grok-3-mini-beta",
         max_tokens: int = 1000,
         temperature: float = 0.7,
+        http_client: Optional[httpx.AsyncClient] = None,
         **kwargs: Any,
     ):
         """
@@ -320,6 +392,7 @@ class GrokAIClient(AIClientInterface):
             model_name: The name of the Grok model to use.
             max_tokens: Maximum number of tokens in the generated text.
             temperature: Sampling temperature for the model.
+            http_client: AsyncClient to send requests with; defaults to the shared pooled client.
         """
         self._api_key = api_key or os.getenv("GROK_API_KEY")
         if not self._api_key:
@@ -330,22 +403,12 @@ class GrokAIClient(AIClientInterface):
         self._max_tokens = max_tokens
         self._temperature = temperature
         self._base_url = "https://api.x.ai/v1/chat/completions"
+        self._http_client = http_client
 
         logger.info(f"Successfully initialized Grok API client with model: {self._model_name}")
 
-    async def send_prompt(self, prompt: str) -> AIResponse:
-        """
-        Sends a prompt to the xAI Grok API and retrieves the response.
-
-        Args:
-            prompt: The prompt to send to the API.
-
-        Returns:
-            An AIResponse object containing the generated text.
-
-        Raises:
-            AIClientException: If there is an error communicating with the API.
-        """
+    def _request(self, prompt: str) -> Tuple[Dict[str, str], JSONType]:
+        """Headers and JSON payload of a Grok completion request."""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self._api_key}",
@@ -366,18 +429,32 @@ class GrokAIClient(AIClientInterface):
             "temperature": self._temperature,
             "max_tokens": self._max_tokens,
         }
+        return headers, payload
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        """
+        Sends a prompt to the xAI Grok API and retrieves the response.
+
+        Args:
+            prompt: The prompt to send to the API.
+
+        Returns:
+            An AIResponse object containing the generated text.
+
+        Raises:
+            AIClientException: If there is an error communicating with the API.
+        """
+        headers, payload = self._request(prompt)
 
         logger.debug(f"Sending prompt to Grok API: {self._base_url}")
         try:
-            response = requests.post(self._base_url, headers=headers, json=payload)
-            response.raise_for_status()  # Raise for bad status codes
-            data = response.json()
+            data = await post_json(self._base_url, headers, payload, self._http_client)
             #logger.debug(f"Received response from Grok API: {data}")
             return self._process_response(data)
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Grok API error: {e}")
-            raise AIClientException(f"Grok API request failed: {str(e)}. Response: {response.text if 'response' in locals() else 'No response'}")
+            raise provider_error(e, "Grok")
         except json.JSONDecodeError as e:
             logger.error(f"Grok API response not valid JSON: {e}")
             raise AIClientException(f"Grok API response was not valid JSON: {str(e)}")
@@ -385,6 +462,13 @@ class GrokAIClient(AIClientInterface):
             logger.error(f"Unexpected error: {e}")
             raise AIClientException(f"An unexpected error occurred: {str(e)}")
 
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the completion over server-sent events, yielding content deltas."""
+        headers, payload = self._request(prompt)
+        logger.debug(f"Streaming prompt to Grok API: {self._base_url}")
+        async for text in _stream_chat_completion(self._base_url, headers, payload, self._http_client, "Grok"):
+            yield text
+
     def _process_response(self, response: Dict) -> AIResponse:
         """
         Processes the response from the Grok API into the AIResponse format.
@@ -483,6 +567,7 @@ You should:
         model_name: str = "gpt-4-turbo-preview",
         max_tokens: int = 4096,
         temperature: float = 0.7,
+        http_client: Optional[httpx.AsyncClient] = None,
         **kwargs: Any,
     ):
         """
@@ -493,6 +578,7 @@ You should:
             model_name: The name of the OpenAI model to use.
             max_tokens: Maximum number of tokens in the generated text.
             temperature: Sampling temperature for the model.
+            http_client: AsyncClient to send requests with; defaults to the shared pooled client.
         """
         self._api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self._api_key:
@@ -503,22 +589,12 @@ You should:
         self._max_tokens = max_tokens
         self._temperature = temperature
         self._base_url = "https://api.openai.com/v1/chat/completions"
+        self._http_client = http_client
 
         logger.info(f"Successfully initialized OpenAI client with model: {self._model_name}")
 
-    async def send_prompt(self, prompt: str) -> AIResponse:
-        """
-        Sends a prompt to the OpenAI API and retrieves the response.
-
-        Args:
-            prompt: The prompt to send to the API.
-
-        Returns:
-            An AIResponse object containing the generated text.
-
-        Raises:
-            AIClientException: If there is an error communicating with the API.
-        """
+    def _request(self, prompt: str) -> Tuple[Dict[str, str], JSONType]:
+        """Headers and JSON payload of a OpenAI completion request."""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self._api_key}",
@@ -538,18 +614,32 @@ You should:
             "temperature": self._temperature,
             "max_tokens": self._max_tokens,
         }
+        return headers, payload
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        """
+        Sends a prompt to the OpenAI API and retrieves the response.
+
+        Args:
+            prompt: The prompt to send to the API.
+
+        Returns:
+            An AIResponse object containing the generated text.
+
+        Raises:
+            AIClientException: If there is an error communicating with the API.
+        """
+        headers, payload = self._request(prompt)
 
         logger.debug(f"Sending prompt to OpenAI API: {self._base_url}")
         try:
-            response = requests.post(self._base_url, headers=headers, json=payload)
-            response.raise_for_status()
-            data = response.json()
+            data = await post_json(self._base_url, headers, payload, self._http_client)
             #logger.debug(f"Received response from OpenAI API: {data}")
             return self._process_response(data)
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"OpenAI API error: {e}")
-            raise AIClientException(f"OpenAI API request failed: {str(e)}. Response: {response.text if 'response' in locals() else 'No response'}")
+            raise provider_error(e, "OpenAI")
         except json.JSONDecodeError as e:
             logger.error(f"OpenAI API response not valid JSON: {e}")
             raise AIClientException(f"OpenAI API response was not valid JSON: {str(e)}")
@@ -557,6 +647,13 @@ You should:
             logger.error(f"Unexpected error: {e}")
             raise AIClientException(f"An unexpected error occurred: {str(e)}")
 
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the completion over server-sent events, yielding content deltas."""
+        headers, payload = self._request(prompt)
+        logger.debug(f"Streaming prompt to OpenAI API: {self._base_url}")
+        async for text in _stream_chat_completion(self._base_url, headers, payload, self._http_client, "OpenAI"):
+            yield text
+
     def _process_response(self, response: Dict) -> AIResponse:
         """
         Processes the response from the OpenAI API into the AIResponse format.
@@ -639,9 +736,22 @@ def create_ai_client(
     model_name: Optional[str] = None,
     max_tokens: int = 10000,
     temperature: float = 0.7,
+    retry_policy: Optional[RetryPolicy] = None,
+    retry: bool = True,
+    rate_limit: bool = True,
+    cache: bool = True,
+    validator: Optional[Validator] = None,
     **kwargs: Any
 ) -> AIClientInterface:
-    """Factory function to create AI clients."""
+    """Factory function to create AI clients.
+
+    Clients go through the process-wide rate limiter of their provider model unless
+    `rate_limit` is False, and are wrapped in a RetryingAIClient unless `retry` is
+    False; every retry attempt is rate limited. Unless `cache` is False or
+    AI_RESPONSE_CACHE_MODE is 'off', repeated prompts are answered from the
+    response cache before any of that; with a `validator`, only answers it accepts
+    are cached.
+    """
     clients = {
         "abacus": AbacusAIClient,
         "gemini": GeminiAIClient,
@@ -652,10 +762,17 @@ def create_ai_client(
     if client_type not in clients:
         raise ValueError(f"Unsupported AI client type: {client_type}")
 
-    return clients[client_type](
+    client = clients[client_type](
         api_key=api_key,
         model_name=model_name,
         max_tokens=max_tokens,
         temperature=temperature,
         **kwargs
     )
+    if rate_limit:
+        client = RateLimitedAIClient(client, get_rate_limiter(client_type, client.model_name))
+    if retry:
+        client = RetryingAIClient(client, retry_policy)
+    if cache and AI_RESPONSE_CACHE_CONFIG['mode'] != 'off':
+        client = CachingAIClient(client, client_type, validator=validator)
+    return client
@@ -0,0 +1,314 @@
+# app/infrastructure/ai_failover.py
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple, Callable, AsyncIterator
+import threading
+import time
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.ai_resilience import is_retryable
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient, Validator
+from app.utils.config import AI_FAILOVER_CONFIG, AI_RESPONSE_CACHE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Statuses that say the provider, not the prompt, is unusable (bad key, no access, unknown model).
+_PROVIDER_FAULT_STATUSES = (401, 403, 404)
+
+# Weight of the newest call in the latency average.
+_LATENCY_ALPHA = 0.2
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Errors that count against a provider's circuit and move the call to the next provider.
+
+    Anything else (an invalid prompt, a 400) would fail with every provider and is raised.
+    """
+    if is_retryable(error):
+        return True
+    return isinstance(error, AIProviderException) and error.status_code in _PROVIDER_FAULT_STATUSES
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit of one provider.
+
+    Responsibilities:
+    - Open after `consecutive_failures` failures in a row, or once `failure_rate` of
+      the last `window` calls failed (from `min_calls` calls on); calls slower than
+      `slow_call_seconds` count as failures.
+    - Refuse calls while open; after `open_seconds`, let a single probe call through
+      (half-open), which closes the circuit on success and reopens it on failure.
+    - Keep an exponentially weighted latency average for the health endpoint.
+    """
+    def __init__(
+        self,
+        name: str,
+        consecutive_failures: int = AI_FAILOVER_CONFIG['consecutive_failures'],
+        failure_rate: float = AI_FAILOVER_CONFIG['failure_rate'],
+        window: int = AI_FAILOVER_CONFIG['window'],
+        min_calls: int = AI_FAILOVER_CONFIG['min_calls'],
+        slow_call_seconds: float = AI_FAILOVER_CONFIG['slow_call_seconds'],
+        open_seconds: float = AI_FAILOVER_CONFIG['open_seconds'],
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.consecutive_failures = consecutive_failures
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._failures_in_row = 0
+        self.latency: Optional[float] = None
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now; a True must be followed by record() or cancel()."""
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                logger.info(f"{self.name}: circuit half-open, sending a probe call")
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success: bool, latency: float) -> None:
+        """Outcome of an allowed call."""
+        failed = not success or latency > self.slow_call_seconds
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.latency = latency if self.latency is None else (
+                _LATENCY_ALPHA * latency + (1 - _LATENCY_ALPHA) * self.latency
+            )
+            if self._state == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._failures_in_row = 0
+                    logger.info(f"{self.name}: probe succeeded, circuit closed")
+                return
+            self._outcomes.append(failed)
+            self._failures_in_row = self._failures_in_row + 1 if failed else 0
+            if self._state == CLOSED and self._should_open():
+                self._open()
+
+    def cancel(self) -> None:
+        """An allowed call ended without an outcome (cancelled, or not the provider's fault)."""
+        with self._lock:
+            self._probing = False
+
+    def _should_open(self) -> bool:
+        if self._failures_in_row >= self.consecutive_failures:
+            return True
+        calls = len(self._outcomes)
+        return calls >= self.min_calls and sum(self._outcomes) / calls >= self.failure_rate
+
+    def _open(self) -> None:
+        """Caller holds the lock."""
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self.times_opened += 1
+        logger.warning(f"{self.name}: circuit opened for {self.open_seconds:.0f}s")
+
+    def to_dict(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                'state': state,
+                'failure_rate': sum(self._outcomes) / calls if calls else 0.0,
+                'consecutive_failures': self._failures_in_row,
+                'latency': round(self.latency, 3) if self.latency is not None else None,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+                'retry_in': (
+                    round(max(0.0, self.open_seconds - (self._clock() - self._opened_at)), 1)
+                    if state == OPEN else None
+                ),
+            }
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Process-wide circuit breaker of a provider, configured from AI_FAILOVER_CONFIG."""
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {provider: breaker.to_dict() for provider, breaker in breakers.items()}
+
+class FailoverAIClient(DelegatingAIClient):
+    """Sends prompts to the first provider, in order, whose circuit is not open.
+
+    Responsibilities:
+    - Skip providers whose CircuitBreaker refuses the call, and move on to the next
+      provider when a call fails with a provider failure (see is_provider_failure).
+    - Record every call's outcome and latency on its provider's circuit breaker.
+    - Raise the last provider failure when no provider answered, or an
+      AIProviderException at once when every circuit is open.
+    - Fail a stream over only while it has yielded nothing.
+    """
+    def __init__(
+        self,
+        clients: List[Tuple[str, AIClientInterface]],
+        breakers: Optional[Dict[str, CircuitBreaker]] = None
+    ):
+        if not clients:
+            raise ValueError("FailoverAIClient needs at least one client")
+        super().__init__(clients[0][1])
+        self.clients = clients
+        self.breakers = {
+            provider: (breakers or {}).get(provider) or get_circuit_breaker(provider)
+            for provider, _ in clients
+        }
+
+    def _candidates(self, prompt: str) -> List[Tuple[str, AIClientInterface]]:
+        """Providers to try for `prompt`, in order."""
+        return self.clients
+
+    def _observe(self, provider: str, prompt: str, success: bool, latency: float) -> None:
+        """Called with the outcome of each call a provider made; for subclasses."""
+
+    def _available(self, clients: List[Tuple[str, AIClientInterface]]):
+        """Yield (provider, client, breaker) for each provider allowed a call right now."""
+        for provider, client in clients:
+            breaker = self.breakers[provider]
+            if breaker.allow():
+                yield provider, client, breaker
+            else:
+                logger.debug(f"Skipping {provider}: circuit open")
+
+    def _no_provider(self, last_error: Optional[BaseException]) -> BaseException:
+        if last_error is not None:
+            return last_error
+        providers = ', '.join(provider for provider, _ in self.clients)
+        return AIProviderException(f"No AI provider available: circuits open for {providers}")
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        last_error = None
+        for provider, client, breaker in self._available(self._candidates(prompt)):
+            started = time.perf_counter()
+            try:
+                response = await client.send_prompt(prompt)
+            except Exception as e:
+                if not is_provider_failure(e):
+                    breaker.cancel()
+                    raise
+                self._record(provider, breaker, prompt, False, time.perf_counter() - started)
+                logger.warning(f"{provider} failed ({e}), failing over")
+                last_error = e
+                continue
+            except BaseException:
+                breaker.cancel()
+                raise
+            self._record(provider, breaker, prompt, True, time.perf_counter() - started)
+            if response.metadata is None:
+                response.metadata = {}
+            response.metadata['provider'] = provider
+            return response
+        raise self._no_provider(last_error)
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        last_error = None
+        for provider, client, breaker in self._available(self._candidates(prompt)):
+            started = time.perf_counter()
+            yielded = False
+            recorded = False
+            try:
+                async for text in client.stream_prompt(prompt):
+                    yielded = True
+                    yield text
+                self._record(provider, breaker, prompt, True, time.perf_counter() - started)
+                recorded = True
+                return
+            except Exception as e:
+                if not is_provider_failure(e):
+                    raise
+                self._record(provider, breaker, prompt, False, time.perf_counter() - started)
+                recorded = True
+                if yielded:
+                    raise
+                logger.warning(f"{provider} stream failed ({e}), failing over")
+                last_error = e
+            finally:
+                if not recorded:
+                    breaker.cancel()
+        raise self._no_provider(last_error)
+
+    def _record(self, provider: str, breaker: CircuitBreaker, prompt: str, success: bool, latency: float) -> None:
+        breaker.record(success, latency)
+        self._observe(provider, prompt, success, latency)
+
+def failover_providers(primary: str, providers: Optional[List[str]] = None) -> List[str]:
+    """`primary` followed by the other configured failover providers, in order."""
+    providers = AI_FAILOVER_CONFIG['providers'] if providers is None else providers
+    return [primary] + [provider for provider in providers if provider != primary]
+
+def create_failover_ai_client(
+    providers: List[str],
+    model_name: Optional[str] = None,
+    retry: bool = True,
+    cache: bool = True,
+    validator: Optional[Validator] = None,
+    **kwargs: Any
+) -> AIClientInterface:
+    """Fail over between create_ai_client clients of `providers`, in order.
+
+    `model_name` is that of the first provider's client, since model names differ
+    between providers; the others use their default model. `kwargs` (max_tokens,
+    temperature, ...) apply to every client. Providers that cannot be created
+    (e.g. no API key) are left out.
+
+    Provider clients do not retry, so a failing call moves on to the next provider
+    at once and counts as one failure on its circuit; retries, and the response
+    cache, wrap the failover client instead; `validator` decides which answers are cached.
+    """
+    from app.infrastructure.ai_client import create_ai_client
+    from app.infrastructure.ai_resilience import RetryingAIClient
+    from app.infrastructure.response_cache import CachingAIClient
+    clients = [(
+        providers[0],
+        create_ai_client(providers[0], model_name=model_name, retry=False, cache=False, **kwargs)
+    )]
+    for provider in providers[1:]:
+        try:
+            clients.append((provider, create_ai_client(provider, retry=False, cache=False, **kwargs)))
+        except ValueError as e:
+            logger.warning(f"Leaving {provider} out of failover: {e}")
+    client = FailoverAIClient(clients)
+    if retry:
+        client = RetryingAIClient(client)
+    if cache and AI_RESPONSE_CACHE_CONFIG['mode'] != 'off':
+        return CachingAIClient(client, '|'.join(provider for provider, _ in clients), validator=validator)
+    return client
@@ -1,6 +1,7 @@
 # app/infrastructure/ai_generators.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator, Callable, Awaitable
+from contextlib import aclosing
 from dataclasses import dataclass
 import json
 import os
@@ -8,7 +9,9 @@ from app.domain.exceptions import AIClientException
 from abc import ABC, abstractmethod
 
 from app.infrastructure.ai_client import AIClientInterface
+from app.infrastructure.snapshot_encoder import JSONSnapshotEncoder
 from app.domain.exceptions import StepGenerationException
+from app.utils.config import AI_HEDGING_CONFIG, AI_GENERATOR_CLIENT_CONFIG
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -111,6 +114,10 @@ class NLToGherkinGenerator(GeneratorInterface):
             instruction = instruction[3:-3].strip()
         return instruction
     
+    async def is_valid_answer(self, content: str) -> bool:
+        """Whether a raw AI answer would be accepted by generate_steps."""
+        return await self.validate_response(self._clean_steps(content))
+
     async def validate_response(self, response: str) -> bool:
         """Validate that the response is a properly formatted JSON array."""
         try:
@@ -138,6 +145,69 @@ class NLToGherkinGenerator(GeneratorInterface):
             logger.error(f"Validation error: {str(e)}")
             return False
 
+class InstructionStreamParser:
+    """Incremental parser for the Playwright generator's JSON answer.
+
+    Fed the response text chunk by chunk, it returns each string of the top-level
+    "high_precision" and "low_precision" arrays as soon as its closing quote arrives,
+    without waiting for the rest of the document. Text before the first '{' (such as
+    a code fence) and after the object ends is ignored.
+    """
+    LISTS = ('high_precision', 'low_precision')
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._done = False
+        self._in_string = False
+        self._escaped = False
+        self._string: List[str] = []
+        self._expect_key = False
+        self._key: Optional[str] = None
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        """Consume a chunk; return the (list name, instruction) pairs it completed."""
+        completed = []
+        for char in text:
+            if self._done:
+                break
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._end_string(completed)
+                    continue
+                self._string.append(char)
+            elif not self._stack:
+                if char == '{':
+                    self._stack.append('{')
+                    self._expect_key = True
+            elif char == '"':
+                self._in_string = True
+                self._string = []
+            elif char in '{[':
+                self._stack.append(char)
+            elif char in '}]':
+                self._stack.pop()
+                self._done = not self._stack
+            elif len(self._stack) == 1 and char == ':':
+                self._expect_key = False
+            elif len(self._stack) == 1 and char == ',':
+                self._expect_key = True
+        return completed
+
+    def _end_string(self, completed: List[Tuple[str, str]]) -> None:
+        try:
+            value = json.loads('"' + ''.join(self._string) + '"')
+        except json.JSONDecodeError:
+            return
+        if len(self._stack) == 1 and self._expect_key:
+            self._key = value
+        elif self._stack == ['{', '['] and self._key in self.LISTS:
+            completed.append((self._key, value))
+
 class PlaywrightGenerator(GeneratorInterface):
     """Generates Playwright instructions from Gherkin steps and HTML snapshots."""
 
@@ -145,12 +215,14 @@ class PlaywrightGenerator(GeneratorInterface):
         self.ai_client = ai_client
         self.prompt_template = load_prompt("gherkin_to_playwright.txt")
 
-    async def generate_instruction(self, snapshot: str, gherkin_step: str) -> str:
-        """Generate a Playwright instruction from a snapshot and Gherkin step."""
+    async def generate_instruction(self, snapshot: str, gherkin_step: str, snapshot_format: Optional[str] = None) -> str:
+        """Generate a Playwright instruction from a snapshot and Gherkin step.
+
+        snapshot_format describes how the snapshot was encoded (see snapshot_encoder);
+        pretty-printed JSON is assumed when omitted.
+        """
         try:
-            # Prepare the prompt
-            prompt = self.prompt_template.replace("{web_page_snapshot}", snapshot)
-            prompt = prompt.replace("{gherkin_step}", gherkin_step)
+            prompt = self._build_prompt(snapshot, gherkin_step, snapshot_format)
             #logger.debug(f"Prompt PlaywrightGenerator: {prompt}")
 
             # Get response from AI
@@ -174,6 +246,50 @@ class PlaywrightGenerator(GeneratorInterface):
         except Exception as e:
             raise StepGenerationException(f"Playwright instruction generation failed: {str(e)}")
 
+    async def stream_instructions(
+        self,
+        snapshot: str,
+        gherkin_step: str,
+        snapshot_format: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """Yield ("high_precision" | "low_precision", instruction) pairs while the answer streams.
+
+        Each instruction is yielded as soon as it is complete, so the caller can run the
+        first one while the rest is still being generated. Once the stream ends, the whole
+        answer is validated; an invalid answer raises only if it yielded no instruction,
+        since the caller may already have acted on what it got.
+        """
+        prompt = self._build_prompt(snapshot, gherkin_step, snapshot_format)
+        parser = InstructionStreamParser()
+        chunks = []
+        yielded = 0
+        try:
+            async with aclosing(self.ai_client.stream_prompt(prompt)) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    for instruction in parser.feed(chunk):
+                        yielded += 1
+                        yield instruction
+        except AIClientException as e:
+            logger.error(f"AI client error during instruction streaming: {e}")
+            raise StepGenerationException(f"AI client error: {str(e)}") from e
+
+        if not await self.validate_response(self._clean_instruction(''.join(chunks))):
+            if not yielded:
+                raise StepGenerationException("Invalid Playwright instruction format")
+            logger.warning(f"Streamed Playwright answer is not valid JSON after {yielded} instructions")
+
+    def _build_prompt(self, snapshot: str, gherkin_step: str, snapshot_format: Optional[str]) -> str:
+        prompt = self.prompt_template.replace(
+            "{snapshot_format}", snapshot_format or JSONSnapshotEncoder.description
+        )
+        prompt = prompt.replace("{web_page_snapshot}", snapshot)
+        return prompt.replace("{gherkin_step}", gherkin_step)
+
+    async def is_valid_answer(self, content: str) -> bool:
+        """Whether a raw AI answer would be accepted by generate_instruction."""
+        return await self.validate_response(self._clean_instruction(content))
+
     async def validate_response(self, response: str) -> bool:
         """Validate that the response is a valid Playwright selector JSON."""
         try:
@@ -223,18 +339,72 @@ class PlaywrightGenerator(GeneratorInterface):
             instruction = instruction[3:-3].strip()
         return instruction
 
+def _create_generator_client(
+    generator: str,
+    ai_client_type: str,
+    validator: Callable[[str], Awaitable[bool]]
+) -> AIClientInterface:
+    """AI client for a generator, configured from AI_GENERATOR_CLIENT_CONFIG[generator].
+
+    In order of precedence: with AI_ROUTING_ALLOWLIST set, each prompt is routed to
+    the allowed route expected to answer fastest (the routes name their models); with
+    AI_FAILOVER_PROVIDERS set, it fails over between those providers; otherwise it is
+    hedged with the AI_HEDGE_BACKUP_CLIENT provider when one is set. Prompts above the
+    generator's escalation threshold go to its escalation client instead. Only answers
+    `validator` accepts are stored in the response cache.
+    """
+    from app.infrastructure.ai_client import create_ai_client
+    from app.infrastructure.ai_failover import create_failover_ai_client, failover_providers
+    from app.infrastructure.ai_hedging import create_hedged_ai_client
+    from app.infrastructure.ai_routing import (
+        EscalatingAIClient, create_routing_ai_client, parse_route, routing_routes
+    )
+    settings = AI_GENERATOR_CLIENT_CONFIG[generator]
+    ai_client_type = settings['client'] or ai_client_type
+    model_name = settings['model']
+    kwargs = {'max_tokens': settings['max_tokens'], 'temperature': settings['temperature']}
+
+    routes = routing_routes(ai_client_type)
+    providers = failover_providers(ai_client_type)
+    backup_type = AI_HEDGING_CONFIG['backup_client']
+    if len(routes) > 1:
+        client = create_routing_ai_client(routes, validator=validator, **kwargs)
+    elif len(providers) > 1:
+        client = create_failover_ai_client(providers, model_name=model_name, validator=validator, **kwargs)
+    elif backup_type and backup_type != ai_client_type:
+        client = create_hedged_ai_client(
+            ai_client_type, backup_type, validator=validator, model_name=model_name, **kwargs
+        )
+    else:
+        client = create_ai_client(ai_client_type, model_name=model_name, validator=validator, **kwargs)
+
+    if settings['escalation_client'] and settings['escalate_above_tokens']:
+        provider, model = parse_route(settings['escalation_client'])
+        client = EscalatingAIClient(
+            client,
+            create_ai_client(provider, model_name=model, validator=validator, **kwargs),
+            settings['escalate_above_tokens']
+        )
+    return client
+
 def create_nl_to_gherkin_generator(
     ai_client_type: str = "abacus"
 ) -> NLToGherkinGenerator:
     """Factory function to create NL to Gherkin generator."""
-    from app.infrastructure.ai_client import create_ai_client
-    ai_client = create_ai_client(ai_client_type)
-    return NLToGherkinGenerator(ai_client)
+    generator = NLToGherkinGenerator(
+        _create_generator_client(
+            'nl_to_gherkin', ai_client_type, lambda content: generator.is_valid_answer(content)
+        )
+    )
+    return generator
 
 def create_playwright_generator(
     ai_client_type: str = "abacus"
 ) -> PlaywrightGenerator:
     """Factory function to create Playwright generator."""
-    from app.infrastructure.ai_client import create_ai_client
-    ai_client = create_ai_client(ai_client_type)
-    return PlaywrightGenerator(ai_client)
\ No newline at end of file
+    generator = PlaywrightGenerator(
+        _create_generator_client(
+            'playwright', ai_client_type, lambda content: generator.is_valid_answer(content)
+        )
+    )
+    return generator
\ No newline at end of file
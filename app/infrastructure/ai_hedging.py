@@ -0,0 +1,282 @@
+# app/infrastructure/ai_hedging.py
+from collections import deque
+from typing import Dict, Any, Optional, AsyncIterator
+import asyncio
+import math
+import threading
+import time
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient, Validator
+from app.utils.config import AI_HEDGING_CONFIG, AI_RESPONSE_CACHE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class HedgeStats:
+    """Recent primary latencies and hedge outcomes, shared by the hedged clients of one name."""
+    def __init__(self, window: int = AI_HEDGING_CONFIG['window']):
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedged = 0
+        self.backup_wins = 0
+        self.failures = 0
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def add_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile of the recent latencies, or None without samples."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(fraction * len(samples)) - 1))]
+
+    def record(self, hedged: bool, winner: Optional[str]) -> None:
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.backup_wins += winner == 'backup'
+            self.failures += winner is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        percentile = self.percentile(AI_HEDGING_CONFIG['percentile'])
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedged': self.hedged,
+                'backup_wins': self.backup_wins,
+                'failures': self.failures,
+                'hedge_rate': self.hedged / self.requests if self.requests else 0.0,
+                'hedge_win_rate': self.backup_wins / self.hedged if self.hedged else 0.0,
+                'primary_latency_percentile': round(percentile, 3) if percentile is not None else None,
+            }
+
+_hedge_stats: Dict[str, HedgeStats] = {}
+_hedge_stats_lock = threading.Lock()
+
+def get_hedge_stats(name: str) -> HedgeStats:
+    """Process-wide HedgeStats of a primary->backup pair."""
+    with _hedge_stats_lock:
+        if name not in _hedge_stats:
+            _hedge_stats[name] = HedgeStats()
+        return _hedge_stats[name]
+
+def hedging_stats() -> Dict[str, Dict[str, Any]]:
+    with _hedge_stats_lock:
+        stats = dict(_hedge_stats)
+    return {name: entry.to_dict() for name, entry in stats.items()}
+
+async def _first_chunk(stream: AsyncIterator[str]) -> str:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        raise AIProviderException("Stream ended without content")
+
+class HedgedAIClient(DelegatingAIClient):
+    """Sends a backup request to a second client when the primary is slow.
+
+    Responsibilities:
+    - Send each prompt to the primary; once it has taken longer than the configured
+      percentile of its recent latencies, or as soon as it fails, send it to the backup.
+    - Return the first response that passes the validator and cancel the other call.
+      When neither does, return the primary's response (or raise its error), so the
+      caller reports the failure as without hedging.
+    - Hedge streams on the time to their first chunk, then commit to the first stream
+      that yields; streamed answers are left to the consumer to validate.
+    - Count how often the backup was sent and how often it won (see HedgeStats); only
+      successful primary calls count as latencies, so fast failures do not make
+      hedging fire early.
+    """
+    def __init__(
+        self,
+        primary: AIClientInterface,
+        backup: AIClientInterface,
+        validator: Optional[Validator] = None,
+        name: str = 'hedged',
+        percentile: float = AI_HEDGING_CONFIG['percentile'],
+        min_delay: float = AI_HEDGING_CONFIG['min_delay'],
+        initial_delay: float = AI_HEDGING_CONFIG['initial_delay'],
+        min_samples: int = AI_HEDGING_CONFIG['min_samples'],
+        stats: Optional[HedgeStats] = None
+    ):
+        super().__init__(primary)
+        self.primary = primary
+        self.backup = backup
+        self.validator = validator
+        self.name = name
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        # Shared by name, so latencies and outcomes outlive the runner that built this client.
+        self.hedge_stats = stats or get_hedge_stats(name)
+        # Times to first chunk are far shorter than whole-answer latencies, so kept apart.
+        self.stream_stats = get_hedge_stats(f"{name} (stream)") if stats is None else HedgeStats()
+
+    def hedge_delay(self, stats: Optional[HedgeStats] = None) -> float:
+        """Seconds to give the primary before the backup is sent."""
+        stats = stats or self.hedge_stats
+        if stats.samples < self.min_samples:
+            return self.initial_delay
+        return max(self.min_delay, stats.percentile(self.percentile))
+
+    async def _is_valid(self, response: AIResponse) -> bool:
+        if self.validator is None:
+            return True
+        try:
+            return await self.validator(response.content)
+        except Exception as e:
+            logger.debug(f"Validator rejected response: {e}")
+            return False
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        delay = self.hedge_delay()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self.primary.send_prompt(prompt))
+        tasks = {primary: 'primary'}
+        outcomes: Dict[str, Any] = {}
+        winner = None
+        try:
+            pending = set(tasks)
+            timeout = delay
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    label = tasks[task]
+                    if label == 'primary' and task.exception() is None:
+                        self.hedge_stats.add_latency(time.perf_counter() - started)
+                    if task.exception() is not None:
+                        outcomes[label] = task.exception()
+                        logger.warning(f"{self.name}: {label} call failed: {task.exception()}")
+                    elif await self._is_valid(task.result()):
+                        winner = label
+                        break
+                    else:
+                        outcomes[label] = task.result()
+                        logger.warning(f"{self.name}: {label} response failed validation")
+                if winner is None and len(tasks) == 1:
+                    # Primary too slow, failed or invalid: send the backup.
+                    backup = asyncio.ensure_future(self.backup.send_prompt(prompt))
+                    tasks[backup] = 'backup'
+                    pending.add(backup)
+                    timeout = None
+                    logger.info(f"{self.name}: sent backup request after {time.perf_counter() - started:.2f}s")
+        finally:
+            for task, label in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    if label == 'primary':
+                        # Lower bound of the primary's latency; leaving it out would bias the percentile down.
+                        self.hedge_stats.add_latency(time.perf_counter() - started)
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.hedge_stats.record(hedged=len(tasks) > 1, winner=winner)
+        if winner is None:
+            result = outcomes.get('primary', outcomes.get('backup'))
+            if isinstance(result, BaseException):
+                raise result
+            return result
+        response = next(task for task, label in tasks.items() if label == winner).result()
+        if response.metadata is None:
+            response.metadata = {}
+        response.metadata['hedge'] = {
+            'hedged': len(tasks) > 1,
+            'winner': winner,
+            'delay': round(delay, 3),
+        }
+        return response
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        delay = self.hedge_delay(self.stream_stats)
+        started = time.perf_counter()
+        streams = {'primary': self.primary.stream_prompt(prompt)}
+        tasks = {asyncio.ensure_future(_first_chunk(streams['primary'])): 'primary'}
+        errors: Dict[str, BaseException] = {}
+        winner = None
+        first = None
+        try:
+            pending = set(tasks)
+            timeout = delay
+            while winner is None and (pending or 'backup' not in streams):
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    label = tasks[task]
+                    if task.exception() is not None:
+                        errors[label] = task.exception()
+                        logger.warning(f"{self.name}: {label} stream failed: {task.exception()}")
+                        continue
+                    if label == 'primary':
+                        self.stream_stats.add_latency(time.perf_counter() - started)
+                    winner, first = label, task.result()
+                    break
+                if winner is None and 'backup' not in streams:
+                    # No first chunk from the primary in time, or it failed: stream the backup too.
+                    streams['backup'] = self.backup.stream_prompt(prompt)
+                    backup = asyncio.ensure_future(_first_chunk(streams['backup']))
+                    tasks[backup] = 'backup'
+                    pending.add(backup)
+                    timeout = None
+                    logger.info(f"{self.name}: sent backup stream after {time.perf_counter() - started:.2f}s")
+        finally:
+            for task, label in tasks.items():
+                if not task.done():
+                    task.cancel()
+                    if label == 'primary':
+                        self.stream_stats.add_latency(time.perf_counter() - started)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for label, stream in streams.items():
+                if label != winner:
+                    await stream.aclose()
+
+        self.stream_stats.record(hedged=len(tasks) > 1, winner=winner)
+        if winner is None:
+            raise errors.get('primary', errors.get('backup'))
+        stream = streams[winner]
+        try:
+            yield first
+            async for text in stream:
+                yield text
+        finally:
+            await stream.aclose()
+
+def create_hedged_ai_client(
+    primary_type: str,
+    backup_type: str = AI_HEDGING_CONFIG['backup_client'],
+    backup_model: Optional[str] = AI_HEDGING_CONFIG['backup_model'],
+    validator: Optional[Validator] = None,
+    model_name: Optional[str] = None,
+    retry: bool = True,
+    cache: bool = True,
+    **kwargs: Any
+) -> AIClientInterface:
+    """Hedge a create_ai_client client of `primary_type` with one of `backup_type`.
+
+    `model_name` is the primary's model; `kwargs` (max_tokens, temperature, ...)
+    apply to both clients. Retries and the response cache, when enabled, wrap the
+    hedged pair rather than each client: a failing primary is hedged at once instead
+    of after its retries, and cache hits neither trigger backups nor count as
+    primary latencies. `validator` both picks the winning answer and decides which
+    answers are cached.
+    """
+    from app.infrastructure.ai_client import create_ai_client
+    from app.infrastructure.ai_resilience import RetryingAIClient
+    from app.infrastructure.response_cache import CachingAIClient
+    name = f"{primary_type}->{backup_type}"
+    client = HedgedAIClient(
+        create_ai_client(primary_type, model_name=model_name, retry=False, cache=False, **kwargs),
+        create_ai_client(backup_type, model_name=backup_model, retry=False, cache=False, **kwargs),
+        validator=validator,
+        name=name
+    )
+    if retry:
+        client = RetryingAIClient(client)
+    if cache and AI_RESPONSE_CACHE_CONFIG['mode'] != 'off':
+        return CachingAIClient(client, name, validator=validator)
+    return client
@@ -0,0 +1,154 @@
+# app/infrastructure/ai_resilience.py
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional, Callable, Awaitable, AsyncIterator
+import asyncio
+import random
+import time
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient
+from app.utils.config import AI_RETRY_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (now if now is not None else time.time()))
+
+def is_retryable_status(status_code: Optional[int]) -> bool:
+    return status_code in AI_RETRY_CONFIG['retryable_statuses']
+
+def is_retryable(error: BaseException) -> bool:
+    """Throttling, overload, server errors and timeouts are retried; everything else is fatal."""
+    if isinstance(error, AIProviderException):
+        return error.retryable
+    return isinstance(error, asyncio.TimeoutError)
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = AI_RETRY_CONFIG['max_attempts']
+    base_delay: float = AI_RETRY_CONFIG['base_delay']
+    max_delay: float = AI_RETRY_CONFIG['max_delay']
+    multiplier: float = AI_RETRY_CONFIG['multiplier']
+    max_retry_after: float = AI_RETRY_CONFIG['max_retry_after']
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter exponential backoff for the n-th retry (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** retry))
+
+class RetryBudget:
+    """Retries shared by every prompt of one operator case."""
+    def __init__(self, max_retries: int = AI_RETRY_CONFIG['case_budget']):
+        self.max_retries = max_retries
+        self.used = 0
+
+    def try_consume(self) -> bool:
+        if self.used >= self.max_retries:
+            return False
+        self.used += 1
+        return True
+
+    @property
+    def remaining(self) -> int:
+        return self.max_retries - self.used
+
+_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar('retry_budget', default=None)
+
+def set_retry_budget(budget: RetryBudget) -> Token:
+    """Make `budget` the retry budget for AI calls in the current task."""
+    return _retry_budget.set(budget)
+
+def reset_retry_budget(token: Token) -> None:
+    _retry_budget.reset(token)
+
+def get_retry_budget() -> Optional[RetryBudget]:
+    return _retry_budget.get()
+
+class RetryingAIClient(DelegatingAIClient):
+    """Retries an AI client's retryable failures with backoff.
+
+    Responsibilities:
+    - Retry errors classified as retryable, up to the policy's attempts and the
+      case's retry budget (when one is set); fatal errors are raised at once.
+    - Wait max(Retry-After, jittered exponential backoff); a Retry-After longer than
+      max_retry_after is not waited for.
+    - Record the attempts made in the response metadata.
+    - Retry a stream only while it has yielded nothing; a failure after the first
+      chunk is raised, since the consumer may already have acted on it.
+    """
+    def __init__(
+        self,
+        client: AIClientInterface,
+        policy: Optional[RetryPolicy] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        super().__init__(client)
+        self.client = client
+        self.policy = policy or RetryPolicy()
+        self._sleep = sleep
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        retry = 0
+        while True:
+            try:
+                response = await self.client.send_prompt(prompt)
+            except Exception as e:
+                delay = self._retry_delay(e, retry)
+                if delay is None:
+                    raise
+                logger.warning(
+                    f"AI call failed ({e}); retry {retry + 1}/{self.policy.max_attempts - 1} in {delay:.2f}s"
+                )
+                await self._sleep(delay)
+                retry += 1
+                continue
+            if response.metadata is None:
+                response.metadata = {}
+            response.metadata['attempts'] = retry + 1
+            return response
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        retry = 0
+        while True:
+            started = False
+            try:
+                async for text in self.client.stream_prompt(prompt):
+                    started = True
+                    yield text
+                return
+            except Exception as e:
+                delay = None if started else self._retry_delay(e, retry)
+                if delay is None:
+                    raise
+                logger.warning(
+                    f"AI stream failed ({e}); retry {retry + 1}/{self.policy.max_attempts - 1} in {delay:.2f}s"
+                )
+                await self._sleep(delay)
+                retry += 1
+
+    def _retry_delay(self, error: Exception, retry: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if not is_retryable(error) or retry + 1 >= self.policy.max_attempts:
+            return None
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None and retry_after > self.policy.max_retry_after:
+            logger.warning(f"Retry-After of {retry_after:.0f}s exceeds the limit, not retrying")
+            return None
+        budget = get_retry_budget()
+        if budget is not None and not budget.try_consume():
+            logger.warning("Retry budget of the case is exhausted, not retrying")
+            return None
+        return max(retry_after or 0.0, self.policy.backoff(retry))
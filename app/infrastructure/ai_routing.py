@@ -0,0 +1,232 @@
+# app/infrastructure/ai_routing.py
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+import random
+import threading
+from app.infrastructure.ai_failover import FailoverAIClient
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient, Validator
+from app.infrastructure.rate_limiter import estimate_tokens
+from app.utils.config import AI_ROUTING_CONFIG, AI_RESPONSE_CACHE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def prompt_size_bucket(prompt: str, boundaries: Optional[List[int]] = None) -> str:
+    """Label of the prompt-size bucket `prompt` falls in, e.g. '<4000' tokens."""
+    boundaries = AI_ROUTING_CONFIG['bucket_tokens'] if boundaries is None else boundaries
+    tokens = estimate_tokens(prompt)
+    for boundary in boundaries:
+        if tokens < boundary:
+            return f"<{boundary}"
+    return f">={boundaries[-1]}" if boundaries else "all"
+
+class RouteStats:
+    """Exponentially weighted latency and success rate of one route in one bucket."""
+    def __init__(self, alpha: float = AI_ROUTING_CONFIG['alpha']):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.success = 1.0
+        self.samples = 0
+
+    def record(self, success: bool, latency: float) -> None:
+        self.samples += 1
+        self.success = self.alpha * success + (1 - self.alpha) * self.success
+        # Failures often return fast; only answers say how long an answer takes.
+        if success:
+            self.latency = latency if self.latency is None else (
+                self.alpha * latency + (1 - self.alpha) * self.latency
+            )
+
+    def expected_latency(self, min_success: float = AI_ROUTING_CONFIG['min_success']) -> Optional[float]:
+        """Expected seconds to an answer: the average latency over the success rate."""
+        if self.latency is None:
+            return None
+        return self.latency / max(self.success, min_success)
+
+    def to_dict(self) -> Dict[str, Any]:
+        expected = self.expected_latency()
+        return {
+            'latency': round(self.latency, 3) if self.latency is not None else None,
+            'success_rate': round(self.success, 3),
+            'expected_latency': round(expected, 3) if expected is not None else None,
+            'samples': self.samples,
+        }
+
+class LatencyRouter:
+    """Ranks routes (provider/model) by their expected latency for a prompt size.
+
+    Responsibilities:
+    - Keep RouteStats per route and prompt-size bucket.
+    - Rank routes with fewer than `min_samples` calls in the bucket first (in the
+      given order), then by expected latency; with probability `explore_rate`, move
+      a random other route to the front so averages of unused routes stay current.
+    """
+    def __init__(
+        self,
+        min_samples: int = AI_ROUTING_CONFIG['min_samples'],
+        explore_rate: float = AI_ROUTING_CONFIG['explore_rate'],
+        rng: Optional[random.Random] = None
+    ):
+        self.min_samples = min_samples
+        self.explore_rate = explore_rate
+        self._rng = rng or random.Random()
+        self._stats: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def rank(self, routes: List[str], bucket: str) -> List[Tuple[str, Optional[float]]]:
+        """(route, expected latency) pairs, best first; None marks routes still being sampled."""
+        with self._lock:
+            entries = []
+            for index, route in enumerate(routes):
+                stats = self._stats.get((route, bucket))
+                expected = stats.expected_latency() if stats and stats.samples >= self.min_samples else None
+                entries.append((expected is not None, expected or 0.0, index, route))
+            explore = len(routes) > 1 and self._rng.random() < self.explore_rate
+            explored = self._rng.randrange(1, len(routes)) if explore else 0
+        ranked = [(route, expected if sampled else None) for sampled, expected, _, route in sorted(entries)]
+        if explored:
+            ranked.insert(0, ranked.pop(explored))
+        return ranked
+
+    def record(self, route: str, bucket: str, success: bool, latency: float) -> None:
+        with self._lock:
+            key = (route, bucket)
+            if key not in self._stats:
+                self._stats[key] = RouteStats()
+            self._stats[key].record(success, latency)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stats = dict(self._stats)
+        result: Dict[str, Dict[str, Any]] = {}
+        for (route, bucket), entry in sorted(stats.items()):
+            result.setdefault(route, {})[bucket] = entry.to_dict()
+        return result
+
+_shared_router: Optional[LatencyRouter] = None
+_shared_router_lock = threading.Lock()
+
+def get_latency_router() -> LatencyRouter:
+    """Process-wide latency router, so statistics outlive the clients that feed them."""
+    global _shared_router
+    with _shared_router_lock:
+        if _shared_router is None:
+            _shared_router = LatencyRouter()
+        return _shared_router
+
+def routing_stats() -> Dict[str, Dict[str, Any]]:
+    with _shared_router_lock:
+        router = _shared_router
+    return router.stats() if router is not None else {}
+
+class RoutingAIClient(FailoverAIClient):
+    """Sends each prompt to the route expected to answer it fastest.
+
+    Responsibilities:
+    - Order the routes by the LatencyRouter's ranking for the prompt's size bucket,
+      and log each decision with the expected latencies it was based on.
+    - Feed every call's outcome and latency back to the router.
+    - Otherwise behave as a FailoverAIClient over the ranked routes: routes with an
+      open circuit are skipped and provider failures move on to the next route.
+    """
+    def __init__(
+        self,
+        clients: List[Tuple[str, AIClientInterface]],
+        router: Optional[LatencyRouter] = None,
+        **kwargs: Any
+    ):
+        super().__init__(clients, **kwargs)
+        self.router = router or get_latency_router()
+
+    def _candidates(self, prompt: str) -> List[Tuple[str, AIClientInterface]]:
+        bucket = prompt_size_bucket(prompt)
+        ranked = self.router.rank([route for route, _ in self.clients], bucket)
+        logger.info(
+            f"Routing {bucket}-token prompt to {ranked[0][0]}; expected latencies: "
+            + ', '.join(f"{route}={'unsampled' if expected is None else f'{expected:.2f}s'}"
+                        for route, expected in ranked)
+        )
+        clients = dict(self.clients)
+        return [(route, clients[route]) for route, _ in ranked]
+
+    def _observe(self, provider: str, prompt: str, success: bool, latency: float) -> None:
+        self.router.record(provider, prompt_size_bucket(prompt), success, latency)
+
+class EscalatingAIClient(DelegatingAIClient):
+    """Sends large prompts to a larger model.
+
+    Responsibilities:
+    - Send prompts of up to `threshold_tokens` estimated tokens to the default
+      client and larger ones, whose snapshots are hard to locate elements in, to
+      the escalation client.
+    - Mark escalated responses with metadata['escalated'] = True.
+    """
+    def __init__(self, client: AIClientInterface, escalation: AIClientInterface, threshold_tokens: int):
+        super().__init__(client)
+        self.client = client
+        self.escalation = escalation
+        self.threshold_tokens = threshold_tokens
+
+    def _choose(self, prompt: str) -> AIClientInterface:
+        tokens = estimate_tokens(prompt)
+        if tokens <= self.threshold_tokens:
+            return self.client
+        logger.info(
+            f"Escalating {tokens}-token prompt to {getattr(self.escalation, 'model_name', 'the escalation model')}"
+        )
+        return self.escalation
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        client = self._choose(prompt)
+        response = await client.send_prompt(prompt)
+        if client is self.escalation:
+            if response.metadata is None:
+                response.metadata = {}
+            response.metadata['escalated'] = True
+        return response
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        async for text in self._choose(prompt).stream_prompt(prompt):
+            yield text
+
+def parse_route(route: str) -> Tuple[str, Optional[str]]:
+    """'provider/model' (or 'provider') to (provider, model or None)."""
+    provider, _, model = route.partition('/')
+    return provider.strip(), model.strip() or None
+
+def routing_routes(primary: str, allowlist: Optional[List[str]] = None) -> List[str]:
+    """Allowed routes with those of `primary` first, so they are sampled first."""
+    allowlist = AI_ROUTING_CONFIG['allowlist'] if allowlist is None else allowlist
+    return sorted(allowlist, key=lambda route: parse_route(route)[0] != primary)
+
+def create_routing_ai_client(
+    routes: List[str],
+    retry: bool = True,
+    cache: bool = True,
+    validator: Optional[Validator] = None,
+    **kwargs: Any
+) -> AIClientInterface:
+    """Route between create_ai_client clients of `routes` ('provider' or 'provider/model').
+
+    `kwargs` (max_tokens, temperature, ...) apply to every route. Routes that cannot
+    be created (e.g. no API key) are left out. As with failover, route clients do not
+    retry; retries and the response cache wrap the router, and `validator` decides
+    which answers are cached.
+    """
+    from app.infrastructure.ai_client import create_ai_client
+    from app.infrastructure.ai_resilience import RetryingAIClient
+    from app.infrastructure.response_cache import CachingAIClient
+    clients = []
+    for route in routes:
+        provider, model = parse_route(route)
+        try:
+            client = create_ai_client(provider, model_name=model, retry=False, cache=False, **kwargs)
+        except ValueError as e:
+            logger.warning(f"Leaving {route} out of routing: {e}")
+            continue
+        clients.append((f"{provider}/{client.model_name}", client))
+    client = RoutingAIClient(clients)
+    if retry:
+        client = RetryingAIClient(client)
+    if cache and AI_RESPONSE_CACHE_CONFIG['mode'] != 'off':
+        return CachingAIClient(client, '|'.join(route for route, _ in clients), validator=validator)
+    return client
@@ -0,0 +1,114 @@
+# app/infrastructure/browser_dom_summarizer.py
+from pathlib import Path
+from typing import Dict, Optional, Any
+from app.utils.config import HTML_SUMMARIZER_CONFIG
+from app.infrastructure.interfaces import HTMLSummarizerInterface, PageSummarizerInterface
+from app.infrastructure.html_summarizer import HTMLSummarizer
+from app.domain.exceptions import SnapshotParsingException
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SCRIPT_PATH = Path(__file__).parent / "scripts" / "dom_summarizer.js"
+
+def load_script(path: Path = SCRIPT_PATH) -> str:
+    """Load the in-page DOM walker."""
+    try:
+        return path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        raise ValueError(f"DOM summarizer script not found: {path}")
+
+class BrowserDOMSummarizer(HTMLSummarizerInterface, PageSummarizerInterface):
+    """Summarizes the live DOM inside Chromium with page.evaluate.
+
+    Responsibilities:
+    - Run dom_summarizer.js in the page with the HTML_SUMMARIZER_CONFIG role mapping.
+    - Decide visibility from computed styles and bounding boxes rather than inline styles.
+    - Return only the compact role/name/children JSON over the driver pipe.
+
+    Unlike HTMLSummarizer, script/style/template contents and the inside of inline SVG,
+    canvas and iframes are never walked, since the browser does not render them as DOM text.
+    summarize_html() is still available for offline HTML (e.g. stored snapshots) and
+    delegates to a BeautifulSoup-based summarizer.
+
+    With incremental=True the script keeps a MutationObserver and a per-element cache in
+    the page, so only mutated subtrees are walked again. If nothing changed since the last
+    call the page answers 'unchanged' and the previous summary is returned without
+    transferring it again. Style changes that reach an element without touching it or its
+    ancestors (e.g. sibling selectors) are only picked up on the next mutation of that
+    element or on a forced refresh.
+    """
+    def __init__(self, config: Dict = HTML_SUMMARIZER_CONFIG, fallback: Optional[HTMLSummarizerInterface] = None,
+                 incremental: bool = False):
+        """Initialize with configuration.
+
+        Args:
+            config: Configuration dict with role_map, input_type_map, and visible_attributes.
+            fallback: Summarizer used by summarize_html for serialized HTML.
+            incremental: Reuse in-page results for subtrees that did not mutate.
+        """
+        self.config = {
+            'role_map': config['role_map'],
+            'input_type_map': config['input_type_map'],
+            'visible_attributes': config['visible_attributes'],
+        }
+        self.script = load_script()
+        self.fallback = fallback or HTMLSummarizer(config=config)
+        self.incremental = incremental
+        self.last_stats: Dict[str, Any] = {}
+        self._last_summary: Optional[Dict[str, Any]] = None
+        self._last_session: Optional[str] = None
+
+    async def summarize_page(self, browser_manager: Any, force: bool = False) -> Dict[str, Any]:
+        """Summarize the browser manager's current page in the browser.
+
+        Args:
+            browser_manager: Manager exposing evaluate_script().
+            force: Discard the in-page cache and walk the whole DOM (incremental mode only).
+        """
+        if not self.incremental:
+            summary = await browser_manager.evaluate_script(self.script, {'config': self.config, 'incremental': False})
+            if not isinstance(summary, dict):
+                raise SnapshotParsingException(f"Unexpected in-page summary: {type(summary).__name__}")
+            logger.debug(f"In-page summary received with {len(summary.get('children', []))} top-level nodes")
+            return summary
+
+        result = await self._evaluate(browser_manager, force)
+        if result.get('status') == 'unchanged':
+            if self._last_summary is not None and result.get('session') == self._last_session:
+                self.last_stats = {'status': 'unchanged', 'version': result.get('version'), 'visited': 0, 'reused': 0}
+                logger.debug(f"In-page DOM unchanged at version {result.get('version')}, reusing summary")
+                return self._last_summary
+            # The page kept its cache but this summarizer has nothing to reuse.
+            result = await self._evaluate(browser_manager, True)
+
+        summary = result.get('summary')
+        if not isinstance(summary, dict):
+            raise SnapshotParsingException(f"Unexpected in-page summary: {type(summary).__name__}")
+        stats = result.get('stats') or {}
+        self.last_stats = {
+            'status': result.get('status'),
+            'version': result.get('version'),
+            'visited': stats.get('visited', 0),
+            'reused': stats.get('reused', 0),
+        }
+        self._last_summary = summary
+        self._last_session = result.get('session')
+        logger.debug(
+            f"In-page {self.last_stats['status']} summary: {self.last_stats['visited']} elements walked, "
+            f"{self.last_stats['reused']} subtrees reused"
+        )
+        return summary
+
+    async def _evaluate(self, browser_manager: Any, force: bool) -> Dict[str, Any]:
+        """Run the script in incremental mode and check the shape of its answer."""
+        result = await browser_manager.evaluate_script(
+            self.script, {'config': self.config, 'incremental': True, 'force': force}
+        )
+        if not isinstance(result, dict) or 'status' not in result:
+            raise SnapshotParsingException(f"Unexpected in-page summary: {type(result).__name__}")
+        return result
+
+    def summarize_html(self, html_content: str) -> Dict[str, Any]:
+        """Summarize serialized HTML with the fallback summarizer."""
+        return self.fallback.summarize_html(html_content)
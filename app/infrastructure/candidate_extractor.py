@@ -0,0 +1,219 @@
+# app/infrastructure/candidate_extractor.py
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+import math
+import re
+from app.infrastructure.ai_generators import GherkinStep
+from app.infrastructure.snapshot_pruner import OMITTED_ROLE
+from app.utils.config import CANDIDATE_EXTRACTOR_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Path = Tuple[int, ...]
+
+_TOKEN_PATTERN = re.compile(r'[A-Za-z][a-z]*|[A-Z]+(?![a-z])|\d+')
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens, also breaking camelCase, kebab-case and snake_case."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text or ''):
+        token = token.lower()
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+@dataclass
+class Candidate:
+    """A snapshot node matching a step, with its position in the tree."""
+    path: Path
+    score: float
+    role: str
+    name: str
+
+@dataclass
+class CandidateSelection:
+    """Reduced snapshot holding the best candidates and their ancestors."""
+    snapshot: Dict[str, Any]
+    candidates: List[Candidate] = field(default_factory=list)
+    total_nodes: int = 0
+    kept_nodes: int = 0
+    fallback: bool = False
+
+class CandidateIndex:
+    """Lexical BM25 index over the nodes of a summarized snapshot.
+
+    Each node is indexed by its name and by the identifying attributes listed in
+    CANDIDATE_EXTRACTOR_CONFIG['field_weights'] (id, data-testid, placeholder, aria-*, class),
+    with a per-field weight applied to term frequencies.
+    """
+    def __init__(self, snapshot: Dict[str, Any], config: Dict = CANDIDATE_EXTRACTOR_CONFIG):
+        self.field_weights = config['field_weights']
+        self.k1 = config['k1']
+        self.b = config['b']
+        self.entries: List[Tuple[Path, Dict[str, Any], Counter, float]] = []
+        self.document_frequency: Counter = Counter()
+        for path, node in self._walk(snapshot, ()):
+            terms = self._terms(node)
+            if not terms:
+                continue
+            self.entries.append((path, node, terms, sum(terms.values())))
+            self.document_frequency.update(terms.keys())
+        self.average_length = (
+            sum(entry[3] for entry in self.entries) / len(self.entries) if self.entries else 0.0
+        )
+
+    @staticmethod
+    def _walk(node: Dict[str, Any], path: Path) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+        yield path, node
+        for index, child in enumerate(node.get('children', [])):
+            yield from CandidateIndex._walk(child, path + (index,))
+
+    def _terms(self, node: Dict[str, Any]) -> Counter:
+        terms: Counter = Counter()
+        attributes = node.get('attributes', {})
+        for field_name, weight in self.field_weights.items():
+            value = node.get('name') if field_name == 'name' else attributes.get(field_name)
+            if isinstance(value, str):
+                for token in tokenize(value):
+                    terms[token] += weight
+        return terms
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, query: List[str], limit: int) -> List[Tuple[float, Path, Dict[str, Any]]]:
+        """Return up to `limit` (score, path, node) matches, best first."""
+        if not self.entries or not query:
+            return []
+        total = len(self.entries)
+        idf = {
+            term: math.log(1 + (total - self.document_frequency[term] + 0.5) / (self.document_frequency[term] + 0.5))
+            for term in set(query) if self.document_frequency[term]
+        }
+        if not idf:
+            return []
+        scored = []
+        for path, node, terms, length in self.entries:
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+            for term, weight in idf.items():
+                frequency = terms.get(term)
+                if frequency:
+                    score += weight * frequency * (self.k1 + 1) / (frequency + norm)
+            if score > 0:
+                scored.append((score, path, node))
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return scored[:limit]
+
+class CandidateExtractor:
+    """Selects the parts of a snapshot that are relevant to a Gherkin step.
+
+    Responsibilities:
+    - Index the summarizer output with CandidateIndex.
+    - Rank nodes against the step target (and the value, for verify steps), boosting
+      roles that fit the action and exact phrase matches on the node name.
+    - Rebuild a snapshot containing the top-k candidate subtrees and their ancestors,
+      with skipped siblings replaced by {"role": "omitted", "count": N} markers so the
+      structure and DOM order stay readable.
+
+    The full snapshot is returned (fallback=True) for actions that need the whole page,
+    and when nothing in the page matches the step.
+    """
+    def __init__(self, config: Dict = CANDIDATE_EXTRACTOR_CONFIG, top_k: Optional[int] = None):
+        """Initialize with configuration.
+
+        Args:
+            config: Configuration dict, see CANDIDATE_EXTRACTOR_CONFIG.
+            top_k: Overrides config['top_k'].
+        """
+        self.config = config
+        self.top_k = top_k if top_k is not None else config['top_k']
+        self.subtree_depth = config['subtree_depth']
+        self.action_roles = config['action_roles']
+        self.role_boost = config['role_boost']
+        self.phrase_boost = config['phrase_boost']
+        self.full_page_actions = set(config['full_page_actions'])
+        self.stopwords = set(config['stopwords'])
+
+    def query_for(self, step: GherkinStep) -> List[str]:
+        text = step.target
+        if step.action == 'verify' and step.value:
+            text = f"{text} {step.value}"
+        return [token for token in tokenize(text) if token not in self.stopwords]
+
+    def rank(self, snapshot: Dict[str, Any], step: GherkinStep) -> Tuple[List[Candidate], int]:
+        """Return the top-k candidates for the step and the number of indexed nodes."""
+        index = CandidateIndex(snapshot, self.config)
+        query = self.query_for(step)
+        preferred_roles = set(self.action_roles.get(step.action, []))
+        phrase = ' '.join(tokenize(step.target))
+        candidates = []
+        # Rank a wider window so role and phrase boosts can reorder the BM25 results.
+        for score, path, node in index.search(query, self.top_k * 4):
+            if node.get('role') in preferred_roles:
+                score *= self.role_boost
+            if phrase and phrase in ' '.join(tokenize(node.get('name', ''))):
+                score *= self.phrase_boost
+            candidates.append(Candidate(path, score, node.get('role', ''), node.get('name', '')))
+        candidates.sort(key=lambda candidate: (-candidate.score, candidate.path))
+        return candidates[:self.top_k], len(index)
+
+    def extract(self, snapshot: Dict[str, Any], step: GherkinStep) -> CandidateSelection:
+        """Reduce the snapshot to the candidate subtrees for the step."""
+        total_nodes = self._count(snapshot)
+        if step.action in self.full_page_actions:
+            return CandidateSelection(snapshot, [], total_nodes, total_nodes, fallback=True)
+
+        candidates, _ = self.rank(snapshot, step)
+        if not candidates:
+            logger.debug(f"No candidates for target '{step.target}', keeping the full snapshot")
+            return CandidateSelection(snapshot, [], total_nodes, total_nodes, fallback=True)
+
+        selected = {candidate.path for candidate in candidates}
+        ancestors = {path[:depth] for path in selected for depth in range(len(path))}
+        reduced = self._build(snapshot, (), selected, ancestors)
+        kept_nodes = self._count(reduced)
+        logger.debug(
+            f"Candidates for '{step.target}': " +
+            ', '.join(f"{c.role} '{c.name[:40]}' ({c.score:.2f})" for c in candidates) +
+            f"; kept {kept_nodes}/{total_nodes} nodes"
+        )
+        return CandidateSelection(reduced, candidates, total_nodes, kept_nodes)
+
+    def _build(self, node: Dict[str, Any], path: Path, selected: set, ancestors: set,
+               depth: Optional[int] = None) -> Dict[str, Any]:
+        """Copy the node, keeping candidate subtrees (up to subtree_depth) and the paths to them.
+
+        `depth` is the remaining depth inside a candidate subtree, None outside of one.
+        """
+        if path in selected:
+            depth = self.subtree_depth
+        reduced = {key: value for key, value in node.items() if key != 'children'}
+        children = []
+        skipped = 0
+        for index, child in enumerate(node.get('children', [])):
+            child_path = path + (index,)
+            if child_path in selected or child_path in ancestors or (depth is not None and depth > 0):
+                if skipped:
+                    children.append(self._omitted(skipped))
+                    skipped = 0
+                children.append(self._build(child, child_path, selected, ancestors, None if depth is None else depth - 1))
+            else:
+                skipped += self._count(child)
+        if skipped:
+            children.append(self._omitted(skipped))
+        if children:
+            reduced['children'] = children
+        return reduced
+
+    @staticmethod
+    def _omitted(count: int) -> Dict[str, Any]:
+        return {'role': OMITTED_ROLE, 'name': f'{count} more', 'count': count}
+
+    def _count(self, node: Dict[str, Any]) -> int:
+        if node.get('role') == OMITTED_ROLE:
+            return 0
+        return 1 + sum(self._count(child) for child in node.get('children', []))
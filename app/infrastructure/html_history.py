@@ -0,0 +1,234 @@
+# app/infrastructure/html_history.py
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from itertools import accumulate
+from typing import Dict, Any, Optional, List, Union
+import json
+import os
+import re
+from app.infrastructure.snapshot_storage import (
+    SnapshotHTMLStorage,
+    SnapshotWriter,
+    get_snapshot_context,
+    get_snapshot_writer
+)
+from app.utils.config import HTML_HISTORY_CONFIG, SNAPSHOT_STORAGE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HISTORY_FILE = 'html_history.jsonl'
+INDEX_FILE = 'html_history.index.jsonl'
+
+# Tag-granular tokens: everything up to and including each '>', plus any trailing text.
+_TOKEN_RE = re.compile(r'[^>]*>|[^>]+')
+
+DeltaOp = Union[List[int], str]
+
+def tokenize_html(html_content: str) -> List[str]:
+    return _TOKEN_RE.findall(html_content)
+
+def compute_delta(base: str, target: str, max_diff_tokens: int = HTML_HISTORY_CONFIG['max_diff_tokens']) -> List[DeltaOp]:
+    """Encode `target` as ops over `base`: [start, end] copies base[start:end], a string is inserted.
+
+    The common prefix and suffix are matched directly; only the changed middle goes through
+    SequenceMatcher, and a middle longer than max_diff_tokens is inserted as-is.
+    """
+    a, b = tokenize_html(base), tokenize_html(target)
+    offsets = [0, *accumulate(len(token) for token in a)]
+    prefix = 0
+    limit = min(len(a), len(b))
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[len(a) - 1 - suffix] == b[len(b) - 1 - suffix]:
+        suffix += 1
+
+    ops: List[DeltaOp] = []
+
+    def copy(i1: int, i2: int) -> None:
+        if i1 == i2:
+            return
+        start, end = offsets[i1], offsets[i2]
+        if ops and isinstance(ops[-1], list) and ops[-1][1] == start:
+            ops[-1][1] = end
+        else:
+            ops.append([start, end])
+
+    def insert(text: str) -> None:
+        if not text:
+            return
+        if ops and isinstance(ops[-1], str):
+            ops[-1] += text
+        else:
+            ops.append(text)
+
+    copy(0, prefix)
+    a_mid, b_mid = a[prefix:len(a) - suffix], b[prefix:len(b) - suffix]
+    if a_mid and b_mid and max(len(a_mid), len(b_mid)) <= max_diff_tokens:
+        matcher = SequenceMatcher(None, a_mid, b_mid, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                copy(prefix + i1, prefix + i2)
+            elif tag in ('replace', 'insert'):
+                insert(''.join(b_mid[j1:j2]))
+    else:
+        insert(''.join(b_mid))
+    copy(len(a) - suffix, len(a))
+    return ops
+
+def apply_delta(base: str, ops: List[DeltaOp]) -> str:
+    return ''.join(base[op[0]:op[1]] if isinstance(op, list) else op for op in ops)
+
+class HTMLHistoryWriter:
+    """Appends one run's step HTML as keyframes and deltas against the previous step.
+
+    Responsibilities:
+    - Start a keyframe on the first step, when the URL changes (a navigation), when the
+      delta chain reaches max_chain, or when a delta would exceed keyframe_ratio of the page.
+    - Append records to html_history.jsonl and their offsets to html_history.index.jsonl.
+
+    Not thread-safe; the snapshot writer thread is its only user.
+    """
+    def __init__(
+        self,
+        run_dir: str,
+        max_chain: int = HTML_HISTORY_CONFIG['max_chain'],
+        keyframe_ratio: float = HTML_HISTORY_CONFIG['keyframe_ratio'],
+        max_diff_tokens: int = HTML_HISTORY_CONFIG['max_diff_tokens']
+    ):
+        self.run_dir = run_dir
+        self.max_chain = max_chain
+        self.keyframe_ratio = keyframe_ratio
+        self.max_diff_tokens = max_diff_tokens
+        self._previous: Optional[Dict[str, Any]] = None
+        self._chain = 0
+        self.logical_bytes = 0
+        self.stored_bytes = 0
+        os.makedirs(run_dir, exist_ok=True)
+
+    def append(self, step: int, html_content: str, url: Optional[str] = None) -> str:
+        """Store a step's HTML and return the record type ('keyframe' or 'delta')."""
+        record: Dict[str, Any] = {'step': step}
+        previous = self._previous
+        line = None
+        if previous is not None and url == previous['url'] and self._chain < self.max_chain:
+            ops = compute_delta(previous['html'], html_content, self.max_diff_tokens)
+            encoded = json.dumps({'step': step, 'ops': ops}, ensure_ascii=False)
+            if len(encoded) <= self.keyframe_ratio * len(html_content):
+                record_type, line = 'delta', encoded
+        if line is None:
+            record_type = 'keyframe'
+            line = json.dumps({'step': step, 'html': html_content}, ensure_ascii=False)
+
+        data = (line + '\n').encode('utf-8')
+        history_path = os.path.join(self.run_dir, HISTORY_FILE)
+        with open(history_path, 'ab') as f:
+            offset = f.tell()
+            f.write(data)
+        record.update({
+            'type': record_type,
+            'base': previous['step'] if record_type == 'delta' else None,
+            'offset': offset,
+            'length': len(data),
+            'url': url,
+        })
+        with open(os.path.join(self.run_dir, INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+        self._chain = self._chain + 1 if record_type == 'delta' else 0
+        self._previous = {'step': step, 'html': html_content, 'url': url}
+        self.logical_bytes += len(html_content.encode('utf-8'))
+        self.stored_bytes += len(data)
+        return record_type
+
+class HTMLHistoryReader:
+    """Random-access reader that rebuilds any step's HTML from a run's history.
+
+    Reads the small index up front and seeks into the history file per record; the last
+    rebuilt step is kept, so reading steps in order applies one delta per step.
+    """
+    def __init__(self, run_dir: str):
+        self.run_dir = run_dir
+        with open(os.path.join(run_dir, INDEX_FILE), encoding='utf-8') as f:
+            self.index: Dict[int, Dict[str, Any]] = {}
+            for line in f:
+                entry = json.loads(line)
+                self.index[entry['step']] = entry
+        self._last: Optional[tuple] = None
+
+    def steps(self) -> List[int]:
+        return sorted(self.index)
+
+    def url(self, step: int) -> Optional[str]:
+        return self.index[step]['url']
+
+    def _record(self, f, entry: Dict[str, Any]) -> Dict[str, Any]:
+        f.seek(entry['offset'])
+        return json.loads(f.read(entry['length']))
+
+    def read(self, step: int) -> str:
+        if step not in self.index:
+            raise KeyError(f"Step {step} is not in the HTML history of {self.run_dir}")
+        chain = []
+        current = step
+        while True:
+            if self._last is not None and self._last[0] == current:
+                html_content = self._last[1]
+                break
+            entry = self.index[current]
+            if entry['type'] == 'keyframe':
+                html_content = None
+                chain.append(entry)
+                break
+            chain.append(entry)
+            current = entry['base']
+
+        with open(os.path.join(self.run_dir, HISTORY_FILE), 'rb') as f:
+            for entry in reversed(chain):
+                record = self._record(f, entry)
+                html_content = record['html'] if entry['type'] == 'keyframe' else apply_delta(html_content, record['ops'])
+        self._last = (step, html_content)
+        return html_content
+
+class DeltaSnapshotHTMLStorage(SnapshotHTMLStorage):
+    """SnapshotHTMLStorage writing each run's HTML as a delta-encoded history.
+
+    Writes go through the background snapshot writer to <base_dir>/<run_id>/html_history.jsonl.
+    """
+    def __init__(
+        self,
+        base_dir: str = SNAPSHOT_STORAGE_CONFIG['base_dir'],
+        writer: Optional[SnapshotWriter] = None,
+        max_open_runs: int = HTML_HISTORY_CONFIG['max_open_runs']
+    ):
+        self.base_dir = base_dir
+        self.writer = writer or get_snapshot_writer()
+        self.max_open_runs = max_open_runs
+        # Only touched from the writer thread.
+        self._histories: "OrderedDict[str, HTMLHistoryWriter]" = OrderedDict()
+        self._unscoped_step = 0
+
+    def _history(self, run_id: str) -> HTMLHistoryWriter:
+        history = self._histories.get(run_id)
+        if history is None:
+            history = HTMLHistoryWriter(os.path.join(self.base_dir, run_id))
+            self._histories[run_id] = history
+            if len(self._histories) > self.max_open_runs:
+                # A run that comes back after this starts over with a keyframe.
+                self._histories.popitem(last=False)
+        else:
+            self._histories.move_to_end(run_id)
+        return history
+
+    def save_snapshot(self, snapshot: str, file_path: Optional[str] = None) -> None:
+        context = get_snapshot_context()
+        if context is None:
+            run_id, step, url = 'unscoped', self._unscoped_step, None
+            self._unscoped_step += 1
+        else:
+            run_id, step, url = context.run_id, context.step, context.url
+        self.writer.submit_task(
+            f"{os.path.join(self.base_dir, run_id, HISTORY_FILE)}#{step}",
+            lambda: self._history(run_id).append(step, snapshot, url)
+        )
@@ -1,5 +1,5 @@
 from typing import Dict, Optional, List, Any
-from bs4 import BeautifulSoup, Comment, NavigableString
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
 from app.utils.config import HTML_SUMMARIZER_CONFIG
 from app.infrastructure.interfaces import HTMLSummarizerInterface
 import logging
@@ -15,15 +15,30 @@ class HTMLSummarizer(HTMLSummarizerInterface):
     - Filter elements based on style and attributes, marking visibility.
     - Map tags to accessibility roles and extract names.
     - Produce a JSON structure for AI-driven Playwright instructions, including visibility status.
+
+    Two engines produce the same JSON:
+    - 'single_pass' (default): one DFS where visibility is inherited top-down and
+      text/child visibility are computed bottom-up, so the whole page costs O(n).
+    - 'recursive': the original element_to_json/is_visible walk, which re-reads
+      ancestors and subtrees for every element. Kept for parity checks.
     """
-    def __init__(self, parser: str = 'lxml', config: Dict = HTML_SUMMARIZER_CONFIG):
+    ENGINES = ('single_pass', 'recursive')
+    INTERACTIVE_TAGS = ('a', 'button', 'input', 'select', 'textarea')
+    INTERACTIVE_ROLES = ('button', 'link', 'textbox', 'combobox', 'menuitem', 'tab')
+    SPECIAL_TAGS = ('img', 'svg', 'canvas', 'iframe')
+
+    def __init__(self, parser: str = 'lxml', config: Dict = HTML_SUMMARIZER_CONFIG, engine: str = 'single_pass'):
         """Initialize with parser and configuration.
 
         Args:
             parser: BeautifulSoup parser ('lxml', 'html5lib', etc.).
             config: Configuration dict with role_map, input_type_map, and visible_attributes.
+            engine: Summarization engine ('single_pass' or 'recursive').
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unsupported summarizer engine: {engine}")
         self.parser = parser
+        self.engine = engine
         self.role_map = config['role_map']
         self.input_type_map = config['input_type_map']
         self.visible_attributes = config['visible_attributes']
@@ -95,21 +110,20 @@ class HTMLSummarizer(HTMLSummarizerInterface):
 
     def tag_to_role(self, tag_name: str, element: BeautifulSoup) -> Optional[str]:
         """Map an HTML tag to an accessibility role."""
+        role = self._lookup_role(tag_name, element)
+        logger.debug(f"Tag {tag_name} mapped to role: {role}")
+        return role
+
+    def _lookup_role(self, tag_name: str, element: Tag) -> Optional[str]:
+        """Role lookup behind tag_to_role, without per-element logging."""
         if element.get('role'):
-            logger.debug(f"Using explicit role: {element['role']}")
             return element['role']
         tag_name = tag_name.lower()
         if tag_name == 'input':
-            input_type = element.get('type', 'text')
-            role = self.input_type_map.get(input_type, 'textbox')
-            logger.debug(f"Input type {input_type} mapped to role: {role}")
-            return role
+            return self.input_type_map.get(element.get('type', 'text'), 'textbox')
         if tag_name == 'select':
-            logger.debug("Mapping select to combobox")
             return 'combobox'
-        role = self.role_map.get(tag_name, 'generic')
-        logger.debug(f"Tag {tag_name} mapped to role: {role}")
-        return role
+        return self.role_map.get(tag_name, 'generic')
 
     def get_name(self, element: BeautifulSoup, text: str) -> str:
         """Extract an accessible name for an element."""
@@ -118,6 +132,14 @@ class HTMLSummarizer(HTMLSummarizerInterface):
             logger.warning(f"Element {element} has no attributes")
             return ''
 
+        role = self.tag_to_role(element.name, element)
+        name = self._resolve_name(element, text, role, element.string, bool(element.find_all(recursive=False)))
+        logger.debug(f"Resolved name: {name}")
+        return name
+
+    def _resolve_name(self, element: Tag, text: str, role: Optional[str],
+                      string: Optional[str], has_children: bool) -> str:
+        """Resolve the accessible name from precomputed role, .string and child presence."""
         aria_label = element.get('aria-label', '').strip()
         if not aria_label:
             for attr in element.attrs:
@@ -125,39 +147,24 @@ class HTMLSummarizer(HTMLSummarizerInterface):
                     aria_label = element.attrs[attr].strip()
                     break
         if aria_label:
-            logger.debug(f"Name from aria-label: {aria_label}")
             return aria_label
 
-        role = self.tag_to_role(element.name, element)
-        direct_text = element.string.strip() if element.string else ''
+        direct_text = string.strip() if string else ''
         if direct_text and role != 'generic':
-            logger.debug(f"Name from direct text: {direct_text}")
             return direct_text
 
-        if role == 'generic':
-            child_elements = element.find_all(recursive=False)
-            if not child_elements and text:
-                logger.debug(f"Name from child text for generic role: {text}")
-                return text
-            logger.debug(f"Skipping child text for generic role with {len(child_elements)} children")
+        if role == 'generic' and not has_children and text:
+            return text
 
         if element.name == 'img':
-            name = element.get('alt', '').strip()
-            logger.debug(f"Name from alt: {name}")
-            return name
+            return element.get('alt', '').strip()
         if element.name in ['input', 'textarea', 'select']:
-            name = (element.get('aria-label', '').strip() or
+            return (element.get('aria-label', '').strip() or
                     element.get('value', '').strip() or
                     element.get('placeholder', '').strip() or
                     element.get('name', '').strip())
-            logger.debug(f"Name for input/textarea/select: {name}")
-            return name
         if element.name == 'iframe':
-            name = element.get('title', '').strip()
-            logger.debug(f"Name from title: {name}")
-            return name
-
-        logger.debug("No name found")
+            return element.get('title', '').strip()
         return ''
 
     def element_to_json(self, element: BeautifulSoup) -> Optional[Dict[str, Any]]:
@@ -226,6 +233,143 @@ class HTMLSummarizer(HTMLSummarizerInterface):
         logger.debug(f"Processed element: {element.name}, role: {role}, name: {node['name']}, visibility: {is_visible}, children: {len(children)}")
         return node
 
+    @staticmethod
+    def _is_hidden_by_attributes(element: Tag) -> bool:
+        """Check the element's own style, hidden and aria-hidden markers."""
+        style = element.get('style', '')
+        if 'display: none' in style or 'visibility: hidden' in style or 'opacity: 0' in style:
+            return True
+        return bool(element.get('hidden')) or element.get('aria-hidden') == 'true'
+
+    @staticmethod
+    def _hides_descendants(element: Tag) -> bool:
+        """Check whether an element hides everything below it (attributes or mobile-nav class)."""
+        if HTMLSummarizer._is_hidden_by_attributes(element):
+            return True
+        classes = element.get('class', [])
+        return isinstance(classes, list) and 'mobile-nav' in classes
+
+    def _ancestors_visible(self, element: Tag) -> bool:
+        """Check the ancestor chain of the summarization root once, as is_visible does."""
+        parent = element.parent
+        while parent and parent.name != '[document]':
+            if self._hides_descendants(parent):
+                return False
+            parent = parent.parent
+        return True
+
+    def _summarize_tree(self, root: Tag) -> Optional[Dict[str, Any]]:
+        """Convert the root element to JSON with a single depth-first pass.
+
+        Produces exactly the output of element_to_json(root). Visibility of the
+        ancestor chain is passed down; text, the .string shortcut and subtree
+        visibility are returned up, so no element is read more than once.
+        """
+        default_string_types = Tag.DEFAULT_INTERESTING_STRING_TYPES
+        focus_lookup: List[bool] = []
+
+        def has_focus_attribute() -> bool:
+            # element.find_parent().find(focus=True) can only match inside root.
+            if not focus_lookup:
+                focus_lookup.append(root.find(focus=True) is not None)
+            return focus_lookup[0]
+
+        def visit(element: Tag, ancestors_visible: bool):
+            hidden_by_attributes = self._is_hidden_by_attributes(element)
+            classes = element.get('class', [])
+            is_mobile_nav = isinstance(classes, list) and 'mobile-nav' in classes
+            children_ancestors_visible = ancestors_visible and not hidden_by_attributes and not is_mobile_nav
+
+            contents = element.contents
+            text_parts = []
+            child_results = []
+            for child in contents:
+                if isinstance(child, Tag):
+                    result = visit(child, children_ancestors_visible)
+                    child_results.append(result)
+                    if result[1]:
+                        text_parts.append(result[1])
+                elif type(child) in default_string_types:
+                    stripped = child.strip()
+                    if stripped:
+                        text_parts.append(stripped)
+            default_text = ''.join(text_parts)
+
+            if len(contents) != 1:
+                string = None
+            elif isinstance(contents[0], NavigableString):
+                string = contents[0]
+            else:
+                string = child_results[0][2]
+
+            if element.interesting_string_types == default_string_types:
+                text = default_text
+            else:
+                text = element.get_text(strip=True)
+
+            # Same decision order as is_visible, minus the ancestor walk.
+            if hidden_by_attributes:
+                subtree_visible = False
+            elif (element.name in self.INTERACTIVE_TAGS or
+                  element.get('role') in self.INTERACTIVE_ROLES):
+                subtree_visible = bool(text or element.attrs or child_results)
+            elif element.name in self.SPECIAL_TAGS:
+                subtree_visible = True
+            elif text:
+                subtree_visible = True
+            else:
+                subtree_visible = not is_mobile_nav and any(result[3] for result in child_results)
+
+            node = None
+            role = self._lookup_role(element.name, element) if element.name else None
+            if role is not None:
+                is_visible = ancestors_visible and subtree_visible
+                attributes = {
+                    key: value for key, value in element.attrs.items()
+                    if key in self.visible_attributes
+                }
+                if 'class' in attributes and isinstance(attributes['class'], list):
+                    attributes['class'] = ' '.join(attributes['class'])
+
+                name = self._resolve_name(element, text, role, string, bool(child_results))
+                node = {'role': role, 'name': name}
+                if attributes:
+                    node['attributes'] = attributes
+                if not is_visible:
+                    node['visibility'] = 'hidden'
+
+                if role == 'heading':
+                    if 'aria-level' in attributes:
+                        try:
+                            node['level'] = int(attributes['aria-level'])
+                        except ValueError:
+                            node['level'] = 1
+                    else:
+                        node['level'] = int(element.name[1]) if element.name.startswith('h') and element.name[1].isdigit() else 1
+
+                if element.get('focused') == 'true' or (
+                    element.name in ['input', 'textarea'] and
+                    has_focus_attribute() and
+                    element == element.find_parent().find(focus=True)
+                ):
+                    node['focused'] = True
+
+                if element.get('haspopup'):
+                    node['haspopup'] = element['haspopup']
+
+                children = [result[0] for result in child_results if result[0]]
+                if children:
+                    node['children'] = children
+
+                if text and role == 'text' and text != name and 'aria-label' not in attributes:
+                    node = {'role': 'text', 'name': text}
+                    if not is_visible:
+                        node['visibility'] = 'hidden'
+
+            return node, default_text, string, subtree_visible
+
+        return visit(root, self._ancestors_visible(root))[0]
+
     def summarize_html(self, html_content: str) -> Dict[str, Any]:
         """Convert HTML to JSON DOM for elements, including visibility status."""
         if html_content is None:
@@ -249,7 +393,10 @@ class HTMLSummarizer(HTMLSummarizerInterface):
             logger.warning("No body or root element found in HTML")
             return {'role': 'WebArea', 'name': '', 'children': []}
 
-        json_result = self.element_to_json(root)
+        if self.engine == 'single_pass':
+            json_result = self._summarize_tree(root)
+        else:
+            json_result = self.element_to_json(root)
         title = soup.title.get_text(separator=' ', strip=True) if soup.title else ''
         logger.debug(f"Title extracted: {title}")
 
@@ -267,4 +414,26 @@ class HTMLSummarizer(HTMLSummarizerInterface):
                 return f.read()
         except FileNotFoundError as e:
             logger.error(f"Test HTML file not found: {file_path}")
-            raise
\ No newline at end of file
+            raise
+
+def create_html_summarizer(
+    summarizer_type: str = "beautifulsoup",
+    **kwargs: Any
+) -> HTMLSummarizerInterface:
+    """Factory function to create HTML summarizers."""
+    from functools import partial
+    from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+    from app.infrastructure.browser_dom_summarizer import BrowserDOMSummarizer
+    from app.infrastructure.streaming_html_summarizer import StreamingHTMLSummarizer
+    summarizers = {
+        "beautifulsoup": HTMLSummarizer,
+        "lxml": LxmlHTMLSummarizer,
+        "streaming": StreamingHTMLSummarizer,
+        "browser": BrowserDOMSummarizer,
+        "browser_incremental": partial(BrowserDOMSummarizer, incremental=True),
+    }
+
+    if summarizer_type not in summarizers:
+        raise ValueError(f"Unsupported HTML summarizer type: {summarizer_type}")
+
+    return summarizers[summarizer_type](**kwargs)
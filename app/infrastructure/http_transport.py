@@ -0,0 +1,131 @@
+# app/infrastructure/http_transport.py
+from typing import Dict, Any, Optional, AsyncIterator
+import asyncio
+import json
+import weakref
+import httpx
+from app.domain.exceptions import AIProviderException
+from app.utils.config import AI_HTTP_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def create_http_client(config: Dict[str, Any] = AI_HTTP_CONFIG) -> httpx.AsyncClient:
+    """Build an AsyncClient with keep-alive pooling, limits and timeouts from `config`."""
+    http2 = config['http2']
+    if http2 and not _http2_available():
+        logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config['max_connections'],
+            max_keepalive_connections=config['max_keepalive_connections'],
+            keepalive_expiry=config['keepalive_expiry']
+        ),
+        timeout=httpx.Timeout(
+            connect=config['connect_timeout'],
+            read=config['read_timeout'],
+            write=config['write_timeout'],
+            pool=config['pool_timeout']
+        ),
+        http2=http2
+    )
+
+# Connections belong to the loop that opened them, so each event loop gets its own pool.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled AsyncClient shared by the AI clients on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_http_client()
+        _clients[loop] = client
+    return client
+
+async def close_http_client() -> None:
+    """Close the running loop's shared client (e.g. on application shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+async def post_json(
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    client: Optional[httpx.AsyncClient] = None
+) -> Dict[str, Any]:
+    """POST `payload` as JSON and return the decoded JSON body.
+
+    Raises:
+        httpx.HTTPStatusError: On a 4xx/5xx response.
+        httpx.HTTPError: On transport errors.
+        ValueError: If the body is not valid JSON.
+    """
+    response = await (client or get_http_client()).post(url, headers=headers, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+async def stream_sse(
+    url: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    client: Optional[httpx.AsyncClient] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """POST `payload` as JSON and yield the decoded data of each server-sent event.
+
+    Stops at the end of the stream or at a `[DONE]` event.
+
+    Raises:
+        httpx.HTTPStatusError: On a 4xx/5xx response.
+        httpx.HTTPError: On transport errors.
+        ValueError: If an event's data is not valid JSON.
+    """
+    async with (client or get_http_client()).stream('POST', url, headers=headers, json=payload) as response:
+        if response.is_error:
+            await response.aread()
+            response.raise_for_status()
+        data = []
+        async for line in response.aiter_lines():
+            if line.startswith('data:'):
+                data.append(line[5:].lstrip())
+                continue
+            if line or not data:
+                continue  # comments, other fields, or a blank line without data
+            # A blank line ends the event.
+            event, data = '\n'.join(data), []
+            if event == '[DONE]':
+                return
+            yield json.loads(event)
+        if data and data != ['[DONE]']:
+            yield json.loads('\n'.join(data))
+
+def describe_http_error(error: httpx.HTTPError) -> str:
+    """Error text with the response body when there is one."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"{error}. Response: {error.response.text}"
+    return str(error)
+
+def provider_error(error: httpx.HTTPError, provider: str) -> AIProviderException:
+    """Classify an httpx error as a retryable or fatal provider failure."""
+    from app.infrastructure.ai_resilience import is_retryable_status, parse_retry_after
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        return AIProviderException(
+            f"{provider} API request failed: {describe_http_error(error)}",
+            status_code=status_code,
+            retry_after=parse_retry_after(error.response.headers.get('Retry-After')),
+            retryable=is_retryable_status(status_code)
+        )
+    # Connection failures and timeouts; the request may not have reached the provider.
+    return AIProviderException(
+        f"{provider} API request failed: {describe_http_error(error)}",
+        retryable=isinstance(error, httpx.TransportError)
+    )
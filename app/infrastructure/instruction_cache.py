@@ -0,0 +1,99 @@
+# app/infrastructure/instruction_cache.py
+from typing import Dict, Any, Optional, List, Iterator
+import hashlib
+import json
+import re
+import threading
+from app.infrastructure.interfaces import AIResponse
+from app.infrastructure.response_cache import ResponseCache
+from app.utils.config import INSTRUCTION_CACHE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_STEP_KEYWORD = re.compile(r'^(given|when|then|and|but)\s+', re.IGNORECASE)
+_DIGITS = re.compile(r'\d+')
+_SPACES = re.compile(r'\s+')
+
+def normalize_step(gherkin: str) -> str:
+    """Gherkin step reduced to what identifies its action: no leading keyword, case or spacing."""
+    step = _SPACES.sub(' ', gherkin.strip())
+    step = _STEP_KEYWORD.sub('', step)
+    return step.rstrip('.').lower()
+
+def _normalize_name(name: Any) -> str:
+    # Digits are masked so timestamps, counters and prices do not change the fingerprint.
+    name = _SPACES.sub(' ', str(name or '')).strip()[:INSTRUCTION_CACHE_CONFIG['max_name_length']]
+    return _DIGITS.sub('#', name.lower())
+
+def _interactive_nodes(node: Dict[str, Any]) -> Iterator[List[str]]:
+    attributes = node.get('attributes') or {}
+    element_id = attributes.get('id')
+    test_id = attributes.get('data-testid')
+    if node.get('role') in INSTRUCTION_CACHE_CONFIG['interactive_roles'] or element_id or test_id:
+        yield [node.get('role') or '', _normalize_name(node.get('name')), element_id or '', test_id or '']
+    for child in node.get('children') or []:
+        if isinstance(child, dict):
+            yield from _interactive_nodes(child)
+
+def snapshot_fingerprint(snapshot: Dict[str, Any]) -> str:
+    """Hash of the role, name, id and data-testid of a snapshot's interactive nodes, in DOM order.
+
+    Text content and non-interactive nodes are left out, so pages differing only in
+    timestamps, counters or copy share a fingerprint.
+    """
+    nodes = json.dumps(list(_interactive_nodes(snapshot)), ensure_ascii=False)
+    return hashlib.blake2b(nodes.encode('utf-8'), digest_size=16).hexdigest()
+
+class InstructionCache:
+    """Remembers the high_precision instructions that carried out a step on a page.
+
+    Responsibilities:
+    - Key entries by the normalized gherkin step and the fingerprint of the (candidate)
+      snapshot the instructions were generated for.
+    - Store only instruction sequences that executed successfully; the caller drops an
+      entry once a cached sequence fails, so the next run asks the model again.
+    - Keep entries in a ResponseCache, which applies the TTL and size limits.
+    """
+    def __init__(self, store: Optional[ResponseCache] = None):
+        self.store = store or ResponseCache(
+            path=INSTRUCTION_CACHE_CONFIG['path'],
+            ttl_seconds=INSTRUCTION_CACHE_CONFIG['ttl_seconds'],
+            max_bytes=INSTRUCTION_CACHE_CONFIG['max_bytes']
+        )
+        self.invalidations = 0
+
+    @staticmethod
+    def key(gherkin: str, snapshot: Dict[str, Any]) -> str:
+        material = f"{normalize_step(gherkin)}\n{snapshot_fingerprint(snapshot)}"
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[List[str]]:
+        response = self.store.get(key)
+        if response is None:
+            return None
+        return json.loads(response.content)
+
+    def put(self, key: str, instructions: List[str], gherkin: Optional[str] = None) -> None:
+        self.store.put(key, AIResponse(content=json.dumps(instructions), metadata={'gherkin': gherkin}))
+
+    def invalidate(self, key: str) -> None:
+        if self.store.delete(key):
+            self.invalidations += 1
+            logger.info("Dropped cached instructions that failed to execute")
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.store.stats(), 'invalidations': self.invalidations}
+
+_shared_cache: Optional[InstructionCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_instruction_cache() -> Optional[InstructionCache]:
+    """Process-wide instruction cache, or None when INSTRUCTION_CACHE is disabled."""
+    global _shared_cache
+    if not INSTRUCTION_CACHE_CONFIG['enabled']:
+        return None
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = InstructionCache()
+        return _shared_cache
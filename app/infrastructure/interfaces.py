@@ -1,7 +1,7 @@
 # app/infrastructure/interfaces.py
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Iterable
 from dataclasses import dataclass
 
 
@@ -11,6 +11,9 @@ class AIResponse:
     content: str
     metadata: Optional[Dict[str, Any]] = None
 
+# Async check of a raw answer's content, e.g. a generator's is_valid_answer.
+Validator = Callable[[str], Awaitable[bool]]
+
 class AIClientInterface(ABC):
     """Abstract interface for AI clients."""
     
@@ -19,6 +22,30 @@ class AIClientInterface(ABC):
         """Send prompt to AI and get response."""
         pass
 
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """Send prompt to AI and yield the response text as it arrives.
+
+        Clients without streaming support yield the whole response at once.
+        """
+        response = await self.send_prompt(prompt)
+        yield response.content
+
+class DelegatingAIClient(AIClientInterface):
+    """Base for AI clients that wrap other AI clients (retries, rate limits, failover, ...).
+
+    Public attributes the wrapper does not define itself (model_name, max_tokens,
+    temperature, ...) are read from the delegate passed to __init__, so a stack of
+    wrappers looks like the client at its bottom. Private attributes are never
+    delegated, so a wrapper missing its own state raises instead of recursing.
+    """
+    def __init__(self, delegate: AIClientInterface):
+        self._delegate = delegate
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._delegate, name)
+
 class StepGeneratorInterface(ABC):
     """Abstract interface for step generators."""
     
@@ -58,4 +85,35 @@ class HTMLSummarizerInterface(ABC):
     @abstractmethod
     def summarize_html(self, html_content: str) -> Dict[str, Any]:
         """Convert HTML to JSON DOM for visible elements."""
-        pass
\ No newline at end of file
+        pass
+
+class PageSummarizerInterface(ABC):
+    """Interface for summarizers that read the live page instead of serialized HTML."""
+    @abstractmethod
+    async def summarize_page(self, browser_manager: Any) -> Dict[str, Any]:
+        """Summarize the browser manager's current page into a JSON DOM."""
+        pass
+
+class SnapshotEncoderInterface(ABC):
+    """Interface for serializing a JSON DOM snapshot into prompt text."""
+    description: str = ""
+
+    @abstractmethod
+    def encode(self, snapshot: Dict[str, Any]) -> str:
+        """Serialize the snapshot for the Playwright prompt."""
+        pass
+
+    def encode_records(self, records: Iterable[Any]) -> str:
+        """Serialize a streaming summarizer's post-order NodeRecords, as encode() would their tree.
+
+        Encoders that can should do so without building the tree; this default builds it.
+        """
+        from app.infrastructure.streaming_html_summarizer import build_tree
+        return self.encode(build_tree(records))
+
+class AsyncHTMLSummarizerInterface(ABC):
+    """Interface for summarizers that parse HTML off the event loop."""
+    @abstractmethod
+    async def summarize_html_async(self, html_content: str) -> Dict[str, Any]:
+        """Convert HTML to JSON DOM without blocking the event loop."""
+        pass
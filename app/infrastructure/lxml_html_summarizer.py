@@ -0,0 +1,310 @@
+# app/infrastructure/lxml_html_summarizer.py
+from typing import Dict, Optional, List, Any, Iterator
+from lxml import etree
+from app.utils.config import HTML_SUMMARIZER_CONFIG
+from app.infrastructure.interfaces import HTMLSummarizerInterface
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)  # Set to DEBUG for detailed logging
+
+class LxmlHTMLSummarizer(HTMLSummarizerInterface):
+    """Converts HTML to the same JSON DOM as HTMLSummarizer, working directly on lxml elements.
+
+    Responsibilities:
+    - Parse HTML with lxml's HTML parser, without building a BeautifulSoup tree.
+    - Apply the role mapping, naming and visibility rules of HTMLSummarizer.
+    - Summarize in a single depth-first pass, like HTMLSummarizer's 'single_pass' engine.
+
+    BeautifulSoup-specific details are mirrored so that both backends produce the same
+    JSON: strings inside script/style/template/rt/rp are not counted as text of their
+    ancestors, comments are ignored (their tails are not), and `.string` follows
+    BeautifulSoup's single-child rule.
+    """
+    INTERACTIVE_TAGS = ('a', 'button', 'input', 'select', 'textarea')
+    INTERACTIVE_ROLES = ('button', 'link', 'textbox', 'combobox', 'menuitem', 'tab')
+    SPECIAL_TAGS = ('img', 'svg', 'canvas', 'iframe')
+    # Tags whose strings BeautifulSoup stores in special string classes.
+    STRING_CONTAINER_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+
+    def __init__(self, config: Dict = HTML_SUMMARIZER_CONFIG):
+        """Initialize with configuration.
+
+        Args:
+            config: Configuration dict with role_map, input_type_map, and visible_attributes.
+        """
+        self.role_map = config['role_map']
+        self.input_type_map = config['input_type_map']
+        self.visible_attributes = config['visible_attributes']
+
+    def _parse(self, html_content: str) -> Optional[etree._Element]:
+        """Parse HTML into an lxml tree, retrying as bytes for documents with an encoding declaration."""
+        parser = etree.HTMLParser(recover=True)
+        try:
+            return etree.fromstring(html_content, parser)
+        except ValueError:
+            # lxml rejects str input that carries an XML encoding declaration.
+            return etree.fromstring(html_content.encode('utf-8'), etree.HTMLParser(recover=True, encoding='utf-8'))
+
+    def tag_to_role(self, element: etree._Element) -> Optional[str]:
+        """Map an lxml element to an accessibility role."""
+        explicit_role = element.get('role')
+        if explicit_role:
+            return explicit_role
+        tag_name = element.tag.lower()
+        if tag_name == 'input':
+            return self.input_type_map.get(element.get('type', 'text'), 'textbox')
+        if tag_name == 'select':
+            return 'combobox'
+        return self.role_map.get(tag_name, 'generic')
+
+    def get_name(self, element: etree._Element, text: str, role: Optional[str],
+                 string: Optional[str], has_children: bool) -> str:
+        """Extract an accessible name for an element."""
+        aria_label = element.get('aria-label', '').strip()
+        if aria_label:
+            return aria_label
+
+        direct_text = string.strip() if string else ''
+        if direct_text and role != 'generic':
+            return direct_text
+
+        if role == 'generic' and not has_children and text:
+            return text
+
+        tag = element.tag
+        if tag == 'img':
+            return element.get('alt', '').strip()
+        if tag in ['input', 'textarea', 'select']:
+            return (element.get('aria-label', '').strip() or
+                    element.get('value', '').strip() or
+                    element.get('placeholder', '').strip() or
+                    element.get('name', '').strip())
+        if tag == 'iframe':
+            return element.get('title', '').strip()
+        return ''
+
+    @staticmethod
+    def _is_hidden_by_attributes(element: etree._Element) -> bool:
+        """Check the element's own style, hidden and aria-hidden markers."""
+        style = element.get('style', '')
+        if 'display: none' in style or 'visibility: hidden' in style or 'opacity: 0' in style:
+            return True
+        return bool(element.get('hidden')) or element.get('aria-hidden') == 'true'
+
+    @staticmethod
+    def _is_mobile_nav(element: etree._Element) -> bool:
+        return 'mobile-nav' in element.get('class', '').split()
+
+    def _ancestors_visible(self, element: etree._Element) -> bool:
+        """Check the ancestor chain of the summarization root."""
+        for ancestor in element.iterancestors():
+            if self._is_hidden_by_attributes(ancestor) or self._is_mobile_nav(ancestor):
+                return False
+        return True
+
+    def _iter_strings(self, element: etree._Element, skip_containers: bool = False) -> Iterator[str]:
+        """Yield the text strings of a subtree in document order, ignoring comment bodies."""
+        if isinstance(element.tag, str) and element.text:
+            yield element.text
+        for child in element:
+            if isinstance(child.tag, str) and not (skip_containers and child.tag in self.STRING_CONTAINER_TAGS):
+                yield from self._iter_strings(child, skip_containers)
+            if child.tail:
+                yield child.tail
+
+    @staticmethod
+    def _structurally_equal(first: etree._Element, second: etree._Element) -> bool:
+        """Compare elements the way BeautifulSoup's Tag.__eq__ does (name, attributes, contents)."""
+        if first is second:
+            return True
+        if (first.tag != second.tag or dict(first.attrib) != dict(second.attrib) or
+                (first.text or '') != (second.text or '') or len(first) != len(second)):
+            return False
+        return all(
+            (a.tail or '') == (b.tail or '') and
+            (LxmlHTMLSummarizer._structurally_equal(a, b) if isinstance(a.tag, str) else a.text == b.text)
+            for a, b in zip(first, second)
+        )
+
+    def _summarize_tree(self, root: etree._Element) -> Optional[Dict[str, Any]]:
+        """Convert the root element to JSON with a single depth-first pass."""
+        focus_lookup: List[bool] = []
+
+        def has_focus_attribute() -> bool:
+            if not focus_lookup:
+                focus_lookup.append(any(
+                    isinstance(node.tag, str) and node.get('focus') is not None
+                    for node in root.iterdescendants()
+                ))
+            return focus_lookup[0]
+
+        def first_focus_descendant(parent: etree._Element) -> Optional[etree._Element]:
+            for node in parent.iterdescendants():
+                if isinstance(node.tag, str) and node.get('focus') is not None:
+                    return node
+            return None
+
+        def visit(element: etree._Element, ancestors_visible: bool, in_container: bool):
+            tag = element.tag
+            hidden_by_attributes = self._is_hidden_by_attributes(element)
+            is_mobile_nav = self._is_mobile_nav(element)
+            children_ancestors_visible = ancestors_visible and not hidden_by_attributes and not is_mobile_nav
+            is_container = tag in self.STRING_CONTAINER_TAGS
+            strings_excluded = in_container or is_container
+
+            text_parts = []
+            child_results = []
+            contents_count = 0
+            only_child = None
+            if element.text:
+                contents_count += 1
+                if not strings_excluded:
+                    stripped = element.text.strip()
+                    if stripped:
+                        text_parts.append(stripped)
+            for child in element:
+                contents_count += 1
+                only_child = child
+                if isinstance(child.tag, str):
+                    result = visit(child, children_ancestors_visible, strings_excluded)
+                    child_results.append(result)
+                    if result[1]:
+                        text_parts.append(result[1])
+                if child.tail:
+                    contents_count += 1
+                    if not strings_excluded:
+                        stripped = child.tail.strip()
+                        if stripped:
+                            text_parts.append(stripped)
+            default_text = ''.join(text_parts)
+
+            if contents_count != 1:
+                string = None
+            elif element.text:
+                string = element.text
+            elif isinstance(only_child.tag, str):
+                string = child_results[0][2]
+            else:
+                string = only_child.text
+
+            if is_container:
+                text = ''.join(
+                    stripped for stripped in (s.strip() for s in self._iter_strings(element, skip_containers=True))
+                    if stripped
+                )
+            else:
+                text = default_text
+
+            if hidden_by_attributes:
+                subtree_visible = False
+            elif tag in self.INTERACTIVE_TAGS or element.get('role') in self.INTERACTIVE_ROLES:
+                subtree_visible = bool(text or len(element.attrib) or child_results)
+            elif tag in self.SPECIAL_TAGS:
+                subtree_visible = True
+            elif text:
+                subtree_visible = True
+            else:
+                subtree_visible = not is_mobile_nav and any(result[3] for result in child_results)
+
+            node = None
+            role = self.tag_to_role(element)
+            if role is not None:
+                is_visible = ancestors_visible and subtree_visible
+                attributes = {
+                    key: value for key, value in element.attrib.items()
+                    if key in self.visible_attributes
+                }
+                if 'class' in attributes:
+                    attributes['class'] = ' '.join(attributes['class'].split())
+
+                name = self.get_name(element, text, role, string, bool(child_results))
+                node = {'role': role, 'name': name}
+                if attributes:
+                    node['attributes'] = attributes
+                if not is_visible:
+                    node['visibility'] = 'hidden'
+
+                if role == 'heading':
+                    if 'aria-level' in attributes:
+                        try:
+                            node['level'] = int(attributes['aria-level'])
+                        except ValueError:
+                            node['level'] = 1
+                    else:
+                        node['level'] = int(tag[1]) if tag.startswith('h') and tag[1].isdigit() else 1
+
+                if element.get('focused') == 'true' or (
+                    tag in ['input', 'textarea'] and
+                    has_focus_attribute() and
+                    (candidate := first_focus_descendant(element.getparent())) is not None and
+                    self._structurally_equal(element, candidate)
+                ):
+                    node['focused'] = True
+
+                if element.get('haspopup'):
+                    node['haspopup'] = element.get('haspopup')
+
+                children = [result[0] for result in child_results if result[0]]
+                if children:
+                    node['children'] = children
+
+                if text and role == 'text' and text != name and 'aria-label' not in attributes:
+                    node = {'role': 'text', 'name': text}
+                    if not is_visible:
+                        node['visibility'] = 'hidden'
+
+            return node, default_text, string, subtree_visible
+
+        body = next(root.iter('body'), None)
+        if body is not None:
+            return visit(body, self._ancestors_visible(body), False)[0]
+
+        # No <body>: summarize the document node itself, as HTMLSummarizer does.
+        document_node, document_text, _, document_visible = visit(root, True, False)
+        node = {'role': 'generic', 'name': ''}
+        if not (document_text or document_visible):
+            node['visibility'] = 'hidden'
+        if document_node:
+            node['children'] = [document_node]
+        return node
+
+    def summarize_html(self, html_content: str) -> Dict[str, Any]:
+        """Convert HTML to JSON DOM for elements, including visibility status."""
+        if html_content is None:
+            logger.error("html_content is None")
+            raise ValueError("html_content cannot be None")
+
+        try:
+            root = self._parse(html_content)
+        except Exception as e:
+            logger.error(f"lxml parsing failed: {str(e)}")
+            return {'role': 'WebArea', 'name': '', 'children': []}
+
+        if root is None:
+            # Nothing to parse: mirror HTMLSummarizer's result for an empty document.
+            return {'role': 'WebArea', 'name': '', 'visibility': 'hidden'}
+
+        json_result = self._summarize_tree(root)
+        title_element = next(root.iter('title'), None)
+        title = ' '.join(
+            stripped for stripped in (s.strip() for s in self._iter_strings(title_element))
+            if stripped
+        ) if title_element is not None else ''
+        logger.debug(f"Title extracted: {title}")
+
+        if not json_result:
+            return {'role': 'WebArea', 'name': title, 'children': []}
+
+        json_result['role'] = 'WebArea'
+        json_result['name'] = title
+        return json_result
+
+    def load_test_html(self, file_path: str) -> str:
+        """Load HTML from a file for testing."""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.error(f"Test HTML file not found: {file_path}")
+            raise
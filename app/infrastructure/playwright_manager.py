@@ -63,6 +63,11 @@ class BrowserManagerInterface(ABC):
         """Get current page DOM content."""
         pass
 
+    @abstractmethod
+    async def evaluate_script(self, script: str, arg: Any = None) -> Any:
+        """Evaluate a JavaScript function in the current page and return its JSON result."""
+        pass
+
 class PlaywrightManager(BrowserManagerInterface):
     """Manages Playwright browser sessions and interactions."""
     ALLOWED_ACTIONS: Set[Pattern] = {
@@ -344,6 +349,14 @@ class PlaywrightManager(BrowserManagerInterface):
         except Exception as e:
             raise BrowserException(f"Failed to get page content: {str(e)}")
 
+    async def evaluate_script(self, script: str, arg: Any = None) -> Any:
+        if not self._page:
+            raise BrowserException("Browser not initialized")
+        try:
+            return await self._page.evaluate(script, arg)
+        except Exception as e:
+            raise BrowserException(f"Failed to evaluate script: {str(e)}")
+
     async def __aenter__(self) -> 'PlaywrightManager':
         await self.start()
         return self
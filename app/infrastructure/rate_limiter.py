@@ -0,0 +1,205 @@
+# app/infrastructure/rate_limiter.py
+from collections import deque
+from typing import Dict, Any, Optional, AsyncIterator
+import asyncio
+import threading
+import time
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient
+from app.utils.config import AI_RATE_LIMIT_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+    """Tokens a request counts against a TPM limit: the prompt plus the reserved completion."""
+    return len(prompt) // AI_RATE_LIMIT_CONFIG['chars_per_token'] + (max_tokens or 0)
+
+class TokenBucket:
+    """Bucket holding up to `per_minute` units, refilled continuously; 0 means unlimited."""
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self._rate)
+
+    def take(self, amount: float) -> None:
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+class _Waiter:
+    __slots__ = ('loop', 'future', 'tokens', 'granted')
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, tokens: int):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.tokens = tokens
+        self.granted = False
+
+class RateLimiter:
+    """Requests-per-minute, tokens-per-minute and concurrency limits of one provider model.
+
+    Responsibilities:
+    - Admit requests in arrival order (FIFO): a request waits until both buckets can
+      cover it and a concurrency slot is free, and later requests queue behind it
+      instead of overtaking or failing.
+    - Record how long requests waited, to size quotas from.
+
+    Thread-safe; waiters may come from different event loops.
+    """
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0, name: str = 'ai'):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        # Loop that will re-run _dispatch once the head of the queue can be admitted.
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.admitted = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Wait for admission of a request of `tokens` tokens; returns the seconds waited.
+
+        Every acquire must be paired with a release.
+        """
+        waiter = _Waiter(asyncio.get_running_loop(), tokens)
+        enqueued = time.perf_counter()
+        with self._lock:
+            self._queue.append(waiter)
+            self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self.in_flight -= 1
+                else:
+                    self._queue.remove(waiter)
+                self._dispatch()
+            raise
+        wait = time.perf_counter() - enqueued
+        with self._lock:
+            self.total_queue_wait += wait
+            self.max_queue_wait = max(self.max_queue_wait, wait)
+        if wait > 1.0:
+            logger.info(f"{self.name}: request waited {wait:.2f}s for rate limits")
+        return wait
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests from the head while limits allow. Caller holds the lock."""
+        while self._queue:
+            if self.max_concurrency and self.in_flight >= self.max_concurrency:
+                return  # release() dispatches again
+            head = self._queue[0]
+            now = time.monotonic()
+            delay = max(self._requests.delay(1, now), self._tokens.delay(head.tokens, now))
+            if delay > 0:
+                self._schedule(head.loop, delay)
+                return
+            self._queue.popleft()
+            self._requests.take(1)
+            self._tokens.take(head.tokens)
+            self.in_flight += 1
+            self.admitted += 1
+            head.granted = True
+            head.loop.call_soon_threadsafe(_resolve, head.future)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._timer_loop is not None and not self._timer_loop.is_closed():
+            return
+        self._timer_loop = loop
+        loop.call_soon_threadsafe(loop.call_later, delay, self._wake)
+
+    def _wake(self) -> None:
+        with self._lock:
+            self._timer_loop = None
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rpm': int(self._requests.capacity),
+                'tpm': int(self._tokens.capacity),
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'queued': len(self._queue),
+                'admitted': self.admitted,
+                'mean_queue_wait': self.total_queue_wait / self.admitted if self.admitted else 0.0,
+                'max_queue_wait': self.max_queue_wait,
+            }
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+class RateLimitedAIClient(DelegatingAIClient):
+    """Sends an AI client's prompts through the RateLimiter of its provider model.
+
+    Responsibilities:
+    - Hold a rate limiter admission for the duration of each call (or stream).
+    - Record the queue wait in the response metadata.
+    """
+    def __init__(self, client: AIClientInterface, limiter: RateLimiter):
+        super().__init__(client)
+        self.client = client
+        self.limiter = limiter
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        wait = await self.limiter.acquire(estimate_tokens(prompt, getattr(self.client, 'max_tokens', 0)))
+        try:
+            response = await self.client.send_prompt(prompt)
+        finally:
+            self.limiter.release()
+        if response.metadata is None:
+            response.metadata = {}
+        response.metadata['rate_limit_wait'] = response.metadata.get('rate_limit_wait', 0.0) + wait
+        return response
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        await self.limiter.acquire(estimate_tokens(prompt, getattr(self.client, 'max_tokens', 0)))
+        try:
+            async for text in self.client.stream_prompt(prompt):
+                yield text
+        finally:
+            self.limiter.release()
+
+_limiters: Dict[tuple, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, model: Optional[str] = None) -> RateLimiter:
+    """Process-wide limiter of a provider model, configured from AI_RATE_LIMIT_CONFIG."""
+    key = (provider, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            limits = AI_RATE_LIMIT_CONFIG['providers'].get(provider, {})
+            _limiters[key] = RateLimiter(
+                rpm=limits.get('rpm', 0),
+                tpm=limits.get('tpm', 0),
+                max_concurrency=limits.get('max_concurrency', 0),
+                name=f"{provider}/{model}"
+            )
+        return _limiters[key]
+
+def rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {f"{provider}/{model}": limiter.stats() for (provider, model), limiter in limiters.items()}
@@ -0,0 +1,279 @@
+# app/infrastructure/response_cache.py
+from typing import Dict, Any, Optional, AsyncIterator
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.infrastructure.interfaces import AIClientInterface, AIResponse, DelegatingAIClient, Validator
+from app.utils.config import AI_RESPONSE_CACHE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_MODES = ('off', 'deterministic', 'always')
+
+# Per-call metadata that does not describe the cached answer.
+_TRANSIENT_METADATA = ('attempts', 'rate_limit_wait', 'queue_wait', 'call_time', 'raw_response')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed);
+"""
+
+def response_key(provider: str, model: Optional[str], temperature: Any, max_tokens: Any, prompt: str) -> str:
+    """Cache key of a completion request: sha256 over everything that shapes the answer."""
+    material = json.dumps([provider, model, temperature, max_tokens, prompt], ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """SQLite store of AI responses with a TTL and an LRU size bound.
+
+    Responsibilities:
+    - Return a stored response while it is younger than ttl_seconds, refreshing its
+      last access; expired entries are deleted when read.
+    - Evict expired entries, then least recently used ones until the stored responses
+      fit in max_bytes.
+    - Count hits, misses and evictions.
+    """
+    def __init__(
+        self,
+        path: str = AI_RESPONSE_CACHE_CONFIG['path'],
+        ttl_seconds: Optional[float] = AI_RESPONSE_CACHE_CONFIG['ttl_seconds'],
+        max_bytes: int = AI_RESPONSE_CACHE_CONFIG['max_bytes'],
+        evict_every: int = AI_RESPONSE_CACHE_CONFIG['evict_every']
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self._puts_since_eviction = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[AIResponse]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content, metadata, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[2], now):
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+        return AIResponse(content=row[0], metadata=json.loads(row[1]))
+
+    def put(self, key: str, response: AIResponse, model: Optional[str] = None) -> None:
+        metadata = {k: v for k, v in (response.metadata or {}).items() if k not in _TRANSIENT_METADATA}
+        metadata_json = json.dumps(metadata, ensure_ascii=False, default=str)
+        size = len(response.content.encode('utf-8')) + len(metadata_json.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, content, metadata, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, response.content, metadata_json, size, now, now)
+            )
+            self._db.commit()
+            self._puts_since_eviction += 1
+            evict = self.evict_every and self._puts_since_eviction >= self.evict_every
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """Apply the TTL and size limits; returns the number of entries removed."""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            self._puts_since_eviction = 0
+            if self.ttl_seconds:
+                removed += self._db.execute(
+                    "DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,)
+                ).rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                stale = []
+                for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._db.executemany("DELETE FROM responses WHERE key = ?", stale)
+                removed += len(stale)
+            self._db.commit()
+            self.evictions += removed
+        if removed:
+            logger.info(f"Evicted {removed} cached AI responses")
+        return removed
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+            self._db.commit()
+        return bool(deleted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+class CachingAIClient(DelegatingAIClient):
+    """Answers repeated prompts of an AI client from a ResponseCache.
+
+    Responsibilities:
+    - Key each prompt by provider, model, temperature, max_tokens and prompt text,
+      read from the client at call time.
+    - Use the cache only for calls the mode allows: in 'deterministic' mode, only
+      while the client's temperature is 0.
+    - Store successful responses that pass `validator`, if given, so a malformed answer
+      is asked again next time instead of replayed until it expires; cached responses
+      carry metadata['cached'] = True.
+    """
+    def __init__(
+        self,
+        client: AIClientInterface,
+        provider: str,
+        cache: Optional[ResponseCache] = None,
+        mode: str = AI_RESPONSE_CACHE_CONFIG['mode'],
+        validator: Optional[Validator] = None
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported response cache mode: {mode}. Supported modes: {', '.join(CACHE_MODES)}")
+        super().__init__(client)
+        self.client = client
+        self.provider = provider
+        self._cache = cache
+        self.mode = mode
+        self.validator = validator
+
+    @property
+    def cache(self) -> ResponseCache:
+        # Resolved on first cacheable call, so clients that never cache open no database.
+        if self._cache is None:
+            self._cache = get_response_cache()
+        return self._cache
+
+    def _cacheable(self) -> bool:
+        if self.mode == 'deterministic':
+            return getattr(self.client, 'temperature', None) == 0
+        return self.mode == 'always'
+
+    def _key(self, prompt: str) -> str:
+        return response_key(
+            self.provider,
+            getattr(self.client, 'model_name', None),
+            getattr(self.client, 'temperature', None),
+            getattr(self.client, 'max_tokens', None),
+            prompt
+        )
+
+    async def _store(self, key: str, response: AIResponse, model: Optional[str]) -> None:
+        if self.validator is not None:
+            try:
+                valid = await self.validator(response.content)
+            except Exception as e:
+                logger.debug(f"Validator rejected response: {e}")
+                valid = False
+            if not valid:
+                logger.info(f"Not caching invalid AI response from {self.provider}/{model}")
+                return
+        await asyncio.to_thread(self.cache.put, key, response, model)
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        if not self._cacheable():
+            return await self.client.send_prompt(prompt)
+        model = getattr(self.client, 'model_name', None)
+        key = self._key(prompt)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            logger.debug(f"AI response cache hit for {self.provider}/{model}")
+            cached.metadata['cached'] = True
+            return cached
+        response = await self.client.send_prompt(prompt)
+        await self._store(key, response, model)
+        return response
+
+    async def stream_prompt(self, prompt: str) -> AsyncIterator[str]:
+        """Yield a cached response whole; otherwise stream it and store it once complete."""
+        if not self._cacheable():
+            async for text in self.client.stream_prompt(prompt):
+                yield text
+            return
+        model = getattr(self.client, 'model_name', None)
+        key = self._key(prompt)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            yield cached.content
+            return
+        chunks = []
+        async for text in self.client.stream_prompt(prompt):
+            chunks.append(text)
+            yield text
+        response = AIResponse(content=''.join(chunks).strip(), metadata={'model': model})
+        await self._store(key, response, model)
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache configured from AI_RESPONSE_CACHE_CONFIG."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ResponseCache()
+        return _shared_cache
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Stats of the shared response cache, without opening it if no call has used it yet."""
+    with _shared_cache_lock:
+        cache = _shared_cache
+    stats = cache.stats() if cache is not None else {'open': False}
+    return {'mode': AI_RESPONSE_CACHE_CONFIG['mode'], **stats}
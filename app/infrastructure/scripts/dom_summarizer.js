@@ -0,0 +1,245 @@
+// app/infrastructure/scripts/dom_summarizer.js
+// Summarizes the live DOM into the same role/name/children JSON as HTMLSummarizer.
+// Runs inside the page via page.evaluate(script, {config, incremental, force}); only the summary
+// crosses the driver pipe. Visibility comes from computed styles and layout boxes instead of
+// inline style strings.
+//
+// Incremental mode keeps per-element results in a WeakMap installed on the window, and a
+// MutationObserver drops the entries of mutated elements and their ancestors (attribute changes
+// drop the whole subtree, since styles cascade). Untouched subtrees are reused as-is, and when
+// nothing changed since the last call only {status: 'unchanged'} is returned.
+(args) => {
+  const config = args.config;
+  const SKIPPED_TAGS = new Set(['script', 'style', 'noscript', 'template', 'head', 'meta', 'link', 'title']);
+  const LEAF_TAGS = new Set(['svg', 'canvas', 'iframe']);
+  const INTERACTIVE_TAGS = new Set(['a', 'button', 'input', 'select', 'textarea']);
+  const INTERACTIVE_ROLES = new Set(['button', 'link', 'textbox', 'combobox', 'menuitem', 'tab']);
+  const SPECIAL_TAGS = new Set(['img', 'svg', 'canvas', 'iframe']);
+  const roleMap = config.role_map;
+  const inputTypeMap = config.input_type_map;
+  const visibleAttributes = new Set(config.visible_attributes);
+  const has = (object, key) => Object.prototype.hasOwnProperty.call(object, key);
+  const attr = (el, name) => {
+    const value = el.getAttribute(name);
+    return value === null ? '' : value;
+  };
+
+  function roleFor(el, tag) {
+    const explicitRole = el.getAttribute('role');
+    if (explicitRole) return explicitRole;
+    if (tag === 'input') {
+      const type = el.hasAttribute('type') ? el.getAttribute('type') : 'text';
+      return has(inputTypeMap, type) ? inputTypeMap[type] : 'textbox';
+    }
+    if (tag === 'select') return 'combobox';
+    return has(roleMap, tag) ? roleMap[tag] : 'generic';
+  }
+
+  // Hidden for this element and everything below it.
+  function hidesSubtree(el, style) {
+    return style.display === 'none' || parseFloat(style.opacity) === 0 || attr(el, 'aria-hidden') === 'true';
+  }
+
+  function nameFor(el, tag, role, text, string, hasChildren) {
+    const ariaLabel = attr(el, 'aria-label').trim();
+    if (ariaLabel) return ariaLabel;
+    const directText = string ? string.trim() : '';
+    if (directText && role !== 'generic') return directText;
+    if (role === 'generic' && !hasChildren && text) return text;
+    if (tag === 'img') return attr(el, 'alt').trim();
+    if (tag === 'input' || tag === 'textarea' || tag === 'select') {
+      return attr(el, 'value').trim() || attr(el, 'placeholder').trim() || attr(el, 'name').trim();
+    }
+    if (tag === 'iframe') return attr(el, 'title').trim();
+    return '';
+  }
+
+  let cache = null;
+  const stats = { visited: 0, reused: 0 };
+
+  function visit(el, ancestorsVisible) {
+    if (cache) {
+      const cached = cache.get(el);
+      if (cached && cached.ancestorsVisible === ancestorsVisible) {
+        stats.reused += 1;
+        return cached.result;
+      }
+    }
+    stats.visited += 1;
+    const tag = el.localName;
+    const style = getComputedStyle(el);
+    const selfHidden = hidesSubtree(el, style);
+    const childrenAncestorsVisible = ancestorsVisible && !selfHidden;
+    const isLeaf = LEAF_TAGS.has(tag);
+
+    const textParts = [];
+    const childResults = [];
+    let string = null;
+    if (isLeaf) {
+      const leafText = (el.textContent || '').trim();
+      if (tag !== 'svg' && leafText) textParts.push(leafText);
+      string = tag === 'svg' ? null : leafText;
+    } else {
+      for (const child of el.childNodes) {
+        if (child.nodeType === Node.TEXT_NODE) {
+          const stripped = child.nodeValue.trim();
+          if (stripped) textParts.push(stripped);
+        } else if (child.nodeType === Node.ELEMENT_NODE && !SKIPPED_TAGS.has(child.localName)) {
+          const result = visit(child, childrenAncestorsVisible);
+          childResults.push(result);
+          if (result.text) textParts.push(result.text);
+        }
+      }
+      const nodes = el.childNodes;
+      if (nodes.length === 1) {
+        const only = nodes[0];
+        if (only.nodeType === Node.TEXT_NODE || only.nodeType === Node.COMMENT_NODE) {
+          string = only.nodeValue;
+        } else if (childResults.length === 1) {
+          string = childResults[0].string;
+        }
+      }
+    }
+    const text = textParts.join('');
+
+    const rect = el.getBoundingClientRect();
+    const hasBox = rect.width > 0 && rect.height > 0;
+    const anyChildVisible = childResults.some((result) => result.visible);
+    const visible = (childrenAncestorsVisible && style.visibility === 'visible' && hasBox) || anyChildVisible;
+
+    const role = roleFor(el, tag);
+    if (role === null) {
+      return remember(el, ancestorsVisible, { node: null, text, string, visible });
+    }
+
+    const attributes = {};
+    let attributeCount = 0;
+    for (const { name, value } of el.attributes) {
+      if (visibleAttributes.has(name)) {
+        attributes[name] = name === 'class' ? value.split(/\s+/).filter(Boolean).join(' ') : value;
+        attributeCount += 1;
+      }
+    }
+
+    let node = { role, name: nameFor(el, tag, role, text, string, childResults.length > 0) };
+    if (attributeCount) node.attributes = attributes;
+    if (!visible) node.visibility = 'hidden';
+
+    if (role === 'heading') {
+      if (has(attributes, 'aria-level')) {
+        const level = parseInt(attributes['aria-level'], 10);
+        node.level = Number.isNaN(level) ? 1 : level;
+      } else {
+        node.level = /^h\d/.test(tag) ? parseInt(tag[1], 10) : 1;
+      }
+    }
+    // activeElement is <body> when nothing has focus.
+    if (attr(el, 'focused') === 'true' || (document.activeElement === el && el !== document.body)) node.focused = true;
+    if (attr(el, 'haspopup')) node.haspopup = attr(el, 'haspopup');
+
+    const children = childResults.filter((result) => result.node).map((result) => result.node);
+    if (children.length) node.children = children;
+
+    if (text && role === 'text' && text !== node.name && !has(attributes, 'aria-label')) {
+      node = { role: 'text', name: text };
+      if (!visible) node.visibility = 'hidden';
+    }
+    return remember(el, ancestorsVisible, { node, text, string, visible });
+  }
+
+  function remember(el, ancestorsVisible, result) {
+    if (cache) cache.set(el, { ancestorsVisible, result });
+    return result;
+  }
+
+  function summarize() {
+    const title = document.title || '';
+    const root = document.body || document.documentElement;
+    if (!root) {
+      return { role: 'WebArea', name: title, children: [] };
+    }
+    const rootStyle = getComputedStyle(document.documentElement);
+    const result = visit(root, root === document.documentElement || !hidesSubtree(document.documentElement, rootStyle));
+    if (!result.node) {
+      return { role: 'WebArea', name: title, children: [] };
+    }
+    // Copy so the cached root node is never modified.
+    return Object.assign({}, result.node, { role: 'WebArea', name: title });
+  }
+
+  if (!args.incremental) {
+    return summarize();
+  }
+
+  let state = window.__operatorDomSummarizer;
+  if (!state || state.document !== document) {
+    state = {
+      document,
+      session: `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`,
+      cache: new WeakMap(),
+      version: 1,
+      summarizedVersion: 0,
+      observer: null,
+    };
+    const invalidateUp = (node) => {
+      let current = node && node.nodeType === Node.ELEMENT_NODE ? node : node && node.parentNode;
+      while (current) {
+        state.cache.delete(current);
+        current = current.parentNode;
+      }
+    };
+    const invalidateSubtree = (el) => {
+      if (!el || el.nodeType !== Node.ELEMENT_NODE) return;
+      for (const descendant of el.getElementsByTagName('*')) state.cache.delete(descendant);
+      invalidateUp(el);
+    };
+    const styleScope = (node) => {
+      const el = node && node.nodeType === Node.ELEMENT_NODE ? node : node && node.parentNode;
+      return el && (el.closest('head') || el.localName === 'style' || el.localName === 'link' || el.closest('style'));
+    };
+    state.apply = (records) => {
+      for (const record of records) {
+        state.version += 1;
+        if (styleScope(record.target)) {
+          // Stylesheet or <head> change: any element may be affected.
+          state.cache = new WeakMap();
+        } else if (record.type === 'attributes') {
+          invalidateSubtree(record.target);
+        } else {
+          invalidateUp(record.target);
+        }
+      }
+    };
+    state.observer = new MutationObserver((records) => state.apply(records));
+    state.observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    const touch = (event) => {
+      state.version += 1;
+      invalidateSubtree(event.target);
+    };
+    for (const type of ['focusin', 'focusout', 'load', 'transitionend', 'animationend']) {
+      document.addEventListener(type, touch, true);
+    }
+    window.addEventListener('resize', () => {
+      state.version += 1;
+      state.cache = new WeakMap();
+    });
+    window.__operatorDomSummarizer = state;
+  }
+
+  state.apply(state.observer.takeRecords());
+  if (!args.force && state.summarizedVersion === state.version) {
+    return { status: 'unchanged', session: state.session, version: state.version, stats };
+  }
+  const fullRun = state.summarizedVersion === 0 || args.force;
+  if (args.force) state.cache = new WeakMap();
+  cache = state.cache;
+  const summary = summarize();
+  state.summarizedVersion = state.version;
+  return {
+    status: fullRun ? 'full' : 'incremental',
+    session: state.session,
+    version: state.version,
+    stats,
+    summary,
+  };
+}
@@ -0,0 +1,129 @@
+# app/infrastructure/sdk_executor.py
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Hashable, TypeVar
+import asyncio
+import threading
+import time
+from app.utils.config import ABACUS_EXECUTOR_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+@dataclass
+class SDKCallTiming:
+    queue_wait: float  # submit -> a worker picked the call up
+    call_time: float   # time spent inside the SDK call
+
+class SDKExecutor:
+    """Runs blocking SDK calls on a bounded thread pool.
+
+    Responsibilities:
+    - Keep one SDK client per worker thread and key, so a client is built (and
+      authenticates) once per thread instead of once per call.
+    - Enforce a timeout per call; calls still queued are cancelled on timeout or when
+      the awaiting task is cancelled. A call already inside the SDK cannot be
+      interrupted and finishes in the background.
+    - Record queue wait and call time.
+    """
+    def __init__(self, max_workers: int = ABACUS_EXECUTOR_CONFIG['max_workers'], name: str = 'sdk'):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.total_call_time = 0.0
+        self.max_call_time = 0.0
+
+    def thread_client(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return this worker thread's client for `key`, building it on first use."""
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if key not in clients:
+            clients[key] = factory()
+            logger.debug(f"Created SDK client in {threading.current_thread().name}")
+        return clients[key]
+
+    def _record(self, queue_wait: float, call_time: Optional[float], failed: bool) -> None:
+        with self._lock:
+            self.total_queue_wait += queue_wait
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+            if call_time is not None:
+                self.calls += 1
+                self.total_call_time += call_time
+                self.max_call_time = max(self.max_call_time, call_time)
+            if failed:
+                self.failures += 1
+
+    async def run(self, fn: Callable[[], T], timeout: Optional[float] = None) -> tuple:
+        """Run `fn` on the pool and return (result, SDKCallTiming).
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish within `timeout` seconds.
+        """
+        submitted = time.perf_counter()
+        timing = {}
+
+        def call():
+            started = time.perf_counter()
+            timing['queue_wait'] = started - submitted
+            failed = True
+            try:
+                result = fn()
+                failed = False
+                return result
+            finally:
+                timing['call_time'] = time.perf_counter() - started
+                self._record(timing['queue_wait'], timing['call_time'], failed)
+
+        future = self._executor.submit(call)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            if future.cancel():
+                self._record(time.perf_counter() - submitted, None, failed=False)
+            raise
+        except asyncio.CancelledError:
+            with self._lock:
+                self.cancelled += 1
+            future.cancel()
+            raise
+        return result, SDKCallTiming(timing['queue_wait'], timing['call_time'])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'calls': self.calls,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'cancelled': self.cancelled,
+                'mean_queue_wait': self.total_queue_wait / self.calls if self.calls else 0.0,
+                'max_queue_wait': self.max_queue_wait,
+                'mean_call_time': self.total_call_time / self.calls if self.calls else 0.0,
+                'max_call_time': self.max_call_time,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+_shared_executor: Optional[SDKExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+def get_abacus_executor() -> SDKExecutor:
+    """Process-wide pool for Abacus.AI SDK calls, sized by ABACUS_MAX_WORKERS."""
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = SDKExecutor(name='abacus-sdk')
+        return _shared_executor
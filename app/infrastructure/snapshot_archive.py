@@ -0,0 +1,271 @@
+# app/infrastructure/snapshot_archive.py
+from typing import Dict, Any, Optional, List, Tuple
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.infrastructure.snapshot_storage import (
+    SnapshotStorage,
+    SnapshotWriter,
+    get_snapshot_context,
+    get_snapshot_writer
+)
+from app.utils.config import SNAPSHOT_ARCHIVE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+def resolve_codec(codec: str) -> str:
+    """Map 'auto' to zstd when the zstandard package is installed, else gzip."""
+    if codec == 'auto':
+        return 'zstd' if zstandard is not None else 'gzip'
+    if codec not in CODEC_SUFFIXES:
+        raise ValueError(f"Unsupported codec: {codec}. Supported codecs: auto, {', '.join(CODEC_SUFFIXES)}")
+    if codec == 'zstd' and zstandard is None:
+        raise ValueError("The zstd codec requires the zstandard package")
+    return codec
+
+def compress(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    # mtime=0 keeps identical content byte-identical on disk.
+    return gzip.compress(data, compresslevel=level or 6, mtime=0)
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise ValueError("Reading zstd blobs requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    run_id TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    blob TEXT NOT NULL REFERENCES blobs(hash),
+    created REAL NOT NULL,
+    PRIMARY KEY (run_id, step, kind)
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+CREATE INDEX IF NOT EXISTS entries_blob ON entries(blob);
+"""
+
+class SnapshotArchive:
+    """Content-addressed, compressed store for step snapshots.
+
+    Responsibilities:
+    - Store each distinct snapshot once, as a compressed blob named by the sha256 of its content.
+    - Keep an SQLite index from (run_id, step, kind) to blob.
+    - Evict entries older than max_age_seconds, then whole runs (oldest first) until the
+      stored blobs fit in max_bytes; blobs no longer referenced are deleted.
+
+    Layout: <base_dir>/index.sqlite3 and <base_dir>/blobs/<hash[:2]>/<hash><.gz|.zst>.
+    """
+    def __init__(
+        self,
+        base_dir: str = SNAPSHOT_ARCHIVE_CONFIG['base_dir'],
+        max_bytes: int = SNAPSHOT_ARCHIVE_CONFIG['max_bytes'],
+        max_age_seconds: Optional[float] = SNAPSHOT_ARCHIVE_CONFIG['max_age_seconds'],
+        codec: str = SNAPSHOT_ARCHIVE_CONFIG['codec'],
+        level: Optional[int] = SNAPSHOT_ARCHIVE_CONFIG['level'],
+        evict_every: int = SNAPSHOT_ARCHIVE_CONFIG['evict_every']
+    ):
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.codec = resolve_codec(codec)
+        self.level = level
+        self.evict_every = evict_every
+        self._puts_since_eviction = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(base_dir, 'blobs'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(base_dir, 'index.sqlite3'), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def _blob_path(self, blob_hash: str, codec: str) -> str:
+        return os.path.join(self.base_dir, 'blobs', blob_hash[:2], blob_hash + CODEC_SUFFIXES[codec])
+
+    def put(self, run_id: str, step: int, kind: str, content: bytes) -> str:
+        """Archive `content` for a run step and return its blob hash."""
+        blob_hash = hashlib.sha256(content).hexdigest()
+        now = time.time()
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM blobs WHERE hash = ?", (blob_hash,)).fetchone()
+            if known is None:
+                stored = compress(content, self.codec, self.level)
+                path = self._blob_path(blob_hash, self.codec)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(stored)
+                os.replace(tmp_path, path)
+                self._db.execute(
+                    "INSERT INTO blobs (hash, codec, raw_size, stored_size, created) VALUES (?, ?, ?, ?, ?)",
+                    (blob_hash, self.codec, len(content), len(stored), now)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (run_id, step, kind, blob, created) VALUES (?, ?, ?, ?, ?)",
+                (run_id, step, kind, blob_hash, now)
+            )
+            self._db.commit()
+            self._puts_since_eviction += 1
+            evict = self.evict_every and self._puts_since_eviction >= self.evict_every
+        if evict:
+            self.evict()
+        return blob_hash
+
+    def get(self, run_id: str, step: int, kind: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT b.hash, b.codec FROM entries e JOIN blobs b ON b.hash = e.blob "
+                "WHERE e.run_id = ? AND e.step = ? AND e.kind = ?",
+                (run_id, step, kind)
+            ).fetchone()
+        if row is None:
+            return None
+        with open(self._blob_path(*row), 'rb') as f:
+            return decompress(f.read(), row[1])
+
+    def load_snapshot(self, run_id: str, step: int) -> Optional[Dict[str, Any]]:
+        content = self.get(run_id, step, 'json')
+        return json.loads(content) if content is not None else None
+
+    def load_html(self, run_id: str, step: int) -> Optional[str]:
+        content = self.get(run_id, step, 'html')
+        return content.decode('utf-8') if content is not None else None
+
+    def runs(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._db.execute(
+                "SELECT run_id FROM entries GROUP BY run_id ORDER BY MIN(created)"
+            )]
+
+    def steps(self, run_id: str) -> List[Tuple[int, str]]:
+        with self._lock:
+            return list(self._db.execute(
+                "SELECT step, kind FROM entries WHERE run_id = ? ORDER BY step, kind", (run_id,)
+            ))
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Apply age and size limits; returns the number of blobs deleted."""
+        now = now if now is not None else time.time()
+        with self._lock:
+            self._puts_since_eviction = 0
+            if self.max_age_seconds:
+                self._db.execute("DELETE FROM entries WHERE created < ?", (now - self.max_age_seconds,))
+            deleted = self._delete_orphans()
+            while self.max_bytes and self._stored_bytes() > self.max_bytes:
+                oldest = self._db.execute(
+                    "SELECT run_id FROM entries GROUP BY run_id ORDER BY MAX(created) LIMIT 1"
+                ).fetchone()
+                if oldest is None:
+                    break
+                self._db.execute("DELETE FROM entries WHERE run_id = ?", oldest)
+                deleted += self._delete_orphans()
+            self._db.commit()
+        if deleted:
+            logger.info(f"Snapshot archive evicted {deleted} blobs")
+        return deleted
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+
+    def _delete_orphans(self) -> int:
+        orphans = self._db.execute(
+            "SELECT hash, codec FROM blobs WHERE NOT EXISTS (SELECT 1 FROM entries WHERE blob = hash)"
+        ).fetchall()
+        for blob_hash, codec in orphans:
+            try:
+                os.remove(self._blob_path(blob_hash, codec))
+            except FileNotFoundError:
+                pass
+        self._db.executemany("DELETE FROM blobs WHERE hash = ?", [(blob_hash,) for blob_hash, _ in orphans])
+        return len(orphans)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            referenced_raw = self._db.execute(
+                "SELECT COALESCE(SUM(b.raw_size), 0) FROM entries e JOIN blobs b ON b.hash = e.blob"
+            ).fetchone()[0]
+            blobs, raw, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+        return {
+            'entries': entries,
+            'blobs': blobs,
+            'logical_bytes': referenced_raw,
+            'raw_bytes': raw,
+            'stored_bytes': stored,
+            # Savings from compression and from deduplication combined.
+            'ratio': referenced_raw / stored if stored else 0.0,
+            'codec': self.codec,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+class ArchiveSnapshotStorage(SnapshotStorage):
+    """SnapshotStorage that archives snapshots from the background writer thread."""
+    kind = 'json'
+
+    def __init__(self, archive: SnapshotArchive, writer: Optional[SnapshotWriter] = None):
+        self.archive = archive
+        self.writer = writer or get_snapshot_writer()
+        self._unscoped_step = 0
+        # Unique per process, so a restart does not replace the unscoped entries of earlier runs.
+        self._unscoped_run = f"unscoped-{int(time.time())}-{os.getpid()}"
+
+    def encode(self, snapshot: Any) -> bytes:
+        # Sorted keys so equal snapshots hash equal.
+        return json.dumps(snapshot, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def save_snapshot(self, snapshot: Any, file_path: Optional[str] = None) -> None:
+        context = get_snapshot_context()
+        if context is None:
+            run_id, step = self._unscoped_run, self._unscoped_step
+            self._unscoped_step += 1
+        else:
+            run_id, step = context.run_id, context.step
+        self.writer.submit_task(
+            f"archive:{run_id}/{step}/{self.kind}",
+            lambda: self.archive.put(run_id, step, self.kind, self.encode(snapshot))
+        )
+
+class ArchiveSnapshotHTMLStorage(ArchiveSnapshotStorage):
+    kind = 'html'
+
+    def encode(self, snapshot: Any) -> bytes:
+        if isinstance(snapshot, str):
+            return snapshot.encode('utf-8')
+        return super().encode(snapshot)
+
+_shared_archive: Optional[SnapshotArchive] = None
+_shared_archive_lock = threading.Lock()
+
+def get_snapshot_archive() -> SnapshotArchive:
+    """Process-wide archive configured from SNAPSHOT_ARCHIVE_CONFIG."""
+    global _shared_archive
+    with _shared_archive_lock:
+        if _shared_archive is None:
+            _shared_archive = SnapshotArchive()
+        return _shared_archive
@@ -0,0 +1,210 @@
+# app/infrastructure/snapshot_dataset.py
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Iterator
+import json
+import mmap
+import os
+import re
+import threading
+from app.infrastructure.snapshot_storage import (
+    SnapshotStorage,
+    SnapshotWriter,
+    get_snapshot_context,
+    get_snapshot_writer
+)
+from app.utils.config import SNAPSHOT_DATASET_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILE = 'index.jsonl'
+_SEGMENT_RE = re.compile(r'^segment-(\d{6})\.jsonl$')
+
+def segment_name(segment: int) -> str:
+    return f"segment-{segment:06d}.jsonl"
+
+@dataclass
+class DatasetEntry:
+    """Index row locating one record; carries every field the dataset can be searched by."""
+    run_id: str
+    step: int
+    kind: str
+    url: Optional[str]
+    gherkin: Optional[str]
+    segment: int
+    offset: int
+    length: int
+
+class SnapshotDatasetWriter:
+    """Appends snapshot records to JSONL segments and their locations to an index.
+
+    Responsibilities:
+    - Write each record as one JSON line, rolling to a new segment past segment_max_bytes.
+    - Append a DatasetEntry per record to index.jsonl.
+    - Resume appending to the last segment of an existing dataset.
+
+    Not thread-safe; the snapshot writer thread is its only user.
+    """
+    def __init__(self, base_dir: str, segment_max_bytes: int = SNAPSHOT_DATASET_CONFIG['segment_max_bytes']):
+        self.base_dir = base_dir
+        self.segment_max_bytes = segment_max_bytes
+        os.makedirs(base_dir, exist_ok=True)
+        segments = sorted(int(m.group(1)) for m in map(_SEGMENT_RE.match, os.listdir(base_dir)) if m)
+        self.segment = segments[-1] if segments else 0
+
+    def append(
+        self,
+        run_id: str,
+        step: int,
+        kind: str,
+        data: Any,
+        url: Optional[str] = None,
+        gherkin: Optional[str] = None
+    ) -> DatasetEntry:
+        line = json.dumps(
+            {'run_id': run_id, 'step': step, 'kind': kind, 'url': url, 'gherkin': gherkin, 'data': data},
+            ensure_ascii=False
+        ).encode('utf-8') + b'\n'
+        path = os.path.join(self.base_dir, segment_name(self.segment))
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size and size + len(line) > self.segment_max_bytes:
+            self.segment += 1
+            path = os.path.join(self.base_dir, segment_name(self.segment))
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(line)
+        entry = DatasetEntry(run_id, step, kind, url, gherkin, self.segment, offset, len(line))
+        with open(os.path.join(self.base_dir, INDEX_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(asdict(entry), ensure_ascii=False) + '\n')
+        return entry
+
+class SnapshotDataset:
+    """Memory-mapped reader over a snapshot dataset.
+
+    Responsibilities:
+    - Load only the index; map segments lazily and decode one record at a time, so
+      iterating a dataset of any size runs in constant memory.
+    - Filter by run id, step, kind, URL or gherkin text (case-insensitive substring)
+      from the index, without touching the segments.
+    """
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self.entries: List[DatasetEntry] = []
+        self._by_run: Dict[str, List[int]] = {}
+        self._maps: Dict[int, tuple] = {}
+        with open(os.path.join(base_dir, INDEX_FILE), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = DatasetEntry(**json.loads(line))
+                except json.JSONDecodeError:
+                    # A write cut short by a crash; everything before it is intact.
+                    logger.warning(f"Skipping truncated index line in {base_dir}")
+                    continue
+                self._by_run.setdefault(entry.run_id, []).append(len(self.entries))
+                self.entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.find()
+
+    def __enter__(self) -> "SnapshotDataset":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def runs(self) -> List[str]:
+        return list(self._by_run)
+
+    def _map(self, segment: int, end: int) -> mmap.mmap:
+        mapped = self._maps.get(segment)
+        if mapped is not None and len(mapped[1]) < end:
+            # The segment grew since it was mapped.
+            mapped[1].close()
+            mapped[0].close()
+            mapped = None
+        if mapped is None:
+            f = open(os.path.join(self.base_dir, segment_name(segment)), 'rb')
+            mapped = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[segment] = mapped
+        return mapped[1]
+
+    def read(self, entry: DatasetEntry) -> Dict[str, Any]:
+        """Decode the record at `entry`."""
+        mapped = self._map(entry.segment, entry.offset + entry.length)
+        return json.loads(mapped[entry.offset:entry.offset + entry.length])
+
+    def select(
+        self,
+        run_id: Optional[str] = None,
+        step: Optional[int] = None,
+        kind: Optional[str] = None,
+        url: Optional[str] = None,
+        gherkin: Optional[str] = None
+    ) -> Iterator[DatasetEntry]:
+        """Yield index entries matching every given filter, in write order."""
+        candidates = (self.entries[i] for i in self._by_run.get(run_id, [])) if run_id is not None else iter(self.entries)
+        needle = gherkin.lower() if gherkin is not None else None
+        for entry in candidates:
+            if step is not None and entry.step != step:
+                continue
+            if kind is not None and entry.kind != kind:
+                continue
+            if url is not None and entry.url != url:
+                continue
+            if needle is not None and needle not in (entry.gherkin or '').lower():
+                continue
+            yield entry
+
+    def find(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Yield decoded records matching `filters` (see select)."""
+        for entry in self.select(**filters):
+            yield self.read(entry)
+
+    def get(self, run_id: str, step: int, kind: str = 'json') -> Optional[Any]:
+        """Return the data of the last record written for a run step, if any."""
+        entry = None
+        for entry in self.select(run_id=run_id, step=step, kind=kind):
+            pass
+        return self.read(entry)['data'] if entry is not None else None
+
+    def close(self) -> None:
+        for f, mapped in self._maps.values():
+            mapped.close()
+            f.close()
+        self._maps.clear()
+
+class DatasetSnapshotStorage(SnapshotStorage):
+    """SnapshotStorage appending records to a SnapshotDataset from the background writer."""
+    kind = 'json'
+
+    def __init__(self, dataset_writer: SnapshotDatasetWriter, writer: Optional[SnapshotWriter] = None):
+        self.dataset_writer = dataset_writer
+        self.writer = writer or get_snapshot_writer()
+
+    def save_snapshot(self, snapshot: Any, file_path: Optional[str] = None) -> None:
+        context = get_snapshot_context()
+        run_id = context.run_id if context else 'unscoped'
+        step = context.step if context else 0
+        url = context.url if context else None
+        gherkin = context.gherkin if context else None
+        self.writer.submit_task(
+            f"dataset:{run_id}/{step}/{self.kind}",
+            lambda: self.dataset_writer.append(run_id, step, self.kind, snapshot, url, gherkin)
+        )
+
+class DatasetSnapshotHTMLStorage(DatasetSnapshotStorage):
+    kind = 'html'
+
+_shared_dataset_writer: Optional[SnapshotDatasetWriter] = None
+_shared_dataset_writer_lock = threading.Lock()
+
+def get_snapshot_dataset_writer() -> SnapshotDatasetWriter:
+    """Process-wide dataset writer configured from SNAPSHOT_DATASET_CONFIG."""
+    global _shared_dataset_writer
+    with _shared_dataset_writer_lock:
+        if _shared_dataset_writer is None:
+            _shared_dataset_writer = SnapshotDatasetWriter(SNAPSHOT_DATASET_CONFIG['base_dir'])
+        return _shared_dataset_writer
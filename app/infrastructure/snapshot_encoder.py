@@ -0,0 +1,171 @@
+# app/infrastructure/snapshot_encoder.py
+from typing import Dict, Any, List, Iterable, Callable, Optional
+import json
+import re
+from app.infrastructure.interfaces import SnapshotEncoderInterface
+from app.infrastructure.streaming_html_summarizer import NodeRecord
+
+EMPTY_SNAPSHOT = {'role': 'WebArea', 'name': '', 'children': []}
+
+Fragment = Callable[[Dict[str, Any], int, List[List[str]]], List[str]]
+
+def assemble_records(records: Iterable[NodeRecord], fragment: Fragment) -> Optional[str]:
+    """Encode post-order records bottom-up; `fragment` encodes a node given its children's text.
+
+    Only the text of subtrees whose parent has not arrived yet is held, never a node tree.
+    Text is kept as lists of parts and joined once, so subtrees are not copied at every
+    level. Returns None for an empty stream.
+    """
+    stack: List[List[str]] = []
+    for record in records:
+        children: List[List[str]] = []
+        if record.child_count:
+            children = stack[-record.child_count:]
+            del stack[-record.child_count:]
+        stack.append(fragment(record.node, record.depth, children))
+    return ''.join(stack[-1]) if stack else None
+
+def _join_parts(parts: List[str], separator: str, children: List[List[str]]) -> List[str]:
+    for index, child in enumerate(children):
+        if index:
+            parts.append(separator)
+        parts.extend(child)
+    return parts
+
+class JSONSnapshotEncoder(SnapshotEncoderInterface):
+    """Pretty-printed JSON, the format the Playwright prompt was written for."""
+    description = (
+        'JSON tree. Each node has "role" and "name", and optionally "attributes", '
+        '"visibility": "hidden", "focused", "level", "haspopup" and "children". '
+        'A node with role "omitted" and a "count" stands for elements left out of the snapshot.'
+    )
+
+    def __init__(self, indent: int = 2):
+        self.indent = indent
+
+    def encode(self, snapshot: Dict[str, Any]) -> str:
+        return json.dumps(snapshot, indent=self.indent)
+
+    def encode_records(self, records: Iterable[NodeRecord]) -> str:
+        text = assemble_records(records, self._fragment)
+        return self.encode(EMPTY_SNAPSHOT) if text is None else text
+
+    def _fragment(self, node: Dict[str, Any], depth: int, children: List[List[str]]) -> List[str]:
+        # A node at depth d sits 2d levels deep in the JSON: its own dict and the children lists above it.
+        pad = ' ' * self.indent
+        level = 2 * depth
+        text = json.dumps(node, indent=self.indent).replace('\n', '\n' + pad * level)
+        if not children:
+            return [text]
+        parts = [text[:text.rfind('\n')], ',\n' + pad * (level + 1) + '"children": [\n' + pad * (level + 2)]
+        _join_parts(parts, ',\n' + pad * (level + 2), children)
+        parts.append('\n' + pad * (level + 1) + ']\n' + pad * level + '}')
+        return parts
+
+class CompactJSONSnapshotEncoder(JSONSnapshotEncoder):
+    """Minified JSON: no indentation, no spaces after separators, non-ASCII kept as is."""
+    description = 'Minified ' + JSONSnapshotEncoder.description
+
+    def encode(self, snapshot: Dict[str, Any]) -> str:
+        return json.dumps(snapshot, separators=(',', ':'), ensure_ascii=False)
+
+    def _fragment(self, node: Dict[str, Any], depth: int, children: List[List[str]]) -> List[str]:
+        text = self.encode(node)
+        if not children:
+            return [text]
+        parts = _join_parts([text[:-1], ',"children":['], ',', children)
+        parts.append(']}')
+        return parts
+
+class OutlineSnapshotEncoder(SnapshotEncoderInterface):
+    """One line per node, indented one space per level, with short attribute keys.
+
+    `link "Docs" #nav-docs .menu.item href=/docs [hidden]` is the outline of
+    {"role": "link", "name": "Docs", "attributes": {"id": "nav-docs", "class": "menu item",
+    "href": "/docs"}, "visibility": "hidden"}.
+    """
+    SHORT_KEYS = {
+        'data-testid': 'testid',
+        'aria-label': 'label',
+        'placeholder': 'ph',
+        'aria-expanded': 'expanded',
+        'aria-selected': 'selected',
+        'aria-checked': 'checked',
+        'aria-controls': 'controls',
+        'aria-describedby': 'describedby',
+        'aria-required': 'required',
+    }
+    _BARE_VALUE = re.compile(r'^[^\s"\[\]=]+$')
+
+    description = (
+        'Indented outline, one node per line; indentation (one space per level) gives nesting '
+        'and line order gives DOM order. A line reads: role "name" #id .class1.class2 key=value '
+        '[hidden] [focused]. Short attribute keys: ' +
+        ', '.join(f'{short}={key}' for key, short in SHORT_KEYS.items()) +
+        '. Other keys are the HTML attribute names. Values with spaces are JSON-quoted. '
+        '[hidden] means "visibility": "hidden". "... N more" stands for N elements left out of the snapshot.'
+    )
+
+    def encode(self, snapshot: Dict[str, Any]) -> str:
+        lines: List[str] = []
+        self._encode_node(snapshot, 0, lines)
+        return '\n'.join(lines)
+
+    def encode_records(self, records: Iterable[NodeRecord]) -> str:
+        text = assemble_records(records, self._fragment)
+        return self.encode(EMPTY_SNAPSHOT) if text is None else text
+
+    def _fragment(self, node: Dict[str, Any], depth: int, children: List[List[str]]) -> List[str]:
+        line = self._line(node, depth)
+        if not children:
+            return [line]
+        return _join_parts([line, '\n'], '\n', children)
+
+    def _value(self, value: Any) -> str:
+        value = str(value)
+        return value if self._BARE_VALUE.match(value) else json.dumps(value, ensure_ascii=False)
+
+    def _encode_node(self, node: Dict[str, Any], depth: int, lines: List[str]) -> None:
+        lines.append(self._line(node, depth))
+        if node.get('role') == 'omitted':
+            return
+        for child in node.get('children', []):
+            self._encode_node(child, depth + 1, lines)
+
+    def _line(self, node: Dict[str, Any], depth: int) -> str:
+        indent = ' ' * depth
+        if node.get('role') == 'omitted':
+            return f"{indent}... {node.get('count', 0)} more"
+
+        parts = [node.get('role') or 'generic']
+        if node.get('name'):
+            parts.append(json.dumps(node['name'], ensure_ascii=False))
+        for key, value in node.get('attributes', {}).items():
+            if key == 'id' and value and self._BARE_VALUE.match(value):
+                parts.append(f'#{value}')
+            elif key == 'class' and value and '.' not in value:
+                parts.append('.' + '.'.join(value.split()))
+            else:
+                parts.append(f'{self.SHORT_KEYS.get(key, key)}={self._value(value)}')
+        if 'level' in node:
+            parts.append(f"level={node['level']}")
+        if node.get('haspopup'):
+            parts.append(f"haspopup={self._value(node['haspopup'])}")
+        if node.get('visibility') == 'hidden':
+            parts.append('[hidden]')
+        if node.get('focused'):
+            parts.append('[focused]')
+        return indent + ' '.join(parts)
+
+def create_snapshot_encoder(snapshot_format: str = "json") -> SnapshotEncoderInterface:
+    """Factory function to create snapshot encoders."""
+    encoders = {
+        "json": JSONSnapshotEncoder,
+        "json_compact": CompactJSONSnapshotEncoder,
+        "outline": OutlineSnapshotEncoder,
+    }
+
+    if snapshot_format not in encoders:
+        raise ValueError(f"Unsupported snapshot format: {snapshot_format}")
+
+    return encoders[snapshot_format]()
@@ -0,0 +1,285 @@
+# app/infrastructure/snapshot_pruner.py
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator
+import math
+from app.infrastructure.interfaces import SnapshotEncoderInterface
+from app.infrastructure.snapshot_encoder import JSONSnapshotEncoder
+from app.infrastructure.streaming_html_summarizer import NodeRecord, drop_hidden_records
+from app.utils.config import SNAPSHOT_PRUNER_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OMITTED_ROLE = 'omitted'
+
+def truncate_node(node: Dict[str, Any], max_length: int, max_attribute_length: int) -> Dict[str, Any]:
+    """Shorten the node's long name and attribute values; modifies and returns `node`."""
+    name = node.get('name')
+    if isinstance(name, str) and len(name) > max_length:
+        node['name'] = name[:max_length] + '...'
+    attributes = node.get('attributes')
+    if attributes:
+        attribute_length = min(max_length, max_attribute_length)
+        node['attributes'] = {
+            key: value[:attribute_length] + '...' if isinstance(value, str) and len(value) > attribute_length else value
+            for key, value in attributes.items()
+        }
+    return node
+
+def truncate_records(records: Iterable[NodeRecord], max_length: int, max_attribute_length: int) -> Iterator[NodeRecord]:
+    """Records with long names and attribute values shortened, as SnapshotPruner truncates them."""
+    for record in records:
+        yield NodeRecord(record.depth, truncate_node(dict(record.node), max_length, max_attribute_length), record.child_count)
+
+def summarize_list_records(records: Iterable[NodeRecord], max_items: int) -> Iterator[NodeRecord]:
+    """Records of the first `max_items` children of every node, plus an omitted marker counting the rest.
+
+    `closed[d]` counts the children the open node at depth d - 1 has so far; once it
+    reaches `max_items`, everything else that closes under that node is dropped.
+    Only one counter per depth is kept.
+    """
+    closed: List[int] = [0]
+    for record in records:
+        depth = record.depth
+        while len(closed) <= depth + 1:
+            closed.append(0)
+        dropped = any(count >= max_items for count in closed[1:depth + 1])
+        closed[depth] += 1
+        for deeper in range(depth + 1, len(closed)):
+            closed[deeper] = 0
+        if dropped:
+            continue
+        child_count = record.child_count
+        if child_count > max_items:
+            omitted = child_count - max_items
+            yield NodeRecord(depth + 1, {'role': OMITTED_ROLE, 'name': f'{omitted} more', 'count': omitted}, 0)
+            child_count = max_items + 1
+        yield NodeRecord(depth, record.node, child_count)
+
+@dataclass
+class PruneStepReport:
+    """Snapshot size before and after one pruning step."""
+    step: str
+    chars_before: int
+    chars_after: int
+    tokens_before: int
+    tokens_after: int
+
+@dataclass
+class PruneResult:
+    """Pruned snapshot, its serialized prompt text and the per-step size report.
+
+    Results of prune_records() have no snapshot and no original size, since the
+    unpruned snapshot was never built.
+    """
+    snapshot: Optional[Dict[str, Any]]
+    text: str
+    original_tokens: Optional[int]
+    tokens: int
+    token_budget: int
+    steps: List[PruneStepReport] = field(default_factory=list)
+
+    @property
+    def within_budget(self) -> bool:
+        return self.tokens <= self.token_budget
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'original_tokens': self.original_tokens,
+            'tokens': self.tokens,
+            'token_budget': self.token_budget,
+            'within_budget': self.within_budget,
+            'steps': [asdict(step) for step in self.steps],
+        }
+
+class SnapshotPruner:
+    """Shrinks a summarized snapshot until its prompt text fits a token budget.
+
+    Responsibilities:
+    - Serialize the snapshot with the encoder that produces the Playwright prompt text.
+    - Apply pruning steps in order, stopping as soon as the budget is met:
+      drop hidden subtrees, collapse single-child generic wrappers, truncate long
+      text, summarize huge child lists.
+    - Tighten the text/list limits and finally cut deep subtrees if still over budget.
+    - Report the size before and after every step that ran.
+
+    The input snapshot is never modified. Snapshots already within budget are returned
+    unchanged, so small pages keep their hidden elements (and therefore their DOM order).
+    Removed children are replaced by {"role": "omitted", "count": N} markers.
+
+    prune_records() prunes a StreamingHTMLSummarizer record stream without building
+    the tree, in a single pass over the records.
+    """
+    def __init__(self, config: Dict = SNAPSHOT_PRUNER_CONFIG, token_budget: Optional[int] = None,
+                 encoder: Optional[SnapshotEncoderInterface] = None):
+        """Initialize with configuration.
+
+        Args:
+            config: Configuration dict, see SNAPSHOT_PRUNER_CONFIG.
+            token_budget: Overrides config['token_budget'].
+            encoder: Serializes snapshots into prompt text; pretty-printed JSON by default.
+        """
+        self.token_budget = token_budget if token_budget is not None else config['token_budget']
+        self.chars_per_token = config['chars_per_token']
+        self.max_text_length = config['max_text_length']
+        self.max_attribute_length = config['max_attribute_length']
+        self.max_list_items = config['max_list_items']
+        self.wrapper_keep_attributes = set(config['wrapper_keep_attributes'])
+        self.min_text_length = config['min_text_length']
+        self.min_list_items = config['min_list_items']
+        self.encoder = encoder or JSONSnapshotEncoder()
+
+    def serialize(self, snapshot: Dict[str, Any]) -> str:
+        return self.encoder.encode(snapshot)
+
+    def estimate_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def prune(self, snapshot: Dict[str, Any]) -> PruneResult:
+        """Prune the snapshot to the token budget."""
+        text = self.serialize(snapshot)
+        result = PruneResult(
+            snapshot=snapshot,
+            text=text,
+            original_tokens=self.estimate_tokens(text),
+            tokens=self.estimate_tokens(text),
+            token_budget=self.token_budget,
+        )
+
+        steps: List[tuple] = [
+            ('drop_hidden', self._drop_hidden),
+            ('collapse_wrappers', self._collapse_wrappers),
+            ('truncate_text', lambda node: self._truncate_text(node, self.max_text_length)),
+            ('summarize_lists', lambda node: self._summarize_lists(node, self.max_list_items)),
+        ]
+        for name, step in steps:
+            if result.within_budget:
+                return result
+            self._apply(result, name, step)
+
+        text_length, list_items = self.max_text_length, self.max_list_items
+        while not result.within_budget and (text_length > self.min_text_length or list_items > self.min_list_items):
+            text_length = max(self.min_text_length, text_length // 2)
+            list_items = max(self.min_list_items, list_items // 2)
+            self._apply(
+                result, f'tighten(text={text_length}, items={list_items})',
+                lambda node: self._summarize_lists(self._truncate_text(node, text_length), list_items)
+            )
+
+        if not result.within_budget:
+            depth = self._depth(result.snapshot)
+            before = (len(result.text), result.tokens)
+            while not result.within_budget and depth > 1:
+                depth -= 1
+                result.snapshot = self._limit_depth(result.snapshot, depth)
+                result.text = self.serialize(result.snapshot)
+                result.tokens = self.estimate_tokens(result.text)
+            result.steps.append(PruneStepReport(
+                f'limit_depth({depth})', before[0], len(result.text), before[1], result.tokens
+            ))
+
+        if not result.within_budget:
+            logger.warning(f"Snapshot still exceeds token budget: {result.tokens} > {self.token_budget}")
+        return result
+
+    def prune_records(self, records: Iterable[NodeRecord]) -> PruneResult:
+        """Prune and encode a post-order record stream in one pass, without building the tree.
+
+        A stream can be read only once, so its size is not known before pruning and the
+        steps cannot stop at the budget: hidden subtrees are dropped, text truncated and
+        lists summarized at the configured limits on every page. Wrapper collapsing, the
+        tightening loop and the depth limit need the whole tree and are not applied; use
+        prune() on the built tree for pages that must meet the budget.
+        """
+        records = drop_hidden_records(records)
+        records = truncate_records(records, self.max_text_length, self.max_attribute_length)
+        records = summarize_list_records(records, self.max_list_items)
+        text = self.encoder.encode_records(records)
+        result = PruneResult(
+            snapshot=None,
+            text=text,
+            original_tokens=None,
+            tokens=self.estimate_tokens(text),
+            token_budget=self.token_budget,
+        )
+        if not result.within_budget:
+            logger.warning(f"Streamed snapshot exceeds token budget: {result.tokens} > {self.token_budget}")
+        return result
+
+    def _apply(self, result: PruneResult, name: str, step: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+        chars_before, tokens_before = len(result.text), result.tokens
+        result.snapshot = step(result.snapshot)
+        result.text = self.serialize(result.snapshot)
+        result.tokens = self.estimate_tokens(result.text)
+        result.steps.append(PruneStepReport(name, chars_before, len(result.text), tokens_before, result.tokens))
+
+    @staticmethod
+    def _with_children(node: Dict[str, Any], children: List[Dict[str, Any]]) -> Dict[str, Any]:
+        pruned = {key: value for key, value in node.items() if key != 'children'}
+        if children:
+            pruned['children'] = children
+        return pruned
+
+    def _drop_hidden(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Remove subtrees marked hidden. The root is kept even when hidden."""
+        children = [
+            self._drop_hidden(child) for child in node.get('children', [])
+            if child.get('visibility') != 'hidden'
+        ]
+        return self._with_children(node, children)
+
+    def _is_wrapper(self, node: Dict[str, Any]) -> bool:
+        return (
+            node.get('role') == 'generic' and
+            not node.get('name') and
+            len(node.get('children', [])) == 1 and
+            not self.wrapper_keep_attributes.intersection(node.get('attributes', {})) and
+            not any(key in node for key in ('visibility', 'focused', 'haspopup'))
+        )
+
+    def _collapse_wrappers(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace nameless generic nodes that have a single child with that child."""
+        children = []
+        for child in node.get('children', []):
+            while self._is_wrapper(child):
+                child = child['children'][0]
+            children.append(self._collapse_wrappers(child))
+        return self._with_children(node, children)
+
+    def _truncate_text(self, node: Dict[str, Any], max_length: int) -> Dict[str, Any]:
+        """Shorten long names and attribute values."""
+        pruned = self._with_children(node, [self._truncate_text(child, max_length) for child in node.get('children', [])])
+        return truncate_node(pruned, max_length, self.max_attribute_length)
+
+    def _summarize_lists(self, node: Dict[str, Any], max_items: int) -> Dict[str, Any]:
+        """Keep the first max_items children of long child lists and count the rest."""
+        children = node.get('children', [])
+        omitted = 0
+        if children and children[-1].get('role') == OMITTED_ROLE:
+            omitted = children[-1].get('count', 0)
+            children = children[:-1]
+        if len(children) > max_items:
+            omitted += len(children) - max_items
+            children = children[:max_items]
+        children = [self._summarize_lists(child, max_items) for child in children]
+        if omitted:
+            children.append({'role': OMITTED_ROLE, 'name': f'{omitted} more', 'count': omitted})
+        return self._with_children(node, children)
+
+    def _depth(self, node: Dict[str, Any]) -> int:
+        return 1 + max((self._depth(child) for child in node.get('children', [])), default=0)
+
+    def _count(self, node: Dict[str, Any]) -> int:
+        if node.get('role') == OMITTED_ROLE:
+            return node.get('count', 0)
+        return 1 + sum(self._count(child) for child in node.get('children', []))
+
+    def _limit_depth(self, node: Dict[str, Any], depth: int) -> Dict[str, Any]:
+        """Replace everything below the given depth by an omitted marker."""
+        children = node.get('children', [])
+        if not children:
+            return node
+        if depth <= 1:
+            count = sum(self._count(child) for child in children)
+            return self._with_children(node, [{'role': OMITTED_ROLE, 'name': f'{count} more', 'count': count}])
+        return self._with_children(node, [self._limit_depth(child, depth - 1) for child in children])
@@ -1,6 +1,18 @@
 # app/infrastructure/snapshot_storage.py
-from typing import Dict, Any
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable
+import atexit
+import itertools
 import json
+import os
+import threading
+import time
+from app.utils.config import SNAPSHOT_STORAGE_CONFIG
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 class SnapshotStorage:
     def save_snapshot(self, snapshot: Dict[str, Any], file_path: str = "snapshot_json.log") -> None:
@@ -10,4 +22,235 @@ class SnapshotStorage:
 class SnapshotHTMLStorage:
     def save_snapshot(self, snapshot: Dict[str, Any], file_path: str = "snapshot_html_json.log") -> None:
         with open(file_path, mode='w', encoding='utf-8') as f:
-            json.dump(snapshot, f, indent=2)
\ No newline at end of file
+            json.dump(snapshot, f, indent=2)
+
+@dataclass(frozen=True)
+class SnapshotContext:
+    run_id: str
+    step: int
+    url: Optional[str] = None
+    gherkin: Optional[str] = None
+
+# Set by the runner around each case/step; asyncio tasks get their own copy, so
+# concurrent cases never share paths.
+_snapshot_context: ContextVar[Optional[SnapshotContext]] = ContextVar('snapshot_context', default=None)
+
+def set_snapshot_context(
+    run_id: str,
+    step: int = 0,
+    url: Optional[str] = None,
+    gherkin: Optional[str] = None
+) -> Token:
+    """Scope subsequent snapshot saves in this task to a run and step (and its page URL and gherkin)."""
+    return _snapshot_context.set(SnapshotContext(run_id, step, url, gherkin))
+
+def reset_snapshot_context(token: Token) -> None:
+    _snapshot_context.reset(token)
+
+def get_snapshot_context() -> Optional[SnapshotContext]:
+    return _snapshot_context.get()
+
+OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+class SnapshotWriter:
+    """Writes snapshot files from a background thread.
+
+    Responsibilities:
+    - Accept write jobs without touching the disk on the caller's thread.
+    - Bound the number of pending jobs and apply the overflow policy when full:
+      drop_newest rejects the new job, drop_oldest discards the oldest pending one,
+      block waits up to block_timeout for room and then drops the new job.
+    - Write each file atomically (temporary file + rename) and count outcomes.
+    """
+    def __init__(
+        self,
+        max_pending: int = SNAPSHOT_STORAGE_CONFIG['max_pending'],
+        overflow_policy: str = SNAPSHOT_STORAGE_CONFIG['overflow_policy'],
+        block_timeout: float = SNAPSHOT_STORAGE_CONFIG['block_timeout']
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow_policy}. Supported policies: {', '.join(OVERFLOW_POLICIES)}")
+        self.max_pending = max_pending
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self._jobs: deque = deque()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name='snapshot-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def may_block(self) -> bool:
+        """Whether submit() can wait for room in the queue (the 'block' policy)."""
+        return self.overflow_policy == 'block'
+
+    def submit(self, path: str, render: Callable[[], str]) -> bool:
+        """Queue `render()` to be written to `path`; returns False if the job was dropped.
+
+        `render` runs on the writer thread, so serialization stays off the caller's thread too.
+        """
+        return self.submit_task(path, lambda: self._write(path, render()))
+
+    def submit_task(self, label: str, task: Callable[[], None]) -> bool:
+        """Queue an arbitrary persistence task under the same bound and overflow policy."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Snapshot writer is closed")
+            if len(self._jobs) >= self.max_pending:
+                if self.overflow_policy == 'drop_oldest':
+                    dropped_label, _ = self._jobs.popleft()
+                    self.dropped += 1
+                    logger.warning(f"Snapshot queue full, dropped pending write to {dropped_label}")
+                elif self.overflow_policy == 'block':
+                    self._condition.wait_for(lambda: len(self._jobs) < self.max_pending, self.block_timeout)
+                if len(self._jobs) >= self.max_pending:
+                    self.dropped += 1
+                    logger.warning(f"Snapshot queue full, dropped write to {label}")
+                    return False
+            self._jobs.append((label, task))
+            self._condition.notify_all()
+            return True
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._jobs or self._closed)
+                if not self._jobs:
+                    return
+                label, task = self._jobs.popleft()
+                self._in_flight += 1
+                self._condition.notify_all()
+            try:
+                task()
+                written = True
+            except Exception as e:
+                written = False
+                logger.warning(f"Failed to save snapshot to {label}: {str(e)}")
+            with self._condition:
+                self._in_flight -= 1
+                if written:
+                    self.written += 1
+                else:
+                    self.failed += 1
+                self._condition.notify_all()
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, mode='w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued job is written; returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._jobs and not self._in_flight, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'pending': len(self._jobs) + self._in_flight,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'overflow_policy': self.overflow_policy,
+            }
+
+_shared_writer: Optional[SnapshotWriter] = None
+_shared_writer_lock = threading.Lock()
+
+def get_snapshot_writer() -> SnapshotWriter:
+    """Process-wide writer, flushed for a few seconds at interpreter exit."""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = SnapshotWriter()
+            atexit.register(_shared_writer.close)
+        return _shared_writer
+
+class AsyncSnapshotStorage(SnapshotStorage):
+    """Persists step snapshots per run without blocking the step loop.
+
+    Responsibilities:
+    - Resolve <base_dir>/<run_id>/step_<n><suffix> from the current snapshot context.
+    - Hand serialization and the write to a SnapshotWriter.
+
+    Snapshots are serialized later on the writer thread and must not be mutated after saving.
+    """
+    suffix = '.json'
+
+    def __init__(
+        self,
+        base_dir: str = SNAPSHOT_STORAGE_CONFIG['base_dir'],
+        writer: Optional[SnapshotWriter] = None,
+        indent: Optional[int] = SNAPSHOT_STORAGE_CONFIG['indent']
+    ):
+        self.base_dir = base_dir
+        self.writer = writer or get_snapshot_writer()
+        self.indent = indent
+        self._unscoped_steps = itertools.count()
+        self._unscoped_run = f"unscoped-{int(time.time())}-{os.getpid()}"
+
+    def path_for(self, context: Optional[SnapshotContext]) -> str:
+        if context is None:
+            context = SnapshotContext(self._unscoped_run, next(self._unscoped_steps))
+        return os.path.join(self.base_dir, context.run_id, f"step_{context.step:03d}{self.suffix}")
+
+    def render(self, snapshot: Any) -> str:
+        return json.dumps(snapshot, indent=self.indent, ensure_ascii=False)
+
+    def save_snapshot(self, snapshot: Any, file_path: Optional[str] = None) -> None:
+        path = file_path or self.path_for(get_snapshot_context())
+        self.writer.submit(path, lambda: self.render(snapshot))
+
+class AsyncSnapshotHTMLStorage(AsyncSnapshotStorage):
+    """Same as AsyncSnapshotStorage for the raw page HTML, written as-is."""
+    suffix = '.html'
+
+    def render(self, snapshot: Any) -> str:
+        return snapshot if isinstance(snapshot, str) else json.dumps(snapshot, indent=self.indent)
+
+def create_snapshot_storages(backend: Optional[str] = None) -> tuple:
+    """Create the (json, html) storages used by the runner.
+
+    Args:
+        backend: "files" (per-run step files), "delta" (step files, HTML as a delta-encoded
+            history), "archive" (compressed, content-addressed) or "dataset" (indexed JSONL
+            segments); defaults to SNAPSHOT_STORAGE_BACKEND.
+    """
+    backend = backend or SNAPSHOT_STORAGE_CONFIG['backend']
+    if backend == 'files':
+        return AsyncSnapshotStorage(), AsyncSnapshotHTMLStorage()
+    if backend == 'delta':
+        from app.infrastructure.html_history import DeltaSnapshotHTMLStorage
+        return AsyncSnapshotStorage(), DeltaSnapshotHTMLStorage()
+    if backend == 'archive':
+        from app.infrastructure.snapshot_archive import (
+            ArchiveSnapshotStorage,
+            ArchiveSnapshotHTMLStorage,
+            get_snapshot_archive
+        )
+        archive = get_snapshot_archive()
+        return ArchiveSnapshotStorage(archive), ArchiveSnapshotHTMLStorage(archive)
+    if backend == 'dataset':
+        from app.infrastructure.snapshot_dataset import (
+            DatasetSnapshotStorage,
+            DatasetSnapshotHTMLStorage,
+            get_snapshot_dataset_writer
+        )
+        dataset_writer = get_snapshot_dataset_writer()
+        return DatasetSnapshotStorage(dataset_writer), DatasetSnapshotHTMLStorage(dataset_writer)
+    raise ValueError(f"Unsupported snapshot storage backend: {backend}. Supported backends: files, delta, archive, dataset")
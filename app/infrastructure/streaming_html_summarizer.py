@@ -0,0 +1,328 @@
+# app/infrastructure/streaming_html_summarizer.py
+from dataclasses import dataclass
+from typing import Dict, Optional, List, Any, Iterator, Iterable, Union, IO, Tuple
+from lxml import etree
+from app.utils.config import HTML_SUMMARIZER_CONFIG
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)  # Set to DEBUG for detailed logging
+
+HTMLSource = Union[str, bytes, IO, Iterable[Union[str, bytes]]]
+
+# Elements whose content libxml2's push parser cannot resume when a chunk ends inside it.
+RAW_TEXT_TAGS = ('script', 'style', 'textarea', 'title', 'xmp', 'iframe', 'noembed', 'noframes', 'noscript')
+
+@dataclass
+class NodeRecord:
+    """One summarized node, emitted once its element is closed.
+
+    Records arrive in post-order: a node's `child_count` children are the last
+    `child_count` sibling records emitted before it at depth + 1. `node` never has
+    a 'children' key; build_tree() puts the tree back together.
+    """
+    depth: int
+    node: Dict[str, Any]
+    child_count: int
+
+class _Frame:
+    """Parse state of an open element."""
+    __slots__ = (
+        'element', 'role', 'hidden_by_attributes', 'is_mobile_nav', 'ancestors_visible',
+        'children_ancestors_visible', 'is_container', 'in_container', 'in_body', 'depth',
+        'results', 'record_count', 'buffer', 'first_focus', 'signature',
+    )
+
+class StreamingHTMLSummarizer(LxmlHTMLSummarizer):
+    """Summarizes HTML incrementally with lxml's HTMLPullParser.
+
+    Responsibilities:
+    - Feed the HTML to the parser in chunks (from a string, file or chunk iterator).
+    - Compute each element's node when its end tag is parsed, yield it as a NodeRecord
+      and clear the element, so neither the full HTML tree nor the full JSON tree is
+      ever held in memory.
+    - Apply the same role mapping, naming and visibility rules as LxmlHTMLSummarizer.
+
+    Subtrees that may still be dropped when their element closes (role None, or a
+    'text' node that is replaced by its text) are buffered until then; everything
+    else is yielded as soon as it is complete.
+
+    Differences from LxmlHTMLSummarizer: documents without <body> produce an empty
+    WebArea, and a <title> placed after </body> is ignored.
+    """
+    def __init__(self, config: Dict = HTML_SUMMARIZER_CONFIG, chunk_size: int = 64 * 1024):
+        """Initialize with configuration.
+
+        Args:
+            config: Configuration dict with role_map, input_type_map, and visible_attributes.
+            chunk_size: Characters (or bytes) fed to the parser at a time.
+        """
+        super().__init__(config=config)
+        self.chunk_size = chunk_size
+
+    def _chunks(self, source: HTMLSource) -> Iterator[Union[str, bytes]]:
+        if isinstance(source, (str, bytes)):
+            for start in range(0, len(source), self.chunk_size):
+                yield source[start:start + self.chunk_size]
+        elif hasattr(source, 'read'):
+            while True:
+                chunk = source.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        else:
+            yield from source
+
+    @staticmethod
+    def _safe_split(buffer: Union[str, bytes]) -> int:
+        """Return where buffer can be cut: never inside a tag or an unclosed raw-text element."""
+        as_text = buffer if isinstance(buffer, str) else buffer.decode('latin-1')
+        lowered = as_text.lower()
+        cut = lowered.rfind('<')
+        if cut == -1:
+            cut = len(lowered)
+        # Moving the cut back can leave another raw-text element open, so repeat until stable.
+        while cut:
+            prefix = lowered[:cut]
+            unclosed = [
+                opened for opened, closed in (
+                    (prefix.rfind('<' + tag), prefix.rfind('</' + tag)) for tag in RAW_TEXT_TAGS
+                ) if opened > closed
+            ]
+            if not unclosed:
+                break
+            cut = min(unclosed)
+        return cut
+
+    def _feed_chunks(self, source: HTMLSource) -> Iterator[Union[str, bytes]]:
+        """Regroup source chunks so each piece ends at a point the push parser can resume from."""
+        carry = None
+        for chunk in self._chunks(source):
+            buffer = chunk if carry is None else carry + chunk
+            cut = self._safe_split(buffer)
+            if cut:
+                yield buffer[:cut]
+            carry = buffer[cut:]
+        if carry:
+            yield carry
+
+    def iter_records(self, source: HTMLSource) -> Iterator[NodeRecord]:
+        """Yield summarized nodes in post-order while the HTML is being parsed.
+
+        The last record is the <body> node, renamed to WebArea with the page title.
+        """
+        parser = etree.HTMLPullParser(events=('start', 'end'), recover=True)
+        stack: List[_Frame] = []
+        state = {'title': None}
+        for chunk in self._feed_chunks(source):
+            parser.feed(chunk)
+            yield from self._process_events(parser, stack, state)
+        try:
+            parser.close()
+        except etree.XMLSyntaxError as e:
+            logger.debug(f"Parser close reported: {str(e)}")
+        yield from self._process_events(parser, stack, state)
+
+    def _process_events(self, parser: etree.HTMLPullParser, stack: List[_Frame], state: Dict) -> Iterator[NodeRecord]:
+        for event, element in parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            if event == 'start':
+                self._open(element, stack)
+            else:
+                yield from self._close(element, stack, state)
+
+    def _open(self, element: etree._Element, stack: List[_Frame]) -> None:
+        parent = stack[-1] if stack else None
+        frame = _Frame()
+        frame.element = element
+        frame.role = self.tag_to_role(element)
+        frame.hidden_by_attributes = self._is_hidden_by_attributes(element)
+        frame.is_mobile_nav = self._is_mobile_nav(element)
+        frame.ancestors_visible = parent.children_ancestors_visible if parent else True
+        frame.children_ancestors_visible = (
+            frame.ancestors_visible and not frame.hidden_by_attributes and not frame.is_mobile_nav
+        )
+        frame.is_container = element.tag in self.STRING_CONTAINER_TAGS
+        frame.in_container = bool(parent) and (parent.in_container or parent.is_container)
+        frame.in_body = element.tag == 'body' or bool(parent and parent.in_body)
+        frame.depth = parent.depth + 1 if parent and parent.in_body else 0
+        frame.results = []
+        frame.record_count = 0
+        # Descendant records are held back if this node may still drop them.
+        frame.buffer = [] if frame.in_body and (frame.role is None or frame.role == 'text') else None
+        frame.first_focus = None
+        frame.signature = None
+        if element.get('focus') is not None:
+            # First focus-bearing descendant, in document order, of every open ancestor.
+            for ancestor in stack:
+                if ancestor.first_focus is None:
+                    ancestor.first_focus = frame
+        stack.append(frame)
+
+    def _close(self, element: etree._Element, stack: List[_Frame], state: Dict) -> Iterator[NodeRecord]:
+        frame = stack.pop()
+        parent = stack[-1] if stack else None
+        tag = element.tag
+
+        free_parts = []
+        contents_count = 0
+        only_child = None
+        results = iter(frame.results)
+        last_result = None
+        if element.text:
+            contents_count += 1
+            stripped = element.text.strip()
+            if stripped:
+                free_parts.append(stripped)
+        for child in element:
+            contents_count += 1
+            only_child = child
+            if isinstance(child.tag, str):
+                last_result = next(results)
+                if last_result[0] and not last_result[1]:
+                    free_parts.append(last_result[0])
+            if child.tail:
+                contents_count += 1
+                stripped = child.tail.strip()
+                if stripped:
+                    free_parts.append(stripped)
+        free_text = ''.join(free_parts)
+
+        if contents_count != 1:
+            string = None
+        elif element.text:
+            string = element.text
+        elif isinstance(only_child.tag, str):
+            string = last_result[2]
+        else:
+            string = only_child.text
+
+        text = free_text if frame.is_container or not frame.in_container else ''
+
+        if frame.hidden_by_attributes:
+            subtree_visible = False
+        elif tag in self.INTERACTIVE_TAGS or element.get('role') in self.INTERACTIVE_ROLES:
+            subtree_visible = bool(text or len(element.attrib) or frame.results)
+        elif tag in self.SPECIAL_TAGS:
+            subtree_visible = True
+        elif text:
+            subtree_visible = True
+        else:
+            subtree_visible = not frame.is_mobile_nav and any(result[3] for result in frame.results)
+
+        if frame.first_focus is not None or element.get('focus') is not None:
+            frame.signature = (tag, dict(element.attrib), element.text or '', len(element))
+        if tag == 'title' and state['title'] is None:
+            state['title'] = ' '.join(
+                stripped for stripped in (s.strip() for s in self._iter_strings(element)) if stripped
+            )
+
+        if parent is not None:
+            parent.results.append((free_text, frame.is_container, string, subtree_visible))
+
+        if frame.in_body and frame.role is not None:
+            node, replaced = self._node(element, frame, text, string, subtree_visible, parent)
+            if tag == 'body' and not (parent and parent.in_body):
+                node['role'] = 'WebArea'
+                node['name'] = state['title'] or ''
+            record = NodeRecord(frame.depth, node, 0 if replaced else frame.record_count)
+            sink = next((ancestor.buffer for ancestor in reversed(stack) if ancestor.buffer is not None), None)
+            pending = [] if replaced or frame.buffer is None else frame.buffer
+            pending.append(record)
+            if sink is not None:
+                sink.extend(pending)
+            else:
+                yield from pending
+            if parent is not None:
+                parent.record_count += 1
+
+        # Free the subtree; tails stay until the parent closes, since they belong to it.
+        element.clear(keep_tail=True)
+
+    def _node(self, element: etree._Element, frame: _Frame, text: str, string: Optional[str],
+              subtree_visible: bool, parent: Optional[_Frame]) -> Tuple[Dict[str, Any], bool]:
+        """Build the node dict; the flag tells whether a 'text' node replaced its subtree by its text."""
+        tag = element.tag
+        role = frame.role
+        is_visible = frame.ancestors_visible and subtree_visible
+        attributes = {
+            key: value for key, value in element.attrib.items()
+            if key in self.visible_attributes
+        }
+        if 'class' in attributes:
+            attributes['class'] = ' '.join(attributes['class'].split())
+
+        name = self.get_name(element, text, role, string, bool(frame.results))
+        node = {'role': role, 'name': name}
+        if attributes:
+            node['attributes'] = attributes
+        if not is_visible:
+            node['visibility'] = 'hidden'
+
+        if role == 'heading':
+            if 'aria-level' in attributes:
+                try:
+                    node['level'] = int(attributes['aria-level'])
+                except ValueError:
+                    node['level'] = 1
+            else:
+                node['level'] = int(tag[1]) if tag.startswith('h') and tag[1].isdigit() else 1
+
+        if element.get('focused') == 'true' or (
+            tag in ['input', 'textarea'] and element.get('focus') is not None and parent is not None and
+            parent.first_focus is not None and
+            (parent.first_focus is frame or parent.first_focus.signature == frame.signature)
+        ):
+            node['focused'] = True
+
+        if element.get('haspopup'):
+            node['haspopup'] = element.get('haspopup')
+
+        if text and role == 'text' and text != name and 'aria-label' not in attributes:
+            node = {'role': 'text', 'name': text}
+            if not is_visible:
+                node['visibility'] = 'hidden'
+            return node, True
+        return node, False
+
+    def summarize_html(self, html_content: HTMLSource) -> Dict[str, Any]:
+        """Convert HTML to JSON DOM for elements, including visibility status."""
+        if html_content is None:
+            logger.error("html_content is None")
+            raise ValueError("html_content cannot be None")
+        if isinstance(html_content, (str, bytes)) and not html_content.strip():
+            return {'role': 'WebArea', 'name': '', 'visibility': 'hidden'}
+        return build_tree(self.iter_records(html_content))
+
+def build_tree(records: Iterable[NodeRecord]) -> Dict[str, Any]:
+    """Assemble post-order records into the nested JSON DOM."""
+    stack: List[Dict[str, Any]] = []
+    for record in records:
+        node = record.node
+        if record.child_count:
+            children = stack[-record.child_count:]
+            del stack[-record.child_count:]
+            node = dict(node, children=children)
+        stack.append(node)
+    if not stack:
+        return {'role': 'WebArea', 'name': '', 'children': []}
+    return stack[-1]
+
+def drop_hidden_records(records: Iterable[NodeRecord]) -> Iterator[NodeRecord]:
+    """Filter out hidden nodes while streaming.
+
+    A hidden node only has hidden descendants, so dropping every hidden record removes
+    whole subtrees; visible parents get their child counts reduced to match.
+    """
+    kept: List[bool] = []
+    for record in records:
+        visible_children = 0
+        if record.child_count:
+            visible_children = sum(kept[-record.child_count:])
+            del kept[-record.child_count:]
+        visible = record.node.get('visibility') != 'hidden' or record.depth == 0
+        kept.append(visible)
+        if visible:
+            yield NodeRecord(record.depth, record.node, visible_children)
@@ -0,0 +1,157 @@
+# app/infrastructure/summarizer_pool.py
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Any, Tuple
+import asyncio
+import multiprocessing
+import os
+import threading
+from app.utils.config import HTML_SUMMARIZER_CONFIG
+from app.infrastructure.interfaces import HTMLSummarizerInterface, AsyncHTMLSummarizerInterface
+from app.domain.exceptions import SnapshotParsingException
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Summarizer owned by the current worker process (process pools) or thread (thread pools).
+_worker_summarizer: Optional[HTMLSummarizerInterface] = None
+_thread_state = threading.local()
+
+def _init_process_worker(summarizer_type: str, config: Dict) -> None:
+    """Build the worker's summarizer once, so tasks only ship HTML in and JSON out."""
+    global _worker_summarizer
+    from app.infrastructure.html_summarizer import create_html_summarizer
+    _worker_summarizer = create_html_summarizer(summarizer_type, config=config)
+
+def _summarize_in_process(html_content: str) -> Dict[str, Any]:
+    return _worker_summarizer.summarize_html(html_content)
+
+def _init_thread_worker(summarizer_type: str, config: Dict) -> None:
+    from app.infrastructure.html_summarizer import create_html_summarizer
+    _thread_state.summarizer = create_html_summarizer(summarizer_type, config=config)
+
+def _summarize_in_thread(html_content: str) -> Dict[str, Any]:
+    return _thread_state.summarizer.summarize_html(html_content)
+
+# Executors are shared process-wide per (executor type, summarizer type, workers).
+_executors: Dict[Tuple[str, str, int], Executor] = {}
+_executors_lock = threading.Lock()
+
+def _get_executor(executor_type: str, summarizer_type: str, max_workers: int, config: Dict) -> Executor:
+    key = (executor_type, summarizer_type, max_workers)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            if executor_type == "process":
+                # spawn: forking a process that runs an event loop and browser drivers is unsafe.
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_process_worker,
+                    initargs=(summarizer_type, config),
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f"summarizer-{summarizer_type}",
+                    initializer=_init_thread_worker,
+                    initargs=(summarizer_type, config),
+                )
+            _executors[key] = executor
+            logger.info(f"Started {executor_type} pool with {max_workers} workers for '{summarizer_type}' summarizer")
+        return executor
+
+def shutdown_summarizer_pools(wait: bool = True) -> None:
+    """Shut down every shared summarizer pool."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+class OffloadedHTMLSummarizer(HTMLSummarizerInterface, AsyncHTMLSummarizerInterface):
+    """Runs an HTML summarizer in a bounded worker pool instead of on the event loop.
+
+    Responsibilities:
+    - Keep one shared pool per summarizer type, whose workers build their summarizer
+      from HTML_SUMMARIZER_CONFIG once at start-up.
+    - Limit the pages waiting for a worker (max_pending) so large HTML strings do not
+      pile up in the pool's queue.
+    - Surface worker crashes as SnapshotParsingException.
+
+    Process pools suit the BeautifulSoup summarizer, whose tree walk holds the GIL.
+    Thread pools avoid pickling the page and are enough to keep the loop responsive
+    with the faster lxml backend.
+    """
+    EXECUTOR_TYPES = ("process", "thread")
+
+    def __init__(
+        self,
+        summarizer_type: str = "beautifulsoup",
+        executor_type: str = "process",
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        config: Dict = HTML_SUMMARIZER_CONFIG
+    ):
+        """Initialize the pool settings.
+
+        Args:
+            summarizer_type: create_html_summarizer type run by the workers.
+            executor_type: 'process' or 'thread'.
+            max_workers: Pool size; defaults to HTML_SUMMARIZER_WORKERS or min(4, CPU count).
+            max_pending: Pages allowed in flight at once; defaults to 2 * max_workers.
+            config: Summarizer configuration sent to the workers.
+        """
+        if executor_type not in self.EXECUTOR_TYPES:
+            raise ValueError(f"Unsupported summarizer executor type: {executor_type}")
+        self.summarizer_type = summarizer_type
+        self.executor_type = executor_type
+        self.max_workers = max_workers or int(os.getenv("HTML_SUMMARIZER_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_pending = max_pending or 2 * self.max_workers
+        self.config = config
+        self._pending = asyncio.Semaphore(self.max_pending)
+        self._local_summarizer: Optional[HTMLSummarizerInterface] = None
+
+    @property
+    def executor(self) -> Executor:
+        return _get_executor(self.executor_type, self.summarizer_type, self.max_workers, self.config)
+
+    async def summarize_html_async(self, html_content: str) -> Dict[str, Any]:
+        """Summarize HTML in the worker pool."""
+        if html_content is None:
+            raise ValueError("html_content cannot be None")
+        loop = asyncio.get_running_loop()
+        async with self._pending:
+            task = _summarize_in_process if self.executor_type == "process" else _summarize_in_thread
+            try:
+                return await loop.run_in_executor(self.executor, task, html_content)
+            except BrokenProcessPool as e:
+                with _executors_lock:
+                    _executors.pop((self.executor_type, self.summarizer_type, self.max_workers), None)
+                raise SnapshotParsingException(f"Summarizer worker crashed: {str(e)}") from e
+
+    def summarize_html(self, html_content: str) -> Dict[str, Any]:
+        """Summarize HTML in the calling thread (for synchronous callers)."""
+        if self._local_summarizer is None:
+            from app.infrastructure.html_summarizer import create_html_summarizer
+            self._local_summarizer = create_html_summarizer(self.summarizer_type, config=self.config)
+        return self._local_summarizer.summarize_html(html_content)
+
+def create_offloaded_html_summarizer(
+    summarizer_type: str = "beautifulsoup",
+    executor_type: Optional[str] = None,
+    **kwargs: Any
+) -> HTMLSummarizerInterface:
+    """Factory function to create a summarizer that runs off the event loop.
+
+    executor_type 'auto' (the default) picks a process pool for BeautifulSoup, a thread
+    pool for the lxml-based summarizers, and no pool for in-browser summarizers, which are already async.
+    'none' returns the plain summarizer.
+    """
+    from app.infrastructure.html_summarizer import create_html_summarizer
+    executor_type = executor_type or os.getenv("HTML_SUMMARIZER_EXECUTOR", "auto")
+    if executor_type == "auto":
+        executor_type = {"beautifulsoup": "process", "lxml": "thread", "streaming": "thread"}.get(summarizer_type, "none")
+    if executor_type == "none":
+        return create_html_summarizer(summarizer_type)
+    return OffloadedHTMLSummarizer(summarizer_type, executor_type, **kwargs)
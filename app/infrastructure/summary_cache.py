@@ -0,0 +1,212 @@
+# app/infrastructure/summary_cache.py
+from collections import OrderedDict
+from typing import Dict, Optional, Any, Tuple
+import hashlib
+import json
+import os
+import threading
+from app.infrastructure.interfaces import (
+    HTMLSummarizerInterface,
+    AsyncHTMLSummarizerInterface,
+    PageSummarizerInterface
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Runs in the page; hashes the serialized DOM plus what the in-page walker reads from
+# outside the markup (viewport for layout-based visibility, the focused element).
+PAGE_FINGERPRINT_SCRIPT = """() => {
+  const root = document.documentElement;
+  const all = document.getElementsByTagName('*');
+  const parts = [
+    root ? root.outerHTML : '',
+    document.title,
+    `${window.innerWidth}x${window.innerHeight}`,
+    String(Array.prototype.indexOf.call(all, document.activeElement)),
+  ];
+  let h1 = 0x811c9dc5;
+  let h2 = 0x01000193;
+  for (const part of parts) {
+    for (let i = 0; i < part.length; i++) {
+      const c = part.charCodeAt(i);
+      h1 = Math.imul(h1 ^ c, 0x01000193);
+      h2 = Math.imul(h2 ^ c, 0x5bd1e995);
+    }
+    h1 = Math.imul(h1 ^ 0xff, 0x01000193);
+  }
+  return `${(h1 >>> 0).toString(16)}${(h2 >>> 0).toString(16)}:${parts[0].length}`;
+}"""
+
+def content_hash(html_content: str) -> str:
+    """Fast 128-bit hash of the HTML."""
+    return hashlib.blake2b(html_content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+class SummaryCache:
+    """Thread-safe LRU cache of summarized snapshots, bounded by their serialized size.
+
+    Responsibilities:
+    - Map (namespace, key) to a summary, evicting least recently used entries once
+      the summed JSON size of the entries exceeds max_bytes.
+    - Count hits, misses and evictions.
+
+    Cached summaries are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, namespace: str, key: str, summary: Dict[str, Any]) -> None:
+        size = len(json.dumps(summary, separators=(',', ':')))
+        if size > self.max_bytes:
+            logger.debug(f"Summary of {size} bytes exceeds the cache size, not cached")
+            return
+        with self._lock:
+            previous = self._entries.pop((namespace, key), None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[(namespace, key)] = (summary, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+_shared_cache: Optional[SummaryCache] = None
+_shared_cache_lock = threading.Lock()
+
+def get_summary_cache() -> SummaryCache:
+    """Process-wide cache shared by every runner; sized by SUMMARY_CACHE_MAX_BYTES."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = SummaryCache(int(os.getenv("SUMMARY_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+        return _shared_cache
+
+class CachingHTMLSummarizer(HTMLSummarizerInterface, AsyncHTMLSummarizerInterface):
+    """Memoizes an HTML summarizer by a content hash of the HTML.
+
+    Responsibilities:
+    - Look up blake2b(html) in a SummaryCache before summarizing.
+    - Keep entries of different summarizers apart with a namespace.
+    - Use the wrapped summarizer's summarize_html_async when it has one.
+    """
+    def __init__(self, summarizer: HTMLSummarizerInterface, namespace: str, cache: Optional[SummaryCache] = None):
+        """Initialize the wrapper.
+
+        Args:
+            summarizer: Summarizer called on cache misses.
+            namespace: Cache namespace, e.g. the summarizer type.
+            cache: Cache to use; the process-wide cache by default.
+        """
+        self.summarizer = summarizer
+        self.namespace = namespace
+        self.cache = cache or get_summary_cache()
+
+    def summarize_html(self, html_content: str) -> Dict[str, Any]:
+        if html_content is None:
+            raise ValueError("html_content cannot be None")
+        key = content_hash(html_content)
+        summary = self.cache.get(self.namespace, key)
+        if summary is None:
+            summary = self.summarizer.summarize_html(html_content)
+            self.cache.put(self.namespace, key, summary)
+        return summary
+
+    async def summarize_html_async(self, html_content: str) -> Dict[str, Any]:
+        if html_content is None:
+            raise ValueError("html_content cannot be None")
+        key = content_hash(html_content)
+        summary = self.cache.get(self.namespace, key)
+        if summary is None:
+            if isinstance(self.summarizer, AsyncHTMLSummarizerInterface):
+                summary = await self.summarizer.summarize_html_async(html_content)
+            else:
+                summary = self.summarizer.summarize_html(html_content)
+            self.cache.put(self.namespace, key, summary)
+        else:
+            logger.debug(f"Summary cache hit for {key}")
+        return summary
+
+class CachingPageSummarizer(HTMLSummarizerInterface, PageSummarizerInterface):
+    """Memoizes an in-page summarizer by a DOM fingerprint computed in the page.
+
+    The fingerprint covers the serialized DOM, the title, the viewport size and the
+    focused element. Changes that only live in CSSOM or layout (e.g. a stylesheet
+    rule inserted from script) are not seen by it.
+    """
+    def __init__(self, summarizer: Any, namespace: str, cache: Optional[SummaryCache] = None):
+        """Initialize the wrapper.
+
+        Args:
+            summarizer: Summarizer implementing PageSummarizerInterface and HTMLSummarizerInterface.
+            namespace: Cache namespace, e.g. the summarizer type.
+            cache: Cache to use; the process-wide cache by default.
+        """
+        self.summarizer = summarizer
+        self.namespace = namespace
+        self.cache = cache or get_summary_cache()
+        self._html_cache = CachingHTMLSummarizer(summarizer, f"{namespace}:html", self.cache)
+
+    async def summarize_page(self, browser_manager: Any) -> Dict[str, Any]:
+        fingerprint = await browser_manager.evaluate_script(PAGE_FINGERPRINT_SCRIPT)
+        summary = self.cache.get(self.namespace, fingerprint) if fingerprint else None
+        if summary is None:
+            summary = await self.summarizer.summarize_page(browser_manager)
+            if fingerprint:
+                self.cache.put(self.namespace, fingerprint, summary)
+        else:
+            logger.debug(f"Summary cache hit for page fingerprint {fingerprint}")
+        return summary
+
+    def summarize_html(self, html_content: str) -> Dict[str, Any]:
+        return self._html_cache.summarize_html(html_content)
+
+def create_caching_summarizer(
+    summarizer: HTMLSummarizerInterface,
+    namespace: str,
+    cache: Optional[SummaryCache] = None
+) -> HTMLSummarizerInterface:
+    """Wrap a summarizer with the cache matching how it reads the page.
+
+    Returns the summarizer unchanged when SUMMARY_CACHE_MAX_BYTES is 0.
+    """
+    cache = cache or get_summary_cache()
+    if cache.max_bytes <= 0:
+        return summarizer
+    if isinstance(summarizer, PageSummarizerInterface):
+        return CachingPageSummarizer(summarizer, namespace, cache)
+    return CachingHTMLSummarizer(summarizer, namespace, cache)
@@ -3,19 +3,28 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from contextlib import asynccontextmanager
 import os
 
 from app.api.routes import api_router
+from app.infrastructure.http_transport import close_http_client
 from app.utils.logger import get_logger
 from app.utils.config import get_settings
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close pooled connections to the AI providers.
+    await close_http_client()
+
 app = FastAPI(
     title=settings.app_name,
     version="1.0.0",
-    description="Web Test Automation API"
+    description="Web Test Automation API",
+    lifespan=lifespan
 )
 
 # CORS middleware (adjust origins as needed)
@@ -4,6 +4,13 @@ from typing import Dict, Any
 import psutil
 from datetime import datetime
 
+from app.infrastructure.ai_failover import circuit_breaker_stats
+from app.infrastructure.ai_hedging import hedging_stats
+from app.infrastructure.ai_routing import routing_stats
+from app.infrastructure.rate_limiter import rate_limiter_stats
+from app.infrastructure.response_cache import response_cache_stats
+from app.infrastructure.sdk_executor import get_abacus_executor
+from app.infrastructure.summary_cache import get_summary_cache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -32,10 +39,10 @@ class HealthChecker:
                     "uptime": self._get_uptime()
                 },
                 "system": system_health,
+                "cache": await self._check_cache(),
+                "ai_service": await self._check_ai_service(),
                 # Placeholder for future components
                 # "database": await self._check_database(),
-                # "cache": await self._check_cache(),
-                # "ai_service": await self._check_ai_service(),
             }
         except Exception as e:
             logger.error(f"Health check failed: {str(e)}")
@@ -99,47 +106,51 @@ class HealthChecker:
             logger.error(f"Failed to get uptime: {str(e)}")
             return 0.0
 
-    # Example additional health checks (commented out for now):
-    """
-    async def _check_database(self) -> Dict[str, Any]:
+    async def _check_cache(self) -> Dict[str, Any]:
         try:
-            # Add your database connection check here
             return {
                 "status": "healthy",
-                "latency_ms": 0.0  # Add actual latency check
+                "snapshot_summaries": get_summary_cache().stats(),
+                "ai_responses": response_cache_stats()
             }
         except Exception as e:
-            logger.error(f"Database health check failed: {str(e)}")
+            logger.error(f"Cache health check failed: {str(e)}")
             return {
                 "status": "unhealthy",
                 "error": str(e)
             }
 
-    async def _check_cache(self) -> Dict[str, Any]:
+    async def _check_ai_service(self) -> Dict[str, Any]:
         try:
-            # Add your cache connection check here
             return {
                 "status": "healthy",
-                "latency_ms": 0.0
+                "abacus_executor": get_abacus_executor().stats(),
+                "rate_limits": rate_limiter_stats(),
+                "hedging": hedging_stats(),
+                "circuits": circuit_breaker_stats(),
+                "routing": routing_stats()
             }
         except Exception as e:
-            logger.error(f"Cache health check failed: {str(e)}")
+            logger.error(f"AI service health check failed: {str(e)}")
             return {
                 "status": "unhealthy",
                 "error": str(e)
             }
 
-    async def _check_ai_service(self) -> Dict[str, Any]:
+    # Example additional health checks (commented out for now):
+    """
+    async def _check_database(self) -> Dict[str, Any]:
         try:
-            # Add your AI service check here
+            # Add your database connection check here
             return {
                 "status": "healthy",
-                "latency_ms": 0.0
+                "latency_ms": 0.0  # Add actual latency check
             }
         except Exception as e:
-            logger.error(f"AI service health check failed: {str(e)}")
+            logger.error(f"Database health check failed: {str(e)}")
             return {
                 "status": "unhealthy",
                 "error": str(e)
             }
+
     """
\ No newline at end of file
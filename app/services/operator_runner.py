@@ -1,13 +1,15 @@
 # app/services/operator_runner.py
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import json
 import uuid
 import os
 import asyncio
+import time
+from contextlib import aclosing
 from app.infrastructure.html_summarizer import HTMLSummarizer
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError  # Add PlaywrightError
 
@@ -22,8 +24,23 @@ from app.infrastructure.ai_generators import (
     create_playwright_generator,
     GherkinStep
 )
-from app.infrastructure.interfaces import HTMLSummarizerInterface
-from app.infrastructure.snapshot_storage import SnapshotStorage, SnapshotHTMLStorage
+from app.infrastructure.interfaces import HTMLSummarizerInterface, PageSummarizerInterface, AsyncHTMLSummarizerInterface
+from app.infrastructure.summarizer_pool import create_offloaded_html_summarizer
+from app.infrastructure.summary_cache import create_caching_summarizer
+from app.infrastructure.ai_resilience import RetryBudget, set_retry_budget, reset_retry_budget
+from app.infrastructure.snapshot_storage import (
+    SnapshotStorage,
+    SnapshotHTMLStorage,
+    SnapshotWriter,
+    create_snapshot_storages,
+    set_snapshot_context,
+    reset_snapshot_context
+)
+from app.infrastructure.snapshot_pruner import SnapshotPruner, PruneResult
+from app.infrastructure.snapshot_encoder import create_snapshot_encoder
+from app.infrastructure.candidate_extractor import CandidateExtractor, CandidateSelection
+from app.infrastructure.instruction_cache import InstructionCache, get_instruction_cache
+from app.utils.config import AI_STREAMING_CONFIG
 from app.utils.logger import get_logger
 from dotenv import load_dotenv
 from app.domain.exceptions import (
@@ -46,6 +63,7 @@ class StepExecutionResult:
     start_time: datetime
     end_time: datetime
     duration: float
+    prompt_stats: Optional[Dict[str, Any]] = None
 
 @dataclass
 class OperatorCaseResult:
@@ -75,13 +93,30 @@ class OperatorRunnerService(OperatorRunnerInterface):
         html_summarizer: Optional[HTMLSummarizerInterface] = None,
         snapshot_storage: Optional[SnapshotStorage] = None,
         snapshot_html_storage: Optional[SnapshotHTMLStorage] = None,
+        snapshot_pruner: Optional[SnapshotPruner] = None,
+        candidate_extractor: Optional[CandidateExtractor] = None,
+        snapshot_format: Optional[str] = None,
+        instruction_cache: Optional[InstructionCache] = None,
+        stream_instructions: bool = False,
     ):
         self.browser_config = browser_config or BrowserConfig()
         self.nl_to_gherkin = create_nl_to_gherkin_generator(ai_client_type)
         self.playwright_generator = create_playwright_generator(ai_client_type)
         self.html_summarizer = html_summarizer or HTMLSummarizer()
-        self.snapshot_storage = snapshot_storage or SnapshotStorage()
-        self.snapshot_html_storage = snapshot_html_storage or SnapshotHTMLStorage()
+        if snapshot_storage is None or snapshot_html_storage is None:
+            default_storage, default_html_storage = create_snapshot_storages()
+            snapshot_storage = snapshot_storage or default_storage
+            snapshot_html_storage = snapshot_html_storage or default_html_storage
+        self.snapshot_storage = snapshot_storage
+        self.snapshot_html_storage = snapshot_html_storage
+        self.snapshot_pruner = snapshot_pruner or SnapshotPruner(
+            encoder=create_snapshot_encoder(snapshot_format or os.getenv("SNAPSHOT_FORMAT", "json"))
+        )
+        self.candidate_extractor = candidate_extractor or CandidateExtractor()
+        # Replays instructions that worked before on the same step and page structure.
+        self.instruction_cache = instruction_cache
+        # Start executing high_precision instructions while the model is still answering.
+        self.stream_instructions = stream_instructions
         self._browser_manager: Optional[BrowserManagerInterface] = None
         self._browser_initialized = False
 
@@ -136,6 +171,9 @@ class OperatorRunnerService(OperatorRunnerInterface):
         success = True
         error_message = None
         metadata = {"request_id": str(uuid.uuid4())}
+        snapshot_context = set_snapshot_context(metadata["request_id"])
+        retry_budget = RetryBudget()
+        retry_budget_context = set_retry_budget(retry_budget)
 
         try:
             logger.info("--------------------------------------Started running Operator------------------------------")
@@ -190,6 +228,12 @@ class OperatorRunnerService(OperatorRunnerInterface):
                 if idx == 0 and step.action == "navigate" and "am on" in step.gherkin.lower():
                     logger.debug("Skipping first navigation step as it's asserting initial state")
                     continue
+                set_snapshot_context(
+                    metadata["request_id"],
+                    idx,
+                    self._browser_manager._page.url if getattr(self._browser_manager, '_page', None) else None,
+                    step.gherkin
+                )
                 try:
                     step_result = await self._execute_single_step(
                         natural_language_step=nl_steps_list[idx] if idx < len(nl_steps_list) else "",
@@ -219,6 +263,9 @@ class OperatorRunnerService(OperatorRunnerInterface):
             error_message = f"Unexpected error: {str(e)}"
             logger.error(f"Test case execution failed: {error_message}", exc_info=True)
         finally:
+            reset_snapshot_context(snapshot_context)
+            reset_retry_budget(retry_budget_context)
+            metadata["ai_retries"] = retry_budget.used
             await self._cleanup_browser()
 
         end_time = datetime.now()
@@ -246,6 +293,162 @@ class OperatorRunnerService(OperatorRunnerInterface):
             logger.warning(f"Page ready wait failed: {str(e)}")
             raise
 
+    async def _capture_snapshot(self) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Summarize the current page, returning the JSON DOM and the raw HTML (if it was fetched)."""
+        if isinstance(self.html_summarizer, PageSummarizerInterface):
+            # The summary is built inside the browser; the HTML never crosses the driver pipe.
+            return await self.html_summarizer.summarize_page(self._browser_manager), None
+
+        snapshot_before = await self._browser_manager.get_page_content()
+        if not snapshot_before:
+            raise StepExecutionException("Empty page snapshot received")
+        if isinstance(self.html_summarizer, AsyncHTMLSummarizerInterface):
+            return await self.html_summarizer.summarize_html_async(snapshot_before), snapshot_before
+        return self.html_summarizer.summarize_html(snapshot_before), snapshot_before
+
+    async def _run_instructions(
+        self,
+        instructions: List[str],
+        precision: str,
+        gherkin_step: GherkinStep,
+        stop_on_failure: bool = False
+    ) -> Tuple[List[str], Optional[ExecutionResult], Optional[str]]:
+        """Execute an instruction sequence, retrying strict mode violations with a fallback locator.
+
+        With stop_on_failure, the instructions after the first failed one are not run.
+        Returns the instructions that succeeded, the last execution result and the last error.
+        """
+        executed = []
+        execution_result = None
+        last_error = None
+        for instruction in instructions:
+            logger.debug(f"Trying {precision} precision instruction > {instruction}")
+            execution_result = await self._browser_manager.execute_step(instruction)
+            if execution_result.success:
+                executed.append(instruction)
+                logger.debug(f"Successfully executed instruction > {instruction}")
+                continue
+            logger.debug(f"{precision.capitalize()} precision instruction failed: {execution_result.error_message}")
+            if "strict mode violation" in execution_result.error_message.lower():
+                logger.warning(f"Strict mode violation for instruction: {instruction}")
+                fallback_instruction = await self._get_fallback_locator_instruction(instruction, execution_result.error_message, gherkin_step)
+                if fallback_instruction:
+                    logger.debug(f"Trying fallback instruction: {fallback_instruction}")
+                    execution_result = await self._browser_manager.execute_step(fallback_instruction)
+                    if execution_result.success:
+                        executed.append(fallback_instruction)
+                        logger.debug(f"Successfully executed fallback instruction > {fallback_instruction}")
+                        continue
+                    logger.debug(f"Fallback instruction failed: {execution_result.error_message}")
+            last_error = execution_result.error_message
+            if stop_on_failure:
+                break
+        return executed, execution_result, last_error
+
+    async def _generate_high_precision(
+        self,
+        snapshot_text: str,
+        gherkin_step: GherkinStep
+    ) -> Tuple[List[str], Optional[ExecutionResult], Optional[str], List[str]]:
+        """Generate the instructions, then execute the high_precision ones.
+
+        Returns what _run_instructions returns for the high_precision list, plus the
+        low_precision instructions.
+        """
+        instruction_json = await self.playwright_generator.generate_instruction(
+            snapshot_text,
+            gherkin_step.gherkin,
+            snapshot_format=self.snapshot_pruner.encoder.description
+        )
+        try:
+            instruction_data = json.loads(instruction_json)
+        except json.JSONDecodeError as e:
+            raise StepGenerationException(f"Invalid JSON response: {str(e)}")
+        logger.debug(f"Instruction Data >> {instruction_data}")
+        executed, execution_result, last_error = await self._run_instructions(
+            instruction_data.get("high_precision", []), "high", gherkin_step
+        )
+        return executed, execution_result, last_error, instruction_data.get("low_precision", [])
+
+    async def _stream_high_precision(
+        self,
+        snapshot_text: str,
+        gherkin_step: GherkinStep,
+        prompt_stats: Dict[str, Any]
+    ) -> Tuple[List[str], Optional[ExecutionResult], Optional[str], List[str]]:
+        """Execute high_precision instructions as the model streams them.
+
+        Returns the same as _generate_high_precision; low_precision instructions are
+        only collected.
+        """
+        executed = []
+        execution_result = None
+        last_error = None
+        low_precision = []
+        started = time.perf_counter()
+        stream = self.playwright_generator.stream_instructions(
+            snapshot_text,
+            gherkin_step.gherkin,
+            snapshot_format=self.snapshot_pruner.encoder.description
+        )
+        async with aclosing(stream):
+            async for precision, instruction in stream:
+                if precision != "high_precision":
+                    low_precision.append(instruction)
+                    continue
+                if execution_result is None:
+                    prompt_stats['time_to_first_instruction'] = round(time.perf_counter() - started, 3)
+                done, execution_result, error = await self._run_instructions([instruction], "high", gherkin_step)
+                executed.extend(done)
+                last_error = error or last_error
+        prompt_stats['generation_time'] = round(time.perf_counter() - started, 3)
+        return executed, execution_result, last_error, low_precision
+
+    async def _save_snapshots(self, snapshot_json: Dict[str, Any], snapshot_before: Optional[str]) -> None:
+        """Queue the step's snapshots for storage.
+
+        With the 'block' overflow policy save_snapshot waits for room in a full writer
+        queue, so the saves then run in a worker thread instead of on the event loop.
+        """
+        def save() -> None:
+            self.snapshot_storage.save_snapshot(snapshot_json)
+            if snapshot_before is not None:
+                self.snapshot_html_storage.save_snapshot(snapshot_before)
+
+        writers = (getattr(storage, 'writer', None) for storage in (self.snapshot_storage, self.snapshot_html_storage))
+        if any(isinstance(writer, SnapshotWriter) and writer.may_block for writer in writers):
+            await asyncio.to_thread(save)
+        else:
+            save()
+
+    def _prepare_prompt(
+        self,
+        snapshot_json: Dict[str, Any],
+        gherkin_step: GherkinStep
+    ) -> Tuple[CandidateSelection, PruneResult, Dict[str, Any]]:
+        """Select the step's candidate subtrees and prune them to the prompt budget."""
+        selection = self.candidate_extractor.extract(snapshot_json, gherkin_step)
+        pruned = self.snapshot_pruner.prune(selection.snapshot)
+        prompt_stats = pruned.to_dict()
+        prompt_stats['candidates'] = {
+            'fallback': selection.fallback,
+            'total_nodes': selection.total_nodes,
+            'kept_nodes': selection.kept_nodes,
+            'top': [{'role': c.role, 'name': c.name, 'score': round(c.score, 3)} for c in selection.candidates],
+        }
+        if not selection.fallback:
+            logger.info(f"Candidate extraction kept {selection.kept_nodes}/{selection.total_nodes} snapshot nodes")
+        logger.info(
+            f"Snapshot prompt size: {pruned.original_tokens} -> {pruned.tokens} tokens "
+            f"(budget {pruned.token_budget})"
+        )
+        for report in pruned.steps:
+            logger.debug(
+                f"Pruning step {report.step}: {report.chars_before} -> {report.chars_after} chars, "
+                f"{report.tokens_before} -> {report.tokens_after} tokens"
+            )
+        return selection, pruned, prompt_stats
+
     async def _execute_single_step(
         self,
         natural_language_step: str,
@@ -253,96 +456,77 @@ class OperatorRunnerService(OperatorRunnerInterface):
     ) -> StepExecutionResult:
         start_time = datetime.now()
         snapshot_json = None
+        prompt_stats = None
         execution_result = None
         executed_instruction = None
 
         try:
-            snapshot_before = await self._browser_manager.get_page_content()
-            if not snapshot_before:
-                raise StepExecutionException("Empty page snapshot received")
-            snapshot_json = self.html_summarizer.summarize_html(snapshot_before)
+            snapshot_json, snapshot_before = await self._capture_snapshot()
 
             try:
-                self.snapshot_storage.save_snapshot(snapshot_json)
-                self.snapshot_html_storage.save_snapshot(snapshot_before)
-                logger.debug("Training data saved via SnapshotStorage")
+                await self._save_snapshots(snapshot_json, snapshot_before)
+                logger.debug("Training data queued via SnapshotStorage")
             except IOError as e:
                 logger.warning(f"Failed to save snapshot: {str(e)}")
 
-            try:
-                instruction_json = await self.playwright_generator.generate_instruction(
-                    json.dumps(snapshot_json, indent=2),
-                    gherkin_step.gherkin
-                )
+            selection, pruned, prompt_stats = self._prepare_prompt(snapshot_json, gherkin_step)
 
-                try:
-                    instruction_data = json.loads(instruction_json)
-                    last_error = None
-                    logger.debug(f"Instruction Data >> {instruction_data}")
-                    for instruction in instruction_data.get("high_precision", []):
-                        logger.debug(f"Trying high precision instruction > {instruction}")
-                        execution_result = await self._browser_manager.execute_step(instruction)
-                        if not execution_result.success:
-                            logger.debug(f"High precision instruction failed: {execution_result.error_message}")
-                            if "strict mode violation" in execution_result.error_message.lower():
-                                logger.warning(f"Strict mode violation for instruction: {instruction}")
-                                fallback_instruction = await self._get_fallback_locator_instruction(instruction, execution_result.error_message, gherkin_step)
-                                if fallback_instruction:
-                                    logger.debug(f"Trying fallback instruction: {fallback_instruction}")
-                                    execution_result = await self._browser_manager.execute_step(fallback_instruction)
-                                    if execution_result.success:
-                                        executed_instruction = fallback_instruction
-                                        logger.debug(f"Successfully executed fallback instruction > {fallback_instruction}")
-                                        continue
-                                    else:
-                                        logger.debug(f"Fallback instruction failed: {execution_result.error_message}")
-                                        last_error = execution_result.error_message
-                                else:
-                                    last_error = execution_result.error_message
-                            else:
-                                last_error = execution_result.error_message
-                            continue
-                        executed_instruction = instruction
-                        logger.debug(f"Successfully executed instruction > {instruction}")
-                        continue
+            cache_key = None
+            cached_instructions = None
+            if self.instruction_cache is not None:
+                cache_key = self.instruction_cache.key(gherkin_step.gherkin, selection.snapshot)
+                cached_instructions = await asyncio.to_thread(self.instruction_cache.get, cache_key)
+                prompt_stats['instruction_cache'] = 'hit' if cached_instructions else 'miss'
 
-                    if not executed_instruction:
-                        for instruction in instruction_data.get("low_precision", []):
-                            logger.debug(f"Trying low precision instruction > {instruction}")
-                            execution_result = await self._browser_manager.execute_step(instruction)
-                            if not execution_result.success:
-                                logger.debug(f"Low precision instruction failed: {execution_result.error_message}")
-                                if "strict mode violation" in execution_result.error_message.lower():
-                                    logger.warning(f"Strict mode violation for instruction: {instruction}")
-                                    fallback_instruction = await self._get_fallback_locator_instruction(instruction, execution_result.error_message, gherkin_step)
-                                    if fallback_instruction:
-                                        logger.debug(f"Trying fallback instruction: {fallback_instruction}")
-                                        execution_result = await self._browser_manager.execute_step(fallback_instruction)
-                                        if execution_result.success:
-                                            executed_instruction = fallback_instruction
-                                            logger.debug(f"Successfully executed fallback instruction > {fallback_instruction}")
-                                            continue
-                                        else:
-                                            logger.debug(f"Fallback instruction failed: {execution_result.error_message}")
-                                            last_error = execution_result.error_message
-                                    else:
-                                        last_error = execution_result.error_message
-                                else:
-                                    last_error = execution_result.error_message
-                                continue
-                            executed_instruction = instruction
-                            logger.debug(f"Successfully executed instruction > {instruction}")
-                            continue
-
-                    if not executed_instruction:
-                        raise StepExecutionException(
-                            f"No valid instructions executed. Last error: {last_error or 'Unknown error'}"
+            try:
+                if cached_instructions:
+                    logger.info(f"Replaying cached instructions for step: {gherkin_step.gherkin}")
+                    executed, execution_result, last_error = await self._run_instructions(
+                        cached_instructions, "cached", gherkin_step, stop_on_failure=True
+                    )
+                    if last_error is None:
+                        executed_instruction = executed[-1]
+                    else:
+                        logger.info(f"Cached instructions failed ({last_error}); generating new ones")
+                        await asyncio.to_thread(self.instruction_cache.invalidate, cache_key)
+                        if executed:
+                            # The replayed instructions changed the page; prompt with what it shows now.
+                            snapshot_json, _ = await self._capture_snapshot()
+                            selection, pruned, prompt_stats = self._prepare_prompt(snapshot_json, gherkin_step)
+                            cache_key = self.instruction_cache.key(gherkin_step.gherkin, selection.snapshot)
+                            prompt_stats['replayed'] = executed
+                        prompt_stats['instruction_cache'] = 'invalidated'
+
+                if not executed_instruction:
+                    if self.stream_instructions:
+                        executed, execution_result, last_error, low_precision = await self._stream_high_precision(
+                            pruned.text, gherkin_step, prompt_stats
+                        )
+                    else:
+                        executed, execution_result, last_error, low_precision = await self._generate_high_precision(
+                            pruned.text, gherkin_step
                         )
 
-                except json.JSONDecodeError as e:
-                    raise StepGenerationException(f"Invalid JSON response: {str(e)}")
-                except Exception as e:
-                    raise StepExecutionException(f"Failed to execute instructions: {str(e)}")
+                    try:
+                        if executed and last_error is None and cache_key is not None:
+                            await asyncio.to_thread(self.instruction_cache.put, cache_key, executed, gherkin_step.gherkin)
+                        executed_instruction = executed[-1] if executed else None
+
+                        if not executed_instruction:
+                            executed, low_result, low_error = await self._run_instructions(
+                                low_precision, "low", gherkin_step
+                            )
+                            execution_result = low_result or execution_result
+                            last_error = low_error or last_error
+                            executed_instruction = executed[-1] if executed else None
+
+                        if not executed_instruction:
+                            raise StepExecutionException(
+                                f"No valid instructions executed. Last error: {last_error or 'Unknown error'}"
+                            )
+
+                    except Exception as e:
+                        raise StepExecutionException(f"Failed to execute instructions: {str(e)}")
 
             except StepGenerationException as e:
                 end_time = datetime.now()
@@ -362,7 +546,8 @@ class OperatorRunnerService(OperatorRunnerInterface):
                     snapshot_json=snapshot_json,
                     start_time=start_time,
                     end_time=end_time,
-                    duration=duration
+                    duration=duration,
+                    prompt_stats=prompt_stats
                 )
 
             end_time = datetime.now()
@@ -376,7 +561,8 @@ class OperatorRunnerService(OperatorRunnerInterface):
                 snapshot_json=snapshot_json,
                 start_time=start_time,
                 end_time=end_time,
-                duration=duration
+                duration=duration,
+                prompt_stats=prompt_stats
             )
 
         except Exception as e:
@@ -398,11 +584,16 @@ class OperatorRunnerService(OperatorRunnerInterface):
                 snapshot_json=snapshot_json,
                 start_time=start_time,
                 end_time=end_time,
-                duration=duration
+                duration=duration,
+                prompt_stats=prompt_stats
             )
 
 
 
+def _create_summarizer(summarizer_type: str) -> HTMLSummarizerInterface:
+    """Build the configured summarizer behind the process-wide summary cache."""
+    return create_caching_summarizer(create_offloaded_html_summarizer(summarizer_type), summarizer_type)
+
 class OperatorRunnerFactory:
     @staticmethod
     def create_runner(
@@ -411,6 +602,7 @@ class OperatorRunnerFactory:
         headless: bool = True,
         html_summarizer: Optional[HTMLSummarizerInterface] = None,
         snapshot_storage: Optional[SnapshotStorage] = None,
+        summarizer_type: Optional[str] = None,
         **kwargs
     ) -> OperatorRunnerInterface:
         if browser_config is None:
@@ -423,19 +615,21 @@ class OperatorRunnerFactory:
                 trace_dir=kwargs.get('trace_dir', 'traces')
             )
         ai_client_type = ai_client_type or os.getenv("AI_CLIENT_TYPE", "abacus")
-        from app.infrastructure.html_summarizer import HTMLSummarizer
-        html_summarizer = html_summarizer or HTMLSummarizer()
-        snapshot_storage = snapshot_storage or SnapshotStorage()
+        summarizer_type = summarizer_type or os.getenv("HTML_SUMMARIZER_TYPE", "beautifulsoup")
+        html_summarizer = html_summarizer or _create_summarizer(summarizer_type)
         return OperatorRunnerService(
             browser_config=browser_config,
             ai_client_type=ai_client_type,
             html_summarizer=html_summarizer,
-            snapshot_storage=snapshot_storage
+            snapshot_storage=snapshot_storage,
+            instruction_cache=get_instruction_cache(),
+            stream_instructions=AI_STREAMING_CONFIG['enabled']
         )
 
     @staticmethod
     def create_debug_runner(
         ai_client_type: Optional[str] = None,
+        summarizer_type: Optional[str] = None,
         **kwargs
     ) -> OperatorRunnerInterface:
         browser_config = BrowserConfig(
@@ -448,13 +642,13 @@ class OperatorRunnerFactory:
             **kwargs
         )
         ai_client_type = ai_client_type or os.getenv("AI_CLIENT_TYPE", "abacus")
-        from app.infrastructure.html_summarizer import HTMLSummarizer
-        snapshot_storage = SnapshotStorage()
+        summarizer_type = summarizer_type or os.getenv("HTML_SUMMARIZER_TYPE", "beautifulsoup")
         return OperatorRunnerService(
             browser_config=browser_config,
             ai_client_type=ai_client_type,
-            html_summarizer=HTMLSummarizer(),
-            snapshot_storage=snapshot_storage
+            html_summarizer=_create_summarizer(summarizer_type),
+            instruction_cache=get_instruction_cache(),
+            stream_instructions=AI_STREAMING_CONFIG['enabled']
         )
 
     @staticmethod
@@ -491,12 +685,17 @@ class OperatorRunnerFactory:
 
 def create_operator_runner(
     browser_config: Optional[BrowserConfig] = None,
-    ai_client_type: Optional[str] = None
+    ai_client_type: Optional[str] = None,
+    summarizer_type: Optional[str] = None
 ) -> OperatorRunnerInterface:
     ai_client_type = ai_client_type or os.getenv("AI_CLIENT_TYPE", "abacus")
+    summarizer_type = summarizer_type or os.getenv("HTML_SUMMARIZER_TYPE", "beautifulsoup")
     if browser_config is None:
         browser_config = BrowserConfig(headless=False)
     return OperatorRunnerService(
         browser_config=browser_config,
-        ai_client_type=ai_client_type
+        ai_client_type=ai_client_type,
+        html_summarizer=_create_summarizer(summarizer_type),
+        instruction_cache=get_instruction_cache(),
+        stream_instructions=AI_STREAMING_CONFIG['enabled']
     )
\ No newline at end of file
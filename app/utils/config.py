@@ -137,4 +137,257 @@ HTML_SUMMARIZER_CONFIG = {
         'aria-expanded', 'aria-controls', 'aria-describedby', 'aria-required',
         'tabindex', 'style', 'src', 'aria-level', 'name', 'placeholder'
     ]
-}
\ No newline at end of file
+}
+SNAPSHOT_PRUNER_CONFIG = {
+    # Budget for the serialized snapshot inside the Playwright prompt.
+    'token_budget': int(os.getenv('SNAPSHOT_TOKEN_BUDGET', '16000')),
+    # Rough token estimate for JSON; avoids shipping a tokenizer per provider.
+    'chars_per_token': 4,
+    'max_text_length': 200,
+    'max_attribute_length': 120,
+    'max_list_items': 25,
+    # Generic wrappers carrying one of these are kept, since selectors may rely on them.
+    'wrapper_keep_attributes': ['id', 'data-testid', 'aria-label', 'role', 'name'],
+    # Tightening stops at these limits; after that, deep subtrees are cut.
+    'min_text_length': 40,
+    'min_list_items': 5,
+}
+
+CANDIDATE_EXTRACTOR_CONFIG = {
+    'top_k': int(os.getenv('CANDIDATE_TOP_K', '8')),
+    # Levels kept below each candidate (e.g. the options of a select).
+    'subtree_depth': 2,
+    # Indexed node fields and their term-frequency weights; 'name' is the node's accessible name.
+    'field_weights': {
+        'name': 1.0,
+        'id': 1.5,
+        'data-testid': 1.5,
+        'aria-label': 1.5,
+        'placeholder': 1.2,
+        'title': 1.0,
+        'alt': 1.0,
+        'value': 0.8,
+        'aria-describedby': 0.5,
+        'aria-controls': 0.5,
+        'class': 0.5,
+    },
+    'k1': 1.2,
+    'b': 0.75,
+    # Roles preferred for each GherkinStep action.
+    'action_roles': {
+        'click': ['button', 'link', 'menuitem', 'tab', 'checkbox', 'radio', 'combobox'],
+        'input': ['textbox', 'searchbox', 'combobox'],
+        'type': ['textbox', 'searchbox', 'combobox'],
+        'fill': ['textbox', 'searchbox', 'combobox'],
+        'select': ['combobox', 'listbox', 'option'],
+    },
+    'role_boost': 1.5,
+    'phrase_boost': 2.0,
+    # Actions that need the whole page rather than one element.
+    'full_page_actions': ['navigate', 'wait'],
+    'stopwords': ['the', 'a', 'an', 'on', 'in', 'to', 'of', 'and', 'or', 'for', 'with', 'field', 'page', 'element'],
+}
+
+SNAPSHOT_STORAGE_CONFIG = {
+    # files: one file per step under base_dir; delta: the same, with HTML kept as a per-run
+    # delta-encoded history; archive: compressed, deduplicated SnapshotArchive;
+    # dataset: JSONL segments with an offset index for offline replay.
+    'backend': os.getenv('SNAPSHOT_STORAGE_BACKEND', 'files'),
+    # Snapshots go to <base_dir>/<run_id>/step_<n>.json (and .html for the raw page).
+    'base_dir': os.getenv('SNAPSHOT_DIR', 'snapshots'),
+    # Writes waiting for the writer thread; beyond this the overflow policy applies.
+    'max_pending': int(os.getenv('SNAPSHOT_QUEUE_SIZE', '64')),
+    # drop_newest / drop_oldest never wait on disk; block waits up to block_timeout seconds
+    # (the runner then saves from a worker thread, so only that step waits, not the event loop).
+    'overflow_policy': os.getenv('SNAPSHOT_QUEUE_POLICY', 'drop_newest'),
+    'block_timeout': 1.0,
+    'indent': None,
+}
+
+SNAPSHOT_ARCHIVE_CONFIG = {
+    'base_dir': os.getenv('SNAPSHOT_ARCHIVE_DIR', 'snapshot_archive'),
+    # Compressed bytes kept on disk; whole runs are evicted, oldest first, beyond this.
+    'max_bytes': int(os.getenv('SNAPSHOT_ARCHIVE_MAX_BYTES', str(1024 * 1024 * 1024))),
+    'max_age_seconds': float(os.getenv('SNAPSHOT_ARCHIVE_MAX_AGE_DAYS', '30')) * 24 * 3600,
+    # auto: zstd when the zstandard package is installed, gzip otherwise.
+    'codec': os.getenv('SNAPSHOT_ARCHIVE_CODEC', 'auto'),
+    'level': None,
+    # Limits are enforced every N archived snapshots.
+    'evict_every': 100,
+}
+
+HTML_HISTORY_CONFIG = {
+    # Deltas in a row before the next keyframe; bounds the work to rebuild a step.
+    'max_chain': 20,
+    # A delta larger than this fraction of the page is stored as a keyframe instead.
+    'keyframe_ratio': 0.5,
+    # Changed regions longer than this (in tags) are stored verbatim instead of diffed.
+    'max_diff_tokens': 20000,
+    'max_open_runs': 16,
+}
+
+SNAPSHOT_DATASET_CONFIG = {
+    'base_dir': os.getenv('SNAPSHOT_DATASET_DIR', 'snapshot_dataset'),
+    'segment_max_bytes': int(os.getenv('SNAPSHOT_DATASET_SEGMENT_BYTES', str(256 * 1024 * 1024))),
+}
+
+AI_HTTP_CONFIG = {
+    # Shared by the Gemini, Grok and OpenAI clients (one pool per event loop).
+    'max_connections': int(os.getenv('AI_HTTP_MAX_CONNECTIONS', '20')),
+    'max_keepalive_connections': int(os.getenv('AI_HTTP_MAX_KEEPALIVE', '10')),
+    'keepalive_expiry': 30.0,
+    'connect_timeout': 10.0,
+    # LLM responses can take a while; this bounds the wait for each read.
+    'read_timeout': float(os.getenv('AI_HTTP_READ_TIMEOUT', '120')),
+    'write_timeout': 30.0,
+    # Waiting for a free connection from the pool.
+    'pool_timeout': 30.0,
+    # Needs the h2 package; without it HTTP/1.1 is used.
+    'http2': os.getenv('AI_HTTP2', 'false').lower() == 'true',
+}
+
+ABACUS_EXECUTOR_CONFIG = {
+    # Threads running blocking Abacus.AI SDK calls; also the number of SDK clients kept.
+    'max_workers': int(os.getenv('ABACUS_MAX_WORKERS', '8')),
+    # Seconds per evaluate_prompt call, queue wait included.
+    'timeout': float(os.getenv('ABACUS_TIMEOUT', '120')),
+}
+
+AI_RETRY_CONFIG = {
+    # Attempts per prompt, the first one included.
+    'max_attempts': int(os.getenv('AI_RETRY_MAX_ATTEMPTS', '4')),
+    'base_delay': 0.5,
+    'max_delay': 20.0,
+    'multiplier': 2.0,
+    # Retry-After values above this are not waited for; the error is raised instead.
+    'max_retry_after': 60.0,
+    # Retries shared by all prompts of one operator case.
+    'case_budget': int(os.getenv('AI_RETRY_CASE_BUDGET', '10')),
+    'retryable_statuses': [408, 425, 429, 500, 502, 503, 504, 529],
+}
+
+AI_RATE_LIMIT_CONFIG = {
+    # Limits of one provider model, shared by every client of it in the process.
+    # 0 disables a limit. Override with AI_<PROVIDER>_RPM / _TPM / _CONCURRENCY.
+    'providers': {
+        provider: {
+            'rpm': int(os.getenv(f'AI_{provider.upper()}_RPM', str(rpm))),
+            'tpm': int(os.getenv(f'AI_{provider.upper()}_TPM', str(tpm))),
+            'max_concurrency': int(os.getenv(f'AI_{provider.upper()}_CONCURRENCY', str(concurrency))),
+        }
+        for provider, rpm, tpm, concurrency in [
+            ('abacus', 60, 0, 8),
+            ('gemini', 60, 1_000_000, 8),
+            ('grok', 60, 200_000, 8),
+            ('openai', 500, 300_000, 16),
+        ]
+    },
+    # Token estimate of a prompt: its length divided by this, plus the reserved max_tokens.
+    'chars_per_token': 4,
+}
+
+AI_RESPONSE_CACHE_CONFIG = {
+    # off: never cache; deterministic: only clients with temperature 0;
+    # always: every client (for suites that accept replaying sampled answers).
+    'mode': os.getenv('AI_RESPONSE_CACHE_MODE', 'deterministic'),
+    'path': os.getenv('AI_RESPONSE_CACHE_PATH', 'ai_response_cache.sqlite3'),
+    'ttl_seconds': float(os.getenv('AI_RESPONSE_CACHE_TTL_DAYS', '7')) * 24 * 3600,
+    # Stored response bytes; least recently used entries are evicted beyond this.
+    'max_bytes': int(os.getenv('AI_RESPONSE_CACHE_MAX_BYTES', str(256 * 1024 * 1024))),
+    # Limits are enforced every N stored responses.
+    'evict_every': 50,
+}
+
+AI_HEDGING_CONFIG = {
+    # Provider to send a backup request to when the primary is slow; empty disables hedging.
+    'backup_client': os.getenv('AI_HEDGE_BACKUP_CLIENT', ''),
+    'backup_model': os.getenv('AI_HEDGE_BACKUP_MODEL') or None,
+    # The backup is sent once the primary has taken longer than this percentile of
+    # its recent latencies (never sooner than min_delay).
+    'percentile': float(os.getenv('AI_HEDGE_PERCENTILE', '0.95')),
+    'min_delay': 1.0,
+    # Used until min_samples latencies have been seen.
+    'initial_delay': float(os.getenv('AI_HEDGE_INITIAL_DELAY', '10')),
+    'min_samples': 20,
+    'window': 200,
+}
+
+AI_FAILOVER_CONFIG = {
+    # Providers to fail over between, in order (e.g. "abacus,gemini,grok,openai");
+    # the generator's own provider is tried first. Fewer than two disables failover.
+    'providers': [p.strip() for p in os.getenv('AI_FAILOVER_PROVIDERS', '').split(',') if p.strip()],
+    # A provider's circuit opens after this many failures in a row...
+    'consecutive_failures': int(os.getenv('AI_CIRCUIT_CONSECUTIVE_FAILURES', '3')),
+    # ...or when this share of its last `window` calls failed (once min_calls were made).
+    'failure_rate': float(os.getenv('AI_CIRCUIT_FAILURE_RATE', '0.5')),
+    'window': 20,
+    'min_calls': 5,
+    # Calls slower than this count as failures.
+    'slow_call_seconds': float(os.getenv('AI_CIRCUIT_SLOW_CALL_SECONDS', '60')),
+    # Seconds an open circuit waits before letting a probe call through.
+    'open_seconds': float(os.getenv('AI_CIRCUIT_OPEN_SECONDS', '30')),
+}
+
+AI_ROUTING_CONFIG = {
+    # Routes a prompt may go to, as provider or provider/model entries
+    # (e.g. "gemini/gemini-1.5-flash,openai/gpt-4o-mini,abacus"). Fewer than two disables routing.
+    'allowlist': [r.strip() for r in os.getenv('AI_ROUTING_ALLOWLIST', '').split(',') if r.strip()],
+    # Prompt-size buckets, in estimated prompt tokens: below 1000, below 4000, ...
+    'bucket_tokens': [1000, 4000, 16000],
+    # Weight of the newest call in the latency and success averages.
+    'alpha': float(os.getenv('AI_ROUTING_ALPHA', '0.2')),
+    # Calls a route makes in a bucket before its averages are trusted; until then it is tried first.
+    'min_samples': 3,
+    # Share of prompts sent to a random other route, so stale averages keep being refreshed.
+    'explore_rate': float(os.getenv('AI_ROUTING_EXPLORE_RATE', '0.05')),
+    # Success rate below which a route's expected latency stops improving with it.
+    'min_success': 0.05,
+}
+
+AI_GENERATOR_CLIENT_CONFIG = {
+    # Client of each generator. Override with AI_<GENERATOR>_CLIENT / _MODEL / _MAX_TOKENS /
+    # _TEMPERATURE (e.g. AI_NL_TO_GHERKIN_MODEL); no client means the runner's AI_CLIENT_TYPE,
+    # no model the provider's default model.
+    # Prompts of more than escalate_above_tokens estimated tokens (i.e. large snapshots) go
+    # to the escalation client, given as provider or provider/model; empty disables escalation.
+    # The response cache's default 'deterministic' mode only caches clients at temperature 0.
+    generator: {
+        'client': os.getenv(f'AI_{generator.upper()}_CLIENT') or None,
+        'model': os.getenv(f'AI_{generator.upper()}_MODEL') or None,
+        'max_tokens': int(os.getenv(f'AI_{generator.upper()}_MAX_TOKENS', str(max_tokens))),
+        'temperature': float(os.getenv(f'AI_{generator.upper()}_TEMPERATURE', str(temperature))),
+        'escalation_client': os.getenv(f'AI_{generator.upper()}_ESCALATION_CLIENT', ''),
+        'escalate_above_tokens': int(os.getenv(f'AI_{generator.upper()}_ESCALATE_ABOVE_TOKENS', str(escalate))),
+    }
+    for generator, max_tokens, temperature, escalate in [
+        # Gherkin answers are a few steps long; locator answers are far longer. The same test
+        # case should always give the same steps, so Gherkin is generated at temperature 0
+        # (and cached); locator answers are cached per step by the instruction cache instead.
+        ('nl_to_gherkin', 2000, 0.0, 0),
+        ('playwright', 10000, 0.7, 8000),
+    ]
+}
+
+AI_STREAMING_CONFIG = {
+    # Opt-in: runners built by the factories stream Playwright answers and run each
+    # high_precision instruction as soon as it is complete. Instructions then run
+    # before the whole answer is validated, and an answer that turns out invalid
+    # after its first instruction no longer fails the step. Clients without
+    # streaming support (Abacus.AI) deliver the whole answer at once.
+    'enabled': os.getenv('AI_STREAMING', 'false').lower() == 'true',
+}
+
+INSTRUCTION_CACHE_CONFIG = {
+    # Successful high_precision instructions, keyed by step and page structure.
+    'enabled': os.getenv('INSTRUCTION_CACHE', 'true').lower() == 'true',
+    'path': os.getenv('INSTRUCTION_CACHE_PATH', 'instruction_cache.sqlite3'),
+    'ttl_seconds': float(os.getenv('INSTRUCTION_CACHE_TTL_DAYS', '30')) * 24 * 3600,
+    'max_bytes': int(os.getenv('INSTRUCTION_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    # Nodes with these roles, or with an id/data-testid, make up the page fingerprint.
+    'interactive_roles': [
+        'button', 'link', 'textbox', 'searchbox', 'combobox', 'listbox', 'option', 'checkbox',
+        'radio', 'switch', 'slider', 'spinbutton', 'menuitem', 'tab', 'input', 'select', 'textarea',
+    ],
+    # Longer names are cut before fingerprinting.
+    'max_name_length': 80,
+}
@@ -0,0 +1,74 @@
+# benchmarks/bench_html_summarizer.py
+"""Compare HTMLSummarizer engines and the lxml-native backend.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_html_summarizer.py [--html page.html] [--repeat N] [--runs N]
+    PYTHONPATH=. python benchmarks/bench_html_summarizer.py --dataset snapshot_dataset [--limit N]
+"""
+import argparse
+import json
+import time
+
+from app.infrastructure.html_summarizer import HTMLSummarizer
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+from benchmarks.pages import iter_dataset_records, load_benchmark_html
+
+
+SUMMARIZERS = {
+    'recursive': lambda: HTMLSummarizer(engine='recursive'),
+    'single_pass': lambda: HTMLSummarizer(engine='single_pass'),
+    'lxml': LxmlHTMLSummarizer,
+}
+
+
+def _time_summarizer(label: str, html_content: str, runs: int):
+    summarizer = SUMMARIZERS[label]()
+    best = float('inf')
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = summarizer.summarize_html(html_content)
+        best = min(best, time.perf_counter() - start)
+    return best, json.dumps(result, indent=2)
+
+
+def _replay_dataset(path: str, limit: int) -> None:
+    for label, factory in SUMMARIZERS.items():
+        summarizer = factory()
+        pages = 0
+        elapsed = 0.0
+        for record in iter_dataset_records(path, 'html', limit):
+            start = time.perf_counter()
+            summarizer.summarize_html(record['data'])
+            elapsed += time.perf_counter() - start
+            pages += 1
+        print(f"{label:<12} {pages} pages  total {elapsed * 1000:9.1f} ms  "
+              f"mean {elapsed * 1000 / max(pages, 1):7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--html', help='HTML file to summarize (default: page rebuilt from snapshot_json.txt)')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the page body N times')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per engine; best time is reported')
+    parser.add_argument('--dataset', help='Replay the recorded HTML pages of a snapshot dataset instead')
+    parser.add_argument('--limit', type=int, help='Replay at most N pages')
+    args = parser.parse_args()
+
+    if args.dataset:
+        _replay_dataset(args.dataset, args.limit)
+        return
+
+    html_content = load_benchmark_html(args.html, args.repeat)
+    print(f"Page size: {len(html_content) / 1024:.1f} KB")
+
+    baseline_time, baseline_json = _time_summarizer('recursive', html_content, args.runs)
+    for label in SUMMARIZERS:
+        elapsed, output = (baseline_time, baseline_json) if label == 'recursive' else \
+            _time_summarizer(label, html_content, args.runs)
+        print(f"{label:<12} {elapsed * 1000:9.1f} ms  "
+              f"speedup {baseline_time / elapsed:5.1f}x  identical output: {output == baseline_json}")
+
+
+if __name__ == '__main__':
+    main()
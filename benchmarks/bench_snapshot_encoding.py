@@ -0,0 +1,99 @@
+# benchmarks/bench_snapshot_encoding.py
+"""Compare snapshot wire formats by prompt size and, optionally, end-to-end step latency.
+
+Token counts use the SnapshotPruner estimate (characters / chars_per_token) on the full
+snapshot, the candidate subtrees for the step, and the budget-pruned snapshot.
+With --ai-client the Playwright prompt is sent once per format and the latency of
+PlaywrightGenerator.generate_instruction is reported (needs the provider's API key).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_snapshot_encoding.py [--html page.html] [--target "search box"]
+        [--action input] [--ai-client gemini] [--runs N]
+    PYTHONPATH=. python benchmarks/bench_snapshot_encoding.py --dataset snapshot_dataset [--limit N]
+"""
+import argparse
+import asyncio
+import time
+
+from app.infrastructure.ai_generators import GherkinStep, create_playwright_generator
+from app.infrastructure.candidate_extractor import CandidateExtractor
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+from app.infrastructure.snapshot_encoder import create_snapshot_encoder
+from app.infrastructure.snapshot_pruner import SnapshotPruner
+from benchmarks.pages import iter_dataset_records, load_benchmark_html
+
+
+FORMATS = ('json', 'json_compact', 'outline')
+
+
+async def _time_generation(ai_client_type: str, text: str, encoder, step: GherkinStep, runs: int) -> float:
+    generator = create_playwright_generator(ai_client_type)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await generator.generate_instruction(text, step.gherkin, snapshot_format=encoder.description)
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[len(timings) // 2]
+
+
+def _replay_dataset(path: str, limit: int) -> None:
+    """Sum estimated prompt tokens per format over recorded steps."""
+    extractor = CandidateExtractor()
+    pruners = {snapshot_format: SnapshotPruner(encoder=create_snapshot_encoder(snapshot_format)) for snapshot_format in FORMATS}
+    totals = {snapshot_format: [0, 0, 0] for snapshot_format in FORMATS}
+    steps = 0
+    for record in iter_dataset_records(path, 'json', limit):
+        gherkin = record['gherkin'] or 'replayed step'
+        # Only the gherkin text is recorded, so it stands in for the target.
+        candidates = extractor.extract(record['data'], GherkinStep(gherkin=gherkin, action='replay', target=gherkin)).snapshot
+        for snapshot_format, pruner in pruners.items():
+            total = totals[snapshot_format]
+            total[0] += pruner.estimate_tokens(pruner.encoder.encode(record['data']))
+            total[1] += pruner.estimate_tokens(pruner.encoder.encode(candidates))
+            total[2] += pruner.prune(candidates).tokens
+        steps += 1
+    print(f"{steps} recorded steps")
+    print(f"{'format':<14}{'full':>12}{'candidates':>12}{'pruned':>12}   (estimated tokens, total)")
+    for snapshot_format, (full, selected, pruned) in totals.items():
+        print(f"{snapshot_format:<14}{full:>12}{selected:>12}{pruned:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--html', help='HTML file to summarize (default: page rebuilt from snapshot_json.txt)')
+    parser.add_argument('--target', default='search box', help='GherkinStep target used for candidate extraction')
+    parser.add_argument('--action', default='input', help='GherkinStep action')
+    parser.add_argument('--ai-client', help='AI client type for the latency run (skipped when omitted)')
+    parser.add_argument('--runs', type=int, default=3, help='Prompts per format in the latency run; median is reported')
+    parser.add_argument('--dataset', help='Replay the recorded snapshots of a snapshot dataset instead')
+    parser.add_argument('--limit', type=int, help='Replay at most N steps')
+    args = parser.parse_args()
+
+    if args.dataset:
+        _replay_dataset(args.dataset, args.limit)
+        return
+
+    snapshot = LxmlHTMLSummarizer().summarize_html(load_benchmark_html(args.html))
+    step = GherkinStep(gherkin=f"When I {args.action} the {args.target}", action=args.action, target=args.target)
+    candidates = CandidateExtractor().extract(snapshot, step).snapshot
+
+    print(f"{'format':<14}{'full':>12}{'candidates':>12}{'pruned':>12}   (estimated tokens)")
+    prompts = {}
+    for snapshot_format in FORMATS:
+        encoder = create_snapshot_encoder(snapshot_format)
+        pruner = SnapshotPruner(encoder=encoder)
+        full = pruner.estimate_tokens(encoder.encode(snapshot))
+        selected = pruner.estimate_tokens(encoder.encode(candidates))
+        pruned = pruner.prune(candidates)
+        prompts[snapshot_format] = (encoder, pruned.text)
+        print(f"{snapshot_format:<14}{full:>12}{selected:>12}{pruned.tokens:>12}")
+
+    if args.ai_client:
+        print(f"\nMedian generate_instruction latency ({args.ai_client}, {args.runs} runs):")
+        for snapshot_format, (encoder, text) in prompts.items():
+            latency = asyncio.run(_time_generation(args.ai_client, text, encoder, step, args.runs))
+            print(f"{snapshot_format:<14}{latency * 1000:9.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_streaming_summarizer.py
+"""Compare peak RSS and time of the in-memory summarizers and the streaming summarizer.
+
+Each mode runs in a fresh interpreter so peaks do not mix; RSS is reported as the growth
+of ru_maxrss over the interpreter with all summarizer modules imported.
+
+Modes:
+    beautifulsoup      HTMLSummarizer on the page read into a string
+    lxml               LxmlHTMLSummarizer on the page read into a string
+    streaming          StreamingHTMLSummarizer reading the file in chunks, tree rebuilt
+    streaming_records  the same, consuming visible records without building the tree
+    streaming_prompt   the same, pruned and encoded into prompt text without building the tree
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_streaming_summarizer.py [--html page.html] [--repeat N]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('beautifulsoup', 'lxml', 'streaming', 'streaming_records', 'streaming_prompt')
+
+
+def _worker(mode: str, path: str) -> None:
+    from app.infrastructure.html_summarizer import HTMLSummarizer
+    from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+    from app.infrastructure.snapshot_pruner import SnapshotPruner
+    from app.infrastructure.streaming_html_summarizer import StreamingHTMLSummarizer, drop_hidden_records
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode in ('beautifulsoup', 'lxml'):
+        with open(path, encoding='utf-8') as f:
+            html_content = f.read()
+        summarizer = HTMLSummarizer() if mode == 'beautifulsoup' else LxmlHTMLSummarizer()
+        nodes = len(json.dumps(summarizer.summarize_html(html_content)))
+    elif mode == 'streaming':
+        with open(path, encoding='utf-8') as f:
+            nodes = len(json.dumps(StreamingHTMLSummarizer().summarize_html(f)))
+    elif mode == 'streaming_records':
+        with open(path, encoding='utf-8') as f:
+            nodes = sum(1 for _ in drop_hidden_records(StreamingHTMLSummarizer().iter_records(f)))
+    else:
+        with open(path, encoding='utf-8') as f:
+            nodes = len(SnapshotPruner().prune_records(StreamingHTMLSummarizer().iter_records(f)).text)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'rss_kb': peak - baseline, 'seconds': elapsed, 'output': nodes}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--html', help='HTML file to summarize (default: page rebuilt from snapshot_json.txt)')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeat the page body N times')
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return
+
+    from benchmarks.pages import load_benchmark_html
+    html_content = load_benchmark_html(args.html, args.repeat)
+    with tempfile.NamedTemporaryFile('w', suffix='.html', encoding='utf-8', delete=False) as f:
+        f.write(html_content)
+    print(f"Page size: {len(html_content.encode('utf-8')) / 1024:.1f} KB")
+    try:
+        for mode in MODES:
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', mode, f.name],
+                capture_output=True, text=True, check=True, env=os.environ
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{mode:<18} peak RSS +{result['rss_kb'] / 1024:8.1f} MB  {result['seconds'] * 1000:8.1f} ms")
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == '__main__':
+    main()
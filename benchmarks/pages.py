@@ -0,0 +1,103 @@
+# benchmarks/pages.py
+"""Benchmark page fixtures.
+
+Recorded runs can be replayed instead from a snapshot dataset (SNAPSHOT_STORAGE_BACKEND=dataset)
+with `iter_dataset_records`.
+
+The repository ships `snapshot_json.txt`, a summarized snapshot of the Python
+3.9 "More Control Flow Tools" docs page (~830 KB of JSON). This module renders
+that snapshot back into HTML so benchmarks run against a large, real-world
+DOM shape without network access.
+"""
+import html
+import json
+from pathlib import Path
+from itertools import islice
+from typing import Any, Dict, Iterator, Optional
+
+ROOT = Path(__file__).parent.parent
+SNAPSHOT_JSON = ROOT / "snapshot_json.txt"
+
+ROLE_TO_TAG = {
+    'link': 'a',
+    'button': 'button',
+    'textbox': 'input',
+    'searchbox': 'input',
+    'checkbox': 'input',
+    'radio': 'input',
+    'combobox': 'select',
+    'text': 'p',
+    'navigation': 'nav',
+    'form': 'form',
+    'banner': 'header',
+    'contentinfo': 'footer',
+    'main': 'main',
+    'article': 'article',
+    'region': 'section',
+    'complementary': 'aside',
+    'img': 'img',
+    'document': 'iframe',
+}
+VOID_TAGS = {'input', 'img'}
+
+
+def _render(node: Dict[str, Any], parts: list) -> None:
+    role = node.get('role', 'generic')
+    tag = ROLE_TO_TAG.get(role, 'div')
+    if role == 'heading':
+        tag = f"h{node.get('level', 1)}"
+    attributes = dict(node.get('attributes', {}))
+    if node.get('visibility') == 'hidden' and 'style' not in attributes:
+        attributes['style'] = 'display: none;'
+    rendered_attrs = ''.join(
+        f' {key}="{html.escape(str(value), quote=True)}"' for key, value in attributes.items()
+    )
+    parts.append(f"<{tag}{rendered_attrs}>")
+    if tag in VOID_TAGS:
+        return
+    name = node.get('name', '')
+    if name and 'aria-label' not in attributes:
+        parts.append(html.escape(name))
+    for child in node.get('children', []):
+        _render(child, parts)
+    parts.append(f"</{tag}>")
+
+
+def snapshot_to_html(snapshot: Dict[str, Any]) -> str:
+    """Render a summarized snapshot back into an HTML document."""
+    parts = [f"<html><head><title>{html.escape(snapshot.get('name', ''))}</title>"
+             "<style>body { margin: 0; }</style><script>window.x = 1;</script></head><body>"]
+    for child in snapshot.get('children', []):
+        _render(child, parts)
+    parts.append("</body></html>")
+    return ''.join(parts)
+
+
+def load_benchmark_html(path: Optional[str] = None, repeat: int = 1) -> str:
+    """Load an HTML page to benchmark.
+
+    Args:
+        path: Optional HTML file. Defaults to the page rebuilt from snapshot_json.txt.
+        repeat: Repeat the body this many times to simulate larger pages.
+    """
+    if path:
+        page = Path(path).read_text(encoding='utf-8')
+    else:
+        snapshot = json.loads(SNAPSHOT_JSON.read_text(encoding='utf-8'))
+        page = snapshot_to_html(snapshot)
+    if repeat > 1:
+        head, _, rest = page.partition('<body>')
+        body, _, tail = rest.rpartition('</body>')
+        page = f"{head}<body>{body * repeat}</body>{tail}"
+    return page
+
+
+def iter_dataset_records(path: str, kind: str, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """Yield recorded step records of one kind ('json' or 'html') from a snapshot dataset.
+
+    Records are decoded one at a time from the memory-mapped segments, so replaying
+    thousands of page states keeps memory flat.
+    """
+    from app.infrastructure.snapshot_dataset import SnapshotDataset
+    with SnapshotDataset(path) as dataset:
+        yield from islice(dataset.find(kind=kind), limit)
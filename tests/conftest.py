@@ -1,13 +1,31 @@
 # tests/conftest.py
 
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
-from typing import Generator, Dict
+from typing import Generator, Dict, Any, Callable, List, Optional, Union
+
+from app.domain.exceptions import AIProviderException
 
 from app.main import app
 from app.services.operator_runner import OperatorRunnerInterface
 from app.infrastructure.playwright_manager import BrowserManagerInterface
 from app.infrastructure.ai_client import AIClientInterface
+from app.infrastructure.interfaces import AIResponse
+from app.infrastructure import response_cache
+from app.infrastructure.response_cache import ResponseCache
+from app.utils.config import INSTRUCTION_CACHE_CONFIG
+
+# Keep the persistent caches out of the working directory: factory-built runners
+# get no instruction cache, and cacheable AI calls share a throwaway response cache.
+@pytest.fixture(autouse=True, scope="session")
+def isolated_caches(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(INSTRUCTION_CACHE_CONFIG, 'enabled', False)
+        cache = ResponseCache(str(tmp_path_factory.mktemp("caches") / "ai_responses.sqlite3"))
+        mp.setattr(response_cache, '_shared_cache', cache)
+        yield
+        cache.close()
 
 # Fixture for FastAPI test client
 @pytest.fixture
@@ -26,6 +44,60 @@ def sample_test_case() -> str:
     with open("tests/test_data/test_cases/sample_test_case.txt", "r") as f:
         return f.read()
 
+# Edge cases the HTML summarizer implementations must summarize identically.
+PARITY_CASES = [
+    "",
+    "<div>Unclosed tag",
+    "<html><head><title>Test <!-- comment --> Page</title></head><body><p>Text</p></body>",
+    """
+    <html><head><title>Test Page</title></head>
+    <body>
+        <h1>Main Heading</h1>
+        <p>Paragraph text</p>
+        <a href="/link">Click me</a>
+        <div style="display: none;">Hidden div</div>
+        <input type="text" value="Input value" aria-label="Search input">
+        <input type="hidden" name="csrf" value="token">
+        <img src="image.jpg" alt="Test image">
+    </body></html>
+    """,
+    """
+    <body>
+        <div class="mobile-nav"><button>Menu</button><span><a href="#">Deep</a></span></div>
+        <nav aria-hidden="true"><a href="/a">A</a></nav>
+        <section hidden="hidden"><p>Gone</p></section>
+        <div hidden><p>Empty hidden attribute</p></div>
+        <div style="opacity: 0"><div><img src="x.png"></div></div>
+        <div><div><span></span></div><div><canvas></canvas></div></div>
+        <div><script>var x = 1;</script><style>p { color: red; }</style><template><p>T</p></template></div>
+        <p>Before <b>bold</b> after <!-- note --> end</p>
+        <p aria-label="Label">Text</p>
+        <div role="heading" aria-level="x">Bad level</div>
+        <header role="heading">Header heading</header>
+        <select haspopup="listbox"><option>One</option><option>Two</option></select>
+        <textarea focused="true">Notes</textarea>
+        <div role="button"></div>
+        <a></a>
+        <iframe title="Frame title"></iframe>
+    </body>
+    """,
+    """
+    <html style="visibility: hidden"><body><p>Hidden through html</p><button>Go</button></body></html>
+    """,
+    """
+    <body><form><input name="q" focus="true"><input name="r"><textarea></textarea></form></body>
+    """,
+]
+
+def make_page(rows: int) -> str:
+    """Shop page with `rows` products, each with a link, a hidden span and a button."""
+    items = "".join(
+        f'<li class="item"><a href="/p/{i}" id="link-{i}">Product {i}</a>'
+        f'<span style="display: none">hidden {i}</span><button>Buy {i}</button></li>'
+        for i in range(rows)
+    )
+    return f"<html><head><title>Shop</title></head><body><ul>{items}</ul></body></html>"
+
 # Mock fixtures
 @pytest.fixture
 def mock_test_runner(mocker):
@@ -37,4 +109,78 @@ def mock_browser_manager(mocker):
 
 @pytest.fixture
 def mock_ai_client(mocker):
-    return mocker.Mock(spec=AIClientInterface)
\ No newline at end of file
+    return mocker.Mock(spec=AIClientInterface)
+class FakeAIClient(AIClientInterface):
+    """Configurable AI client test double.
+
+    Calls take `delay` seconds (streams: before each chunk) and answer `content`, a
+    string or a function of the prompt. The first `failures` calls raise a retryable
+    overload error; with `error` set, every call raises it, streams after yielding
+    `chunks` (by default [content], or nothing when `error` is set).
+    """
+    def __init__(
+        self,
+        content: Union[str, Callable[[str], str]] = "ok",
+        error: Optional[BaseException] = None,
+        chunks: Optional[List[str]] = None,
+        delay: float = 0.0,
+        failures: int = 0,
+        metadata: Optional[Dict[str, Any]] = None,
+        model_name: str = "fake-model",
+        max_tokens: int = 100,
+        temperature: float = 0.0
+    ):
+        self.content = content
+        self.error = error
+        self.chunks = chunks
+        self.delay = delay
+        self.failures = failures
+        self.metadata = metadata or {}
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.cancelled = False
+        self.finished = False
+
+    def _content(self, prompt: str) -> str:
+        return self.content(prompt) if callable(self.content) else self.content
+
+    def _raise_failure(self) -> None:
+        if self.calls <= self.failures:
+            raise AIProviderException("overloaded", status_code=529, retryable=True)
+
+    async def send_prompt(self, prompt: str) -> AIResponse:
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self._raise_failure()
+            if self.error:
+                raise self.error
+            return AIResponse(content=self._content(prompt), metadata=dict(self.metadata))
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        finally:
+            self.active -= 1
+
+    async def stream_prompt(self, prompt: str):
+        self.calls += 1
+        self._raise_failure()
+        chunks = self.chunks
+        if chunks is None:
+            chunks = [] if self.error else [self._content(prompt)]
+        try:
+            for chunk in chunks:
+                await asyncio.sleep(self.delay)
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        self.finished = True
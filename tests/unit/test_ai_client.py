@@ -0,0 +1,152 @@
+# tests/unit/test_ai_client.py
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from unittest.mock import Mock
+
+from app.domain.exceptions import AIClientException
+from app.infrastructure import ai_client
+from app.infrastructure.ai_client import AbacusAIClient, GeminiAIClient, GrokAIClient, OpenAIClient
+from app.infrastructure.http_transport import get_http_client, close_http_client
+from app.infrastructure.sdk_executor import SDKExecutor
+
+GEMINI_BODY = {"candidates": [{"content": {"parts": [{"text": "await page.click('#buy')"}]}}]}
+CHAT_BODY = {"choices": [{"message": {"content": "await page.click('#buy')"}}], "usage": {"total_tokens": 7}}
+
+def slow_provider(body, delay=0.2, status_code=200):
+    """MockTransport handler answering after `delay`, tracking how many requests overlap."""
+    state = {"in_flight": 0, "peak": 0, "requests": []}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(delay)
+        state["in_flight"] -= 1
+        return httpx.Response(status_code, json=body)
+
+    return handler, state
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("client_class,body", [
+    (GeminiAIClient, GEMINI_BODY),
+    (GrokAIClient, CHAT_BODY),
+    (OpenAIClient, CHAT_BODY),
+])
+async def test_concurrent_prompts_overlap(client_class, body):
+    handler, state = slow_provider(body)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = client_class(api_key="test-key", http_client=http_client)
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.send_prompt(f"prompt {i}") for i in range(5)))
+        elapsed = time.perf_counter() - start
+
+    assert all(response.content == "await page.click('#buy')" for response in responses)
+    assert state["peak"] == 5
+    # Sequential requests would take 5 * 0.2 s.
+    assert elapsed < 0.5
+    assert {json.loads(request.content).get("model") for request in state["requests"]} - {None} <= {client.model_name}
+
+@pytest.mark.asyncio
+async def test_http_errors_become_client_exceptions():
+    handler, _ = slow_provider({"error": {"message": "quota exceeded"}}, delay=0, status_code=429)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = OpenAIClient(api_key="test-key", http_client=http_client)
+        with pytest.raises(AIClientException, match="quota exceeded"):
+            await client.send_prompt("prompt")
+
+@pytest.mark.asyncio
+async def test_shared_client_is_pooled_per_loop():
+    client = get_http_client()
+    assert get_http_client() is client
+    await close_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client
+    await close_http_client()
+
+class FakeAbacusSDK:
+    """Stands in for abacusai.ApiClient: a blocking evaluate_prompt."""
+    instances = []
+    delay = 0.1
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        FakeAbacusSDK.instances.append(self)
+
+    def evaluate_prompt(self, prompt, llm_name, max_tokens, temperature):
+        time.sleep(self.delay)
+        response = Mock()
+        response.to_dict.return_value = {"content": f"answer to {prompt}"}
+        return response
+
+@pytest.fixture
+def abacus_sdk(monkeypatch):
+    FakeAbacusSDK.instances = []
+    FakeAbacusSDK.delay = 0.1
+    monkeypatch.setattr(ai_client, "ApiClient", FakeAbacusSDK)
+    return FakeAbacusSDK
+
+@pytest.mark.asyncio
+async def test_abacus_calls_run_off_the_loop(abacus_sdk):
+    executor = SDKExecutor(max_workers=4)
+    client = AbacusAIClient(api_key="test-key", executor=executor)
+    assert abacus_sdk.instances == []
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(client.send_prompt(f"p{i}") for i in range(8)))
+    elapsed = time.perf_counter() - start
+    ticker_task.cancel()
+    executor.shutdown()
+
+    assert [response.content for response in responses] == [f"answer to p{i}" for i in range(8)]
+    # Two waves of four parallel calls instead of eight sequential ones.
+    assert elapsed < 0.6
+    assert ticks >= 10
+    # At most one client per worker thread.
+    assert 1 <= len(abacus_sdk.instances) <= 4
+    stats = executor.stats()
+    assert stats["calls"] == 8
+    assert stats["max_queue_wait"] >= 0.05
+    assert all("queue_wait" in r.metadata and r.metadata["call_time"] >= 0.09 for r in responses)
+
+@pytest.mark.asyncio
+async def test_abacus_timeout_cancels_queued_call(abacus_sdk):
+    abacus_sdk.delay = 0.3
+    executor = SDKExecutor(max_workers=1)
+    slow = AbacusAIClient(api_key="test-key", executor=executor)
+    impatient = AbacusAIClient(api_key="test-key", executor=executor, timeout=0.05)
+
+    first = asyncio.create_task(slow.send_prompt("first"))
+    await asyncio.sleep(0.01)
+    with pytest.raises(AIClientException, match="timed out"):
+        await impatient.send_prompt("second")
+
+    assert (await first).content == "answer to first"
+    executor.shutdown()
+    stats = executor.stats()
+    # The queued call never reached the SDK.
+    assert stats["timeouts"] == 1 and stats["calls"] == 1
+
+@pytest.mark.asyncio
+async def test_abacus_sdk_errors_are_counted(abacus_sdk, monkeypatch):
+    def failing(self, **kwargs):
+        raise RuntimeError("rate limited")
+
+    monkeypatch.setattr(FakeAbacusSDK, "evaluate_prompt", failing)
+    executor = SDKExecutor(max_workers=1)
+    client = AbacusAIClient(api_key="test-key", executor=executor)
+    with pytest.raises(AIClientException, match="rate limited"):
+        await client.send_prompt("prompt")
+    executor.shutdown()
+    assert executor.stats()["failures"] == 1
@@ -0,0 +1,142 @@
+# tests/unit/test_ai_failover.py
+import asyncio
+import pytest
+
+from app.domain.exceptions import AIProviderException, InvalidPromptException
+from app.infrastructure.ai_failover import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, FailoverAIClient, create_failover_ai_client, failover_providers
+)
+from app.infrastructure.ai_resilience import RetryingAIClient
+from app.infrastructure.rate_limiter import RateLimitedAIClient
+from tests.conftest import FakeAIClient
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def overloaded():
+    return AIProviderException("overloaded", status_code=503, retryable=True)
+
+def breaker(clock=None, **kwargs):
+    settings = dict(consecutive_failures=3, failure_rate=0.5, window=10, min_calls=4,
+                    slow_call_seconds=5.0, open_seconds=30.0)
+    settings.update(kwargs)
+    return CircuitBreaker("test", clock=clock or FakeClock(), **settings)
+
+def failover(*clients, clock=None):
+    clock = clock or FakeClock()
+    names = [f"p{i}" for i in range(len(clients))]
+    return FailoverAIClient(list(zip(names, clients)), breakers={name: breaker(clock) for name in names})
+
+def test_circuit_opens_after_consecutive_failures_and_probes_after_cooldown():
+    clock = FakeClock()
+    circuit = breaker(clock)
+    for _ in range(3):
+        assert circuit.allow()
+        circuit.record(False, 0.1)
+    assert circuit.state == OPEN and not circuit.allow()
+
+    clock.now = 30.0
+    assert circuit.state == HALF_OPEN
+    assert circuit.allow()
+    assert not circuit.allow()  # one probe at a time
+    circuit.record(True, 0.1)
+    assert circuit.state == CLOSED
+    assert circuit.to_dict()["times_opened"] == 1
+
+def test_failed_probe_reopens_circuit():
+    clock = FakeClock()
+    circuit = breaker(clock, consecutive_failures=1)
+    circuit.allow()
+    circuit.record(False, 0.1)
+    clock.now = 30.0
+    assert circuit.allow()
+    circuit.record(False, 0.1)
+    assert circuit.state == OPEN
+    assert circuit.to_dict()["retry_in"] == 30.0
+
+def test_circuit_opens_on_failure_rate_and_slow_calls():
+    circuit = breaker(consecutive_failures=10)
+    for latency in (0.1, 9.0, 0.1, 9.0):
+        circuit.allow()
+        circuit.record(True, latency)
+    assert circuit.state == OPEN
+    assert circuit.to_dict()["failures"] == 2
+
+@pytest.mark.asyncio
+async def test_fails_over_to_next_provider_and_skips_open_circuit():
+    primary, backup = FakeAIClient(error=overloaded()), FakeAIClient(content="backup")
+    client = failover(primary, backup)
+
+    for _ in range(4):
+        response = await client.send_prompt("p")
+        assert response.content == "backup" and response.metadata["provider"] == "p1"
+
+    assert primary.calls == 3  # circuit opened after the third failure
+    assert client.breakers["p0"].state == OPEN
+    assert client.breakers["p1"].to_dict()["calls"] == 4
+
+@pytest.mark.asyncio
+async def test_prompt_errors_are_raised_without_failover():
+    primary, backup = FakeAIClient(error=InvalidPromptException("empty")), FakeAIClient()
+    client = failover(primary, backup)
+    with pytest.raises(InvalidPromptException):
+        await client.send_prompt("p")
+    assert backup.calls == 0
+    assert client.breakers["p0"].to_dict()["calls"] == 0
+
+@pytest.mark.asyncio
+async def test_raises_last_error_or_fails_fast_when_all_circuits_open():
+    client = failover(FakeAIClient(error=overloaded()), FakeAIClient(error=overloaded()))
+    for _ in range(3):
+        with pytest.raises(AIProviderException, match="overloaded"):
+            await client.send_prompt("p")
+    with pytest.raises(AIProviderException, match="circuits open"):
+        await client.send_prompt("p")
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_frees_the_half_open_slot():
+    clock = FakeClock()
+    client = failover(FakeAIClient(delay=10), clock=clock)
+    circuit = client.breakers["p0"]
+    for _ in range(3):
+        circuit.allow()
+        circuit.record(False, 0.1)
+    clock.now = 30.0
+
+    task = asyncio.ensure_future(client.send_prompt("p"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert circuit.allow()
+
+@pytest.mark.asyncio
+async def test_stream_fails_over_only_before_first_chunk():
+    client = failover(FakeAIClient(chunks=[], error=overloaded()), FakeAIClient(chunks=["a", "b"]))
+    assert [text async for text in client.stream_prompt("p")] == ["a", "b"]
+
+    client = failover(FakeAIClient(chunks=["a"], error=overloaded()), FakeAIClient(chunks=["b"]))
+    received = []
+    with pytest.raises(AIProviderException):
+        async for text in client.stream_prompt("p"):
+            received.append(text)
+    assert received == ["a"]
+
+def test_failover_providers_put_primary_first():
+    assert failover_providers("grok", ["abacus", "gemini", "grok", "openai"]) == ["grok", "abacus", "gemini", "openai"]
+    assert failover_providers("abacus", []) == ["abacus"]
+
+def test_factory_retries_around_failover_not_per_provider(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.delenv("GROK_API_KEY", raising=False)
+
+    client = create_failover_ai_client(["openai", "grok", "gemini"], cache=False)
+
+    assert isinstance(client, RetryingAIClient) and isinstance(client.client, FailoverAIClient)
+    assert [provider for provider, _ in client.client.clients] == ["openai", "gemini"]
+    assert all(isinstance(inner, RateLimitedAIClient) for _, inner in client.client.clients)
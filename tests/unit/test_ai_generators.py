@@ -9,9 +9,14 @@ from app.infrastructure.ai_generators import (
     NLToGherkinGenerator,
     PlaywrightGenerator,
     GherkinStep,
-    StepGenerationException
+    StepGenerationException,
+    create_nl_to_gherkin_generator,
+    create_playwright_generator
 )
 from app.infrastructure.ai_client import AIClientInterface, AIResponse
+from app.infrastructure.ai_routing import EscalatingAIClient
+from app.infrastructure.response_cache import CachingAIClient
+from app.utils.config import AI_GENERATOR_CLIENT_CONFIG
 
 # Test Data
 VALID_NL_RESPONSE = json.dumps([
@@ -198,6 +203,23 @@ class TestPlaywrightGenerator:
         instruction_data = json.loads(instruction_json)
         assert instruction_data["high_precision"][0] == "await page.click('button#login');"
 
+    @pytest.mark.asyncio
+    async def test_generate_instruction_describes_snapshot_format(self, playwright_generator, mock_ai_client):
+        """Test that the snapshot format description is placed in the prompt."""
+        mock_ai_client.send_prompt.return_value = AIResponse(content=VALID_PLAYWRIGHT_RESPONSE)
+        playwright_generator.prompt_template = "Format: {snapshot_format} Snapshot: {web_page_snapshot} {gherkin_step}"
+
+        await playwright_generator.generate_instruction(
+            snapshot='WebArea "Login"\n button "Login"',
+            gherkin_step="When I click the login button",
+            snapshot_format="Indented outline"
+        )
+
+        prompt = mock_ai_client.send_prompt.call_args.args[0]
+        assert "Indented outline" in prompt
+        assert "{snapshot_format}" not in prompt
+        assert 'button "Login"' in prompt
+
     @pytest.mark.asyncio
     async def test_generate_instruction_invalid(self, playwright_generator, mock_ai_client):
         """Test generating invalid Playwright instruction."""
@@ -282,4 +304,39 @@ class TestGeneratorIntegration:
         )
 
         instruction_data = json.loads(instruction_json)
-        assert instruction_data["high_precision"][0].startswith("await page.")
\ No newline at end of file
+        assert instruction_data["high_precision"][0].startswith("await page.")
+
+
+# Tests for the generator factories
+class TestGeneratorFactories:
+    def test_generators_get_their_own_client_settings(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        monkeypatch.setitem(AI_GENERATOR_CLIENT_CONFIG, "nl_to_gherkin", {
+            "client": "openai", "model": "gpt-4o-mini", "max_tokens": 500, "temperature": 0.0,
+            "escalation_client": "", "escalate_above_tokens": 0,
+        })
+        monkeypatch.setitem(AI_GENERATOR_CLIENT_CONFIG, "playwright", {
+            "client": None, "model": None, "max_tokens": 8000, "temperature": 0.2,
+            "escalation_client": "gemini/gemini-1.5-pro", "escalate_above_tokens": 6000,
+        })
+
+        gherkin_client = create_nl_to_gherkin_generator("gemini").ai_client
+        assert (gherkin_client.model_name, gherkin_client.max_tokens, gherkin_client.temperature) == ("gpt-4o-mini", 500, 0.0)
+
+        playwright_client = create_playwright_generator("openai").ai_client
+        assert isinstance(playwright_client, EscalatingAIClient)
+        assert playwright_client.threshold_tokens == 6000
+        assert (playwright_client.max_tokens, playwright_client.temperature) == (8000, 0.2)
+        assert playwright_client.escalation.model_name == "gemini-1.5-pro"
+
+    @pytest.mark.asyncio
+    async def test_gherkin_generation_is_cacheable_by_default(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        assert AI_GENERATOR_CLIENT_CONFIG["nl_to_gherkin"]["temperature"] == 0
+
+        client = create_nl_to_gherkin_generator("openai").ai_client
+
+        assert isinstance(client, CachingAIClient) and client._cacheable()
+        assert not await client.validator("Sorry, I cannot help with that")
+        assert await client.validator('[{"gherkin": "Given I am on the login page", "action": "navigate", "target": "login page"}]')
@@ -0,0 +1,125 @@
+# tests/unit/test_ai_hedging.py
+import asyncio
+import json
+import time
+import pytest
+
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.ai_generators import create_playwright_generator
+from app.infrastructure.ai_hedging import HedgedAIClient, HedgeStats
+from app.infrastructure.ai_resilience import RetryingAIClient
+from app.infrastructure.rate_limiter import RateLimitedAIClient
+from app.infrastructure.response_cache import CachingAIClient
+from app.utils.config import AI_HEDGING_CONFIG
+from tests.conftest import FakeAIClient
+
+VALID = json.dumps({"high_precision": ["await page.click('#buy')"], "low_precision": []})
+
+def fake(content=VALID, **kwargs):
+    return FakeAIClient(content, **kwargs)
+
+async def is_json(content):
+    json.loads(content)
+    return True
+
+def hedged(primary, backup, initial_delay=0.05):
+    return HedgedAIClient(primary, backup, validator=is_json, initial_delay=initial_delay, stats=HedgeStats())
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    client = hedged(fake(), fake())
+    response = await client.send_prompt("p")
+    assert response.metadata["hedge"] == {"hedged": False, "winner": "primary", "delay": 0.05}
+    assert client.hedge_stats.to_dict()["hedged"] == 0
+
+@pytest.mark.asyncio
+async def test_backup_wins_over_slow_primary_which_is_cancelled():
+    primary, backup = fake(delay=2.0, content='{"from": "primary"}'), fake(delay=0.01)
+    client = hedged(primary, backup)
+
+    start = time.perf_counter()
+    response = await client.send_prompt("p")
+
+    assert time.perf_counter() - start < 0.5
+    assert response.content == VALID and response.metadata["hedge"]["winner"] == "backup"
+    assert primary.cancelled
+    stats = client.hedge_stats.to_dict()
+    assert (stats["hedged"], stats["backup_wins"], stats["hedge_win_rate"]) == (1, 1, 1.0)
+
+@pytest.mark.asyncio
+async def test_invalid_or_failed_primary_hedges_at_once():
+    client = hedged(fake(content="Sorry, I can't"), fake(), initial_delay=5)
+    start = time.perf_counter()
+    assert (await client.send_prompt("p")).metadata["hedge"]["winner"] == "backup"
+    assert time.perf_counter() - start < 1
+
+    failing = hedged(fake(error=AIProviderException("overloaded", status_code=529)), fake(delay=0.01))
+    assert (await failing.send_prompt("p")).metadata["hedge"]["winner"] == "backup"
+
+@pytest.mark.asyncio
+async def test_when_both_fail_the_primary_outcome_is_returned():
+    client = hedged(fake(error=AIProviderException("primary down")), fake(error=AIProviderException("backup down")))
+    with pytest.raises(AIProviderException, match="primary down"):
+        await client.send_prompt("p")
+
+    invalid = hedged(fake(content="nope"), fake(content="also nope"))
+    assert (await invalid.send_prompt("p")).content == "nope"
+    assert invalid.hedge_stats.to_dict()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_primary_latency_is_not_recorded():
+    client = hedged(fake(error=AIProviderException("boom", status_code=503)), fake())
+    await client.send_prompt("p")
+    assert client.hedge_stats.samples == 0
+
+@pytest.mark.asyncio
+async def test_stream_hedges_on_time_to_first_chunk():
+    primary = fake('{"from": "primary"}', delay=2.0)
+    backup = fake(chunks=[VALID[:10], VALID[10:]], delay=0.01)
+    client = hedged(primary, backup)
+
+    start = time.perf_counter()
+    chunks = [text async for text in client.stream_prompt("p")]
+
+    assert time.perf_counter() - start < 0.5
+    assert "".join(chunks) == VALID and len(chunks) == 2
+    assert primary.cancelled and not backup.cancelled
+    assert client.stream_stats.to_dict()["backup_wins"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_commits_to_fast_primary_or_raises_when_both_fail():
+    backup = fake()
+    client = hedged(fake(), backup)
+    assert "".join([text async for text in client.stream_prompt("p")]) == VALID
+    assert client.stream_stats.to_dict()["hedged"] == 0 and client.stream_stats.samples == 1
+
+    client = hedged(fake(error=AIProviderException("primary down")), fake(error=AIProviderException("backup down")))
+    with pytest.raises(AIProviderException, match="primary down"):
+        [text async for text in client.stream_prompt("p")]
+
+def test_delay_follows_the_latency_percentile():
+    stats = HedgeStats()
+    client = HedgedAIClient(fake(), fake(), percentile=0.9, min_delay=0.5, initial_delay=8, min_samples=10, stats=stats)
+    assert client.hedge_delay() == 8
+    for seconds in range(1, 11):
+        stats.add_latency(seconds)
+    assert client.hedge_delay() == 9
+    assert HedgedAIClient(fake(), fake(), min_delay=20, min_samples=10, stats=stats).hedge_delay() == 20
+
+def test_generator_factory_hedges_with_configured_backup(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setitem(AI_HEDGING_CONFIG, "backup_client", "gemini")
+
+    generator = create_playwright_generator("openai")
+
+    assert isinstance(generator.ai_client, CachingAIClient)
+    retrying_client = generator.ai_client.client
+    assert isinstance(retrying_client, RetryingAIClient)
+    hedged_client = retrying_client.client
+    assert isinstance(hedged_client, HedgedAIClient) and hedged_client.name == "openai->gemini"
+    # Retries wrap the pair, so a failing primary is hedged at once.
+    assert isinstance(hedged_client.primary, RateLimitedAIClient)
+    assert isinstance(hedged_client.backup, RateLimitedAIClient)
+    assert asyncio.run(hedged_client.validator(f"```json\n{VALID}\n```"))
+    assert not asyncio.run(hedged_client.validator("no JSON here"))
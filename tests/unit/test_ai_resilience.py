@@ -0,0 +1,151 @@
+# tests/unit/test_ai_resilience.py
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.ai_client import OpenAIClient, create_ai_client
+from app.infrastructure.ai_resilience import (
+    RetryingAIClient,
+    RetryPolicy,
+    RetryBudget,
+    parse_retry_after,
+    set_retry_budget,
+    reset_retry_budget
+)
+from app.infrastructure.http_transport import provider_error
+
+CHAT_BODY = {"choices": [{"message": {"content": "await page.click('#buy')"}}]}
+
+class FakeProvider:
+    """Local HTTP server answering each POST with the next scripted (status, headers, body)."""
+    def __init__(self):
+        self.script = []
+        self.hits = 0
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                provider.hits += 1
+                status, headers, body = provider.script.pop(0)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def provider():
+    provider = FakeProvider()
+    yield provider
+    provider.close()
+
+@pytest.fixture
+async def openai_client(provider):
+    async with httpx.AsyncClient() as http_client:
+        client = OpenAIClient(api_key="test-key", http_client=http_client)
+        client._base_url = provider.url
+        yield client
+
+POLICY = RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.05, max_retry_after=1.0)
+
+@pytest.mark.asyncio
+async def test_retries_throttling_and_overload_honoring_retry_after(provider, openai_client):
+    provider.script = [
+        (429, {"Retry-After": "0.3"}, {"error": "rate limited"}),
+        (503, {}, {"error": "overloaded"}),
+        (200, {}, CHAT_BODY),
+    ]
+    client = RetryingAIClient(openai_client, POLICY)
+
+    start = time.perf_counter()
+    response = await client.send_prompt("prompt")
+
+    assert response.content == "await page.click('#buy')"
+    assert response.metadata["attempts"] == 3
+    assert provider.hits == 3
+    assert time.perf_counter() - start >= 0.3
+
+@pytest.mark.asyncio
+async def test_fatal_errors_are_not_retried(provider, openai_client):
+    provider.script = [(400, {}, {"error": "bad request"})]
+    client = RetryingAIClient(openai_client, POLICY)
+
+    with pytest.raises(AIProviderException) as error:
+        await client.send_prompt("prompt")
+
+    assert error.value.status_code == 400 and not error.value.retryable
+    assert provider.hits == 1
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(provider, openai_client):
+    provider.script = [(502, {}, {"error": "bad gateway"})] * 4
+    with pytest.raises(AIProviderException, match="502"):
+        await RetryingAIClient(openai_client, POLICY).send_prompt("prompt")
+    assert provider.hits == 4
+
+@pytest.mark.asyncio
+async def test_case_budget_is_shared(provider, openai_client):
+    provider.script = [(503, {}, {}), (200, {}, CHAT_BODY), (503, {}, {}), (200, {}, CHAT_BODY)]
+    client = RetryingAIClient(openai_client, POLICY)
+    budget = RetryBudget(max_retries=1)
+    token = set_retry_budget(budget)
+    try:
+        assert (await client.send_prompt("first")).metadata["attempts"] == 2
+        with pytest.raises(AIProviderException):
+            await client.send_prompt("second")
+    finally:
+        reset_retry_budget(token)
+
+    assert budget.used == 1 and budget.remaining == 0
+    assert provider.hits == 3
+
+@pytest.mark.asyncio
+async def test_long_retry_after_is_not_waited_for(provider, openai_client):
+    provider.script = [(429, {"Retry-After": "120"}, {"error": "rate limited"})]
+    start = time.perf_counter()
+    with pytest.raises(AIProviderException) as error:
+        await RetryingAIClient(openai_client, POLICY).send_prompt("prompt")
+    assert error.value.retry_after == 120
+    assert time.perf_counter() - start < 1
+    assert provider.hits == 1
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_retryable():
+    async with httpx.AsyncClient() as http_client:
+        with pytest.raises(httpx.ConnectError) as error:
+            await http_client.post("http://127.0.0.1:9/", json={})
+    assert provider_error(error.value, "OpenAI").retryable
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    now = time.time()
+    assert 9 <= parse_retry_after(formatdate(now + 10, usegmt=True), now=now) <= 11
+
+def test_factory_wraps_clients():
+    client = create_ai_client("openai", api_key="test-key", model_name="gpt-4o", cache=False)
+    assert isinstance(client, RetryingAIClient)
+    assert client.model_name == "gpt-4o"
+    assert isinstance(create_ai_client("openai", api_key="test-key", retry=False, rate_limit=False, cache=False), OpenAIClient)
@@ -0,0 +1,114 @@
+# tests/unit/test_ai_routing.py
+import random
+import pytest
+
+from app.domain.exceptions import AIProviderException
+from app.infrastructure.ai_failover import CircuitBreaker
+from app.infrastructure.ai_resilience import RetryingAIClient
+from app.infrastructure.ai_routing import (
+    EscalatingAIClient, LatencyRouter, RouteStats, RoutingAIClient, create_routing_ai_client, parse_route,
+    prompt_size_bucket, routing_routes
+)
+from app.infrastructure.rate_limiter import RateLimitedAIClient
+from tests.conftest import FakeAIClient
+
+def router(**kwargs):
+    settings = dict(min_samples=2, explore_rate=0.0, rng=random.Random(0))
+    settings.update(kwargs)
+    return LatencyRouter(**settings)
+
+def seed(latency_router, route, bucket, latencies, success=True):
+    for latency in latencies:
+        latency_router.record(route, bucket, success, latency)
+
+def test_prompt_size_buckets():
+    assert prompt_size_bucket("x" * 400, [1000, 4000]) == "<1000"
+    assert prompt_size_bucket("x" * 8000, [1000, 4000]) == "<4000"
+    assert prompt_size_bucket("x" * 40000, [1000, 4000]) == ">=4000"
+
+def test_route_stats_weigh_latency_by_success_rate():
+    stats = RouteStats(alpha=0.5)
+    stats.record(True, 2.0)
+    stats.record(True, 4.0)
+    assert stats.latency == 3.0
+    stats.record(False, 0.1)  # failures do not make a route look fast
+    assert stats.latency == 3.0 and stats.success == 0.5
+    assert stats.expected_latency() == 6.0
+
+def test_unsampled_routes_first_then_fastest_per_bucket():
+    latency_router = router()
+    seed(latency_router, "a/m", "<1000", [3.0, 3.0])
+    seed(latency_router, "b/m", "<1000", [1.0, 1.0])
+    seed(latency_router, "a/m", "<4000", [2.0, 2.0])
+    seed(latency_router, "b/m", "<4000", [5.0, 5.0])
+
+    assert [r for r, _ in latency_router.rank(["a/m", "b/m"], "<1000")] == ["b/m", "a/m"]
+    assert [r for r, _ in latency_router.rank(["a/m", "b/m"], "<4000")] == ["a/m", "b/m"]
+    assert latency_router.rank(["a/m", "b/m", "c/m"], "<1000")[0] == ("c/m", None)
+
+def test_exploration_moves_another_route_first():
+    latency_router = router(explore_rate=1.0)
+    seed(latency_router, "a/m", "<1000", [1.0, 1.0])
+    seed(latency_router, "b/m", "<1000", [5.0, 5.0])
+    assert latency_router.rank(["a/m", "b/m"], "<1000")[0][0] == "b/m"
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_and_feeds_outcomes_back():
+    latency_router = router()
+    bucket = prompt_size_bucket("p")
+    seed(latency_router, "slow/m", bucket, [4.0, 4.0])
+    seed(latency_router, "fast/m", bucket, [0.5, 0.5])
+    slow, fast = FakeAIClient("slow"), FakeAIClient("fast")
+    client = RoutingAIClient(
+        [("slow/m", slow), ("fast/m", fast)], router=latency_router,
+        breakers={"slow/m": CircuitBreaker("slow/m"), "fast/m": CircuitBreaker("fast/m")}
+    )
+
+    response = await client.send_prompt("p")
+
+    assert response.content == "fast" and response.metadata["provider"] == "fast/m"
+    assert slow.calls == 0
+    assert latency_router.stats()["fast/m"][bucket]["samples"] == 3
+
+@pytest.mark.asyncio
+async def test_failed_route_falls_through_and_is_penalized():
+    latency_router = router(min_samples=1)
+    bucket = prompt_size_bucket("p")
+    seed(latency_router, "a/m", bucket, [0.5])
+    seed(latency_router, "b/m", bucket, [1.0])
+    broken = FakeAIClient(error=AIProviderException("down", status_code=503, retryable=True))
+    client = RoutingAIClient(
+        [("a/m", broken), ("b/m", FakeAIClient("b"))], router=latency_router,
+        breakers={"a/m": CircuitBreaker("a/m"), "b/m": CircuitBreaker("b/m")}
+    )
+
+    assert (await client.send_prompt("p")).content == "b"
+    stats = latency_router.stats()
+    assert stats["a/m"][bucket]["success_rate"] < 1.0
+    assert stats["b/m"][bucket]["samples"] == 2
+
+def test_routes_parse_and_put_primary_first():
+    assert parse_route("gemini/gemini-1.5-flash") == ("gemini", "gemini-1.5-flash")
+    assert parse_route("abacus") == ("abacus", None)
+    assert routing_routes("openai", ["gemini/x", "openai/y", "abacus"]) == ["openai/y", "gemini/x", "abacus"]
+
+def test_factory_retries_around_router_not_per_route(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+    client = create_routing_ai_client(["openai/gpt-4o-mini", "gemini/gemini-1.5-flash"], cache=False)
+
+    assert isinstance(client, RetryingAIClient) and isinstance(client.client, RoutingAIClient)
+    routes = client.client.clients
+    assert [route for route, _ in routes] == ["openai/gpt-4o-mini", "gemini/gemini-1.5-flash"]
+    assert all(isinstance(inner, RateLimitedAIClient) for _, inner in routes)
+
+@pytest.mark.asyncio
+async def test_large_prompts_escalate_to_larger_model():
+    small, large = FakeAIClient("small"), FakeAIClient("large")
+    client = EscalatingAIClient(small, large, threshold_tokens=100)
+
+    assert (await client.send_prompt("x" * 400)).content == "small"
+    response = await client.send_prompt("x" * 404)
+    assert response.content == "large" and response.metadata["escalated"]
+    assert client.model_name == "fake-model"
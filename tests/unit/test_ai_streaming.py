@@ -0,0 +1,171 @@
+# tests/unit/test_ai_streaming.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, Mock
+import httpx
+import pytest
+
+from app.domain.exceptions import AIProviderException, StepGenerationException
+from app.infrastructure.ai_client import GeminiAIClient, OpenAIClient
+from app.infrastructure.ai_generators import GherkinStep, InstructionStreamParser, PlaywrightGenerator
+from app.infrastructure.ai_resilience import RetryingAIClient, RetryPolicy
+from app.infrastructure.interfaces import HTMLSummarizerInterface
+from app.infrastructure.playwright_manager import ExecutionResult
+from app.services.operator_runner import OperatorRunnerService
+from tests.conftest import FakeAIClient
+
+ANSWER = (
+    '```json\n{"high_precision": ["await page.get_by_role(\'button\', name=\\"Log in\\").click()", '
+    '"await page.wait_for_url(\'**/home\')"], "notes": ["ignored"], '
+    '"low_precision": ["await page.locator(\'button.login\').click()"]}\n```'
+)
+CLICK, WAIT = "await page.get_by_role('button', name=\"Log in\").click()", "await page.wait_for_url('**/home')"
+
+def chunked(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def test_parser_yields_instructions_as_they_complete():
+    parser = InstructionStreamParser()
+    events = []
+    for i, chunk in enumerate(chunked(ANSWER, 3)):
+        events.extend((i, item) for item in parser.feed(chunk))
+
+    assert [item for _, item in events] == [
+        ("high_precision", CLICK),
+        ("high_precision", WAIT),
+        ("low_precision", "await page.locator('button.login').click()"),
+    ]
+    assert events[0][0] < len(ANSWER) // 3 // 2  # the first instruction came out early
+
+class SSEProvider:
+    """Local server streaming chat completion deltas as server-sent events, with a pause between them."""
+    def __init__(self, deltas, delay=0.05):
+        provider = self
+        self.paths = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                provider.paths.append(self.path)
+                provider.payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for delta in deltas:
+                    event = {"choices": [{"delta": {"content": delta}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                    self.wfile.flush()
+                    time.sleep(delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.mark.asyncio
+async def test_openai_streams_deltas_over_sse():
+    provider = SSEProvider(chunked(ANSWER, 20), delay=0.05)
+    try:
+        async with httpx.AsyncClient() as http_client:
+            client = OpenAIClient(api_key="test-key", http_client=http_client)
+            client._base_url = provider.url
+            start = time.perf_counter()
+            arrivals, chunks = [], []
+            async for text in client.stream_prompt("prompt"):
+                arrivals.append(time.perf_counter() - start)
+                chunks.append(text)
+    finally:
+        provider.close()
+
+    assert "".join(chunks) == ANSWER
+    assert provider.payload["stream"] is True
+    assert arrivals[0] < arrivals[-1] - 0.1
+
+@pytest.mark.asyncio
+async def test_gemini_uses_stream_endpoint_and_maps_errors():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url)
+        if len(seen) == 1:
+            body = "".join(
+                f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]})}\r\n\r\n"
+                for text in ("Feature: ", "Login")
+            )
+            return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+        return httpx.Response(503, json={"error": "overloaded"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = GeminiAIClient(api_key="test-key", http_client=http_client)
+        assert [text async for text in client.stream_prompt("prompt")] == ["Feature: ", "Login"]
+        with pytest.raises(AIProviderException) as error:
+            [text async for text in client.stream_prompt("prompt")]
+
+    assert seen[0].path.endswith(":streamGenerateContent") and seen[0].params["alt"] == "sse"
+    assert error.value.status_code == 503 and error.value.retryable
+
+@pytest.mark.asyncio
+async def test_retry_applies_only_before_the_first_chunk():
+    client = FakeAIClient(chunks=["a", "b"], failures=2)
+    retrying = RetryingAIClient(client, RetryPolicy(max_attempts=3, base_delay=0.001))
+    assert [text async for text in retrying.stream_prompt("p")] == ["a", "b"]
+    assert client.calls == 3
+
+    broken = FakeAIClient(chunks=["a"], error=AIProviderException("connection reset", retryable=True))
+    with pytest.raises(AIProviderException):
+        [text async for text in RetryingAIClient(broken, RetryPolicy(base_delay=0.001)).stream_prompt("p")]
+    assert broken.calls == 1
+
+@pytest.mark.asyncio
+async def test_generator_streams_and_validates_the_whole_answer():
+    generator = PlaywrightGenerator(FakeAIClient(chunks=chunked(ANSWER)))
+    items = [item async for item in generator.stream_instructions("{}", "When I log in")]
+    assert items[:2] == [("high_precision", CLICK), ("high_precision", WAIT)]
+
+    truncated = PlaywrightGenerator(FakeAIClient(chunks=chunked(ANSWER[:ANSWER.index("notes")])))
+    assert [item async for item in truncated.stream_instructions("{}", "When I log in")] == items[:2]
+
+    with pytest.raises(StepGenerationException):
+        [item async for item in PlaywrightGenerator(FakeAIClient(chunks=["Sorry, no."])).stream_instructions("{}", "x")]
+
+@pytest.mark.asyncio
+async def test_runner_executes_first_instruction_while_answer_streams(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    summarizer = Mock(spec=HTMLSummarizerInterface)
+    summarizer.summarize_html.return_value = {"role": "WebArea", "name": "Shop", "children": [
+        {"role": "button", "name": "Log in"},
+    ]}
+    runner = OperatorRunnerService(
+        ai_client_type="openai",
+        html_summarizer=summarizer,
+        snapshot_storage=Mock(),
+        snapshot_html_storage=Mock(),
+        stream_instructions=True
+    )
+    ai_client = FakeAIClient(chunks=chunked(ANSWER), delay=0.01)
+    runner.playwright_generator = PlaywrightGenerator(ai_client)
+    executed_while_streaming = []
+
+    async def execute_step(instruction):
+        executed_while_streaming.append((instruction, ai_client.finished))
+        return ExecutionResult(success=True, screenshot_path=None)
+
+    runner._browser_manager = Mock()
+    runner._browser_manager._page = None
+    runner._browser_manager.get_page_content = AsyncMock(return_value="<html></html>")
+    runner._browser_manager.execute_step = execute_step
+
+    result = await runner._execute_single_step("log in", GherkinStep(gherkin="When I log in", action="click", target="Log in"))
+
+    assert result.execution_result.success
+    assert result.playwright_instruction == WAIT
+    assert executed_while_streaming == [(CLICK, False), (WAIT, False)]
+    assert result.prompt_stats["time_to_first_instruction"] < result.prompt_stats["generation_time"]
@@ -0,0 +1,177 @@
+# tests/unit/test_browser_dom_summarizer.py
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+
+from app.infrastructure.browser_dom_summarizer import BrowserDOMSummarizer
+from app.infrastructure.html_summarizer import HTMLSummarizer, create_html_summarizer
+from app.domain.exceptions import SnapshotParsingException
+from app.services.operator_runner import OperatorRunnerService
+
+SUMMARY = {"role": "WebArea", "name": "Login", "children": [{"role": "button", "name": "Login"}]}
+
+@pytest.fixture
+def browser_manager():
+    manager = Mock()
+    manager.evaluate_script = AsyncMock(return_value=SUMMARY)
+    manager.get_page_content = AsyncMock(return_value="<html></html>")
+    return manager
+
+@pytest.mark.asyncio
+async def test_summarize_page_runs_walker_with_config(browser_manager):
+    summarizer = BrowserDOMSummarizer()
+    result = await summarizer.summarize_page(browser_manager)
+
+    assert result == SUMMARY
+    script, args = browser_manager.evaluate_script.call_args.args
+    assert script.lstrip().startswith("//")
+    assert "getComputedStyle" in script
+    assert args["incremental"] is False
+    assert set(args["config"]) == {"role_map", "input_type_map", "visible_attributes"}
+
+@pytest.mark.asyncio
+async def test_summarize_page_rejects_unexpected_result(browser_manager):
+    browser_manager.evaluate_script.return_value = None
+    with pytest.raises(SnapshotParsingException):
+        await BrowserDOMSummarizer().summarize_page(browser_manager)
+
+def test_summarize_html_uses_fallback():
+    fallback = Mock()
+    fallback.summarize_html = Mock(return_value=SUMMARY)
+    assert BrowserDOMSummarizer(fallback=fallback).summarize_html("<p>x</p>") == SUMMARY
+    fallback.summarize_html.assert_called_once_with("<p>x</p>")
+
+def test_factory_creates_browser_summarizer():
+    assert isinstance(create_html_summarizer("browser"), BrowserDOMSummarizer)
+    assert create_html_summarizer("browser_incremental").incremental is True
+
+def incremental_result(status, session="s1", version=1, visited=0, reused=0, summary=SUMMARY):
+    result = {"status": status, "session": session, "version": version,
+              "stats": {"visited": visited, "reused": reused}}
+    if status != "unchanged":
+        result["summary"] = summary
+    return result
+
+@pytest.mark.asyncio
+async def test_incremental_reuses_summary_when_page_unchanged(browser_manager):
+    browser_manager.evaluate_script.side_effect = [
+        incremental_result("full", visited=4),
+        incremental_result("unchanged"),
+    ]
+    summarizer = BrowserDOMSummarizer(incremental=True)
+
+    first = await summarizer.summarize_page(browser_manager)
+    second = await summarizer.summarize_page(browser_manager)
+
+    assert first == second == SUMMARY
+    assert summarizer.last_stats["status"] == "unchanged"
+    _, args = browser_manager.evaluate_script.call_args.args
+    assert args["incremental"] is True and args["force"] is False
+
+@pytest.mark.asyncio
+async def test_incremental_records_reuse_stats(browser_manager):
+    updated = {"role": "WebArea", "name": "Login", "children": [{"role": "button", "name": "Sign in"}]}
+    browser_manager.evaluate_script.side_effect = [
+        incremental_result("full", visited=4),
+        incremental_result("incremental", version=2, visited=2, reused=1, summary=updated),
+    ]
+    summarizer = BrowserDOMSummarizer(incremental=True)
+
+    await summarizer.summarize_page(browser_manager)
+    assert await summarizer.summarize_page(browser_manager) == updated
+    assert summarizer.last_stats == {"status": "incremental", "version": 2, "visited": 2, "reused": 1}
+
+@pytest.mark.asyncio
+async def test_incremental_forces_full_walk_for_foreign_session(browser_manager):
+    browser_manager.evaluate_script.side_effect = [
+        incremental_result("unchanged", session="other"),
+        incremental_result("full", session="other", visited=4),
+    ]
+    summarizer = BrowserDOMSummarizer(incremental=True)
+
+    assert await summarizer.summarize_page(browser_manager) == SUMMARY
+    _, args = browser_manager.evaluate_script.call_args.args
+    assert args["force"] is True
+
+@pytest.mark.asyncio
+async def test_runner_skips_html_transfer_in_browser_mode(browser_manager):
+    snapshot_storage = Mock()
+    snapshot_html_storage = Mock()
+    with patch('app.services.operator_runner.create_nl_to_gherkin_generator'), \
+         patch('app.services.operator_runner.create_playwright_generator'):
+        runner = OperatorRunnerService(
+            html_summarizer=BrowserDOMSummarizer(),
+            snapshot_storage=snapshot_storage,
+            snapshot_html_storage=snapshot_html_storage
+        )
+    runner._browser_manager = browser_manager
+
+    snapshot_json, html = await runner._capture_snapshot()
+
+    assert snapshot_json == SUMMARY
+    assert html is None
+    browser_manager.get_page_content.assert_not_called()
+
+# Pages the in-page walker and HTMLSummarizer must summarize identically. Elements the
+# browser does not lay out (e.g. the options of a closed <select>) are left out, since
+# the walker reports them hidden by their missing layout box.
+PARITY_PAGES = [
+    """<html><head><title>Login</title></head><body>
+    <h1>Welcome back</h1>
+    <p>Please sign in to continue</p>
+    <form id="login-form"><input type="email" placeholder="Email" name="email">
+      <input type="password" placeholder="Password"><button type="submit" id="login-button">Sign in</button></form>
+    <ul class="menu  main"><li><a href="/a">Alpha</a></li><li><a href="/b">Beta</a></li></ul>
+    <div style="display: none">Hidden div</div>
+    <nav aria-hidden="true"><a href="/a">A</a></nav>
+    <p>Before <b>bold</b> after</p>
+    </body></html>""",
+    """<html><head><title>Docs</title><style>.x { color: red }</style></head><body>
+    <header><h2 aria-level="3">Guide</h2><a href="/home" aria-label="Home page">Home</a></header>
+    <main><article><h3>Install</h3><p>Run the installer.</p><textarea placeholder="Notes"></textarea></article>
+      <section style="opacity: 0"><p>Faded</p></section></main>
+    <footer><span>Footer text</span> <a href="/terms">Terms</a></footer>
+    </body></html>""",
+]
+
+@pytest.fixture
+async def live_browser():
+    from app.infrastructure.playwright_manager import create_browser_manager
+    manager = create_browser_manager()
+    try:
+        await manager.start()
+    except Exception as e:
+        pytest.skip(f"Chromium is not available (run `playwright install chromium`): {str(e).splitlines()[0]}")
+    try:
+        yield manager
+    finally:
+        await manager.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("html", PARITY_PAGES)
+async def test_in_page_walker_matches_html_summarizer(live_browser, html):
+    await live_browser.page.set_content(html)
+    expected = HTMLSummarizer().summarize_html(await live_browser.get_page_content())
+
+    assert await BrowserDOMSummarizer().summarize_page(live_browser) == expected
+    assert await BrowserDOMSummarizer(incremental=True).summarize_page(live_browser) == expected
+
+@pytest.mark.asyncio
+async def test_incremental_walker_matches_html_summarizer_after_mutations(live_browser):
+    await live_browser.page.set_content(PARITY_PAGES[0])
+    summarizer = BrowserDOMSummarizer(incremental=True)
+    await summarizer.summarize_page(live_browser)
+    assert summarizer.last_stats["status"] == "full"
+
+    await live_browser.page.evaluate("""() => {
+        document.querySelector('#login-button').textContent = 'Log in';
+        document.querySelector('ul').setAttribute('style', 'display: none');
+        document.body.insertAdjacentHTML('beforeend', '<p>Signed out</p>');
+    }""")
+    summary = await summarizer.summarize_page(live_browser)
+    expected = HTMLSummarizer().summarize_html(await live_browser.get_page_content())
+
+    assert summary == expected
+    assert summarizer.last_stats["status"] == "incremental" and summarizer.last_stats["reused"] > 0
+    assert summary == await BrowserDOMSummarizer().summarize_page(live_browser)
+    assert await summarizer.summarize_page(live_browser) == expected
+    assert summarizer.last_stats["status"] == "unchanged"
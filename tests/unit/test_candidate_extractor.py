@@ -0,0 +1,69 @@
+# tests/unit/test_candidate_extractor.py
+import pytest
+
+from app.infrastructure.ai_generators import GherkinStep
+from app.infrastructure.candidate_extractor import CandidateExtractor, CandidateIndex, tokenize
+
+SNAPSHOT = {
+    "role": "WebArea",
+    "name": "Shop",
+    "children": [
+        {"role": "banner", "name": "", "children": [
+            {"role": "link", "name": "Home", "attributes": {"href": "/"}},
+            {"role": "textbox", "name": "", "attributes": {"placeholder": "Search products", "id": "q"}},
+        ]},
+        {"role": "main", "name": "", "children": [
+            {"role": "text", "name": f"Article paragraph {index}"} for index in range(50)
+        ] + [
+            {"role": "form", "name": "", "attributes": {"id": "login-form"}, "children": [
+                {"role": "textbox", "name": "", "attributes": {"data-testid": "username-input", "placeholder": "Username"}},
+                {"role": "button", "name": "Sign in", "attributes": {"id": "loginButton"}},
+            ]},
+        ]},
+    ],
+}
+
+def step(target: str, action: str = "click", value: str = None) -> GherkinStep:
+    return GherkinStep(gherkin=f"When I {action} {target}", action=action, target=target, value=value)
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("loginButton user_name-field") == ["login", "button", "user", "name", "field"]
+    assert tokenize("Products") == ["product"]
+
+def test_index_covers_names_and_identifying_attributes():
+    index = CandidateIndex(SNAPSHOT)
+    matches = index.search(["username"], limit=5)
+
+    assert matches[0][2]["attributes"]["data-testid"] == "username-input"
+
+def test_extract_keeps_candidates_and_ancestors():
+    selection = CandidateExtractor(top_k=1).extract(SNAPSHOT, step("login button"))
+
+    assert not selection.fallback
+    assert selection.candidates[0].name == "Sign in"
+    main = selection.snapshot["children"][1]
+    assert main["role"] == "main"
+    assert main["children"][0] == {"role": "omitted", "name": "50 more", "count": 50}
+    form = main["children"][1]
+    assert form["attributes"] == {"id": "login-form"}
+    assert form["children"] == [
+        {"role": "omitted", "name": "1 more", "count": 1},
+        {"role": "button", "name": "Sign in", "attributes": {"id": "loginButton"}},
+    ]
+    assert selection.snapshot["children"][0] == {"role": "omitted", "name": "3 more", "count": 3}
+    assert selection.kept_nodes < selection.total_nodes
+
+def test_action_role_breaks_ties():
+    candidates, _ = CandidateExtractor().rank(SNAPSHOT, step("search", action="input"))
+    assert candidates[0].role == "textbox"
+
+def test_candidate_subtree_is_kept():
+    selection = CandidateExtractor(top_k=1).extract(SNAPSHOT, step("login form"))
+    form = selection.snapshot["children"][1]["children"][1]
+    assert [child["role"] for child in form["children"]] == ["textbox", "button"]
+
+@pytest.mark.parametrize("target_step", [step("checkout"), step("the page", action="navigate")])
+def test_falls_back_to_full_snapshot(target_step):
+    selection = CandidateExtractor().extract(SNAPSHOT, target_step)
+    assert selection.fallback
+    assert selection.snapshot is SNAPSHOT
@@ -0,0 +1,31 @@
+# tests/unit/test_health.py
+import pytest
+
+from app.services.health import HealthChecker
+
+@pytest.fixture
+def checker(monkeypatch):
+    checker = HealthChecker()
+    monkeypatch.setattr(checker, "_check_system_health", lambda: {"status": "healthy"})
+    return checker
+
+@pytest.mark.asyncio
+async def test_check_reports_cache_and_ai_service_healthy(checker):
+    health = await checker.check()
+
+    assert "error" not in health
+    assert health["cache"]["status"] == "healthy"
+    assert {"snapshot_summaries", "ai_responses"} <= set(health["cache"])
+    assert health["ai_service"]["status"] == "healthy"
+    assert {"abacus_executor", "rate_limits", "hedging", "circuits", "routing"} <= set(health["ai_service"])
+
+@pytest.mark.asyncio
+async def test_failing_component_is_reported_unhealthy(checker, monkeypatch):
+    def broken():
+        raise RuntimeError("cache unavailable")
+    monkeypatch.setattr("app.services.health.get_summary_cache", broken)
+
+    health = await checker.check()
+
+    assert health["cache"] == {"status": "unhealthy", "error": "cache unavailable"}
+    assert health["ai_service"]["status"] == "healthy"
@@ -0,0 +1,83 @@
+# tests/unit/test_html_history.py
+import pytest
+
+from app.infrastructure.html_history import (
+    HTMLHistoryWriter,
+    HTMLHistoryReader,
+    DeltaSnapshotHTMLStorage,
+    compute_delta,
+    apply_delta
+)
+from app.infrastructure.snapshot_storage import SnapshotWriter, set_snapshot_context, reset_snapshot_context
+from tests.conftest import make_page
+
+def flow(steps: int):
+    """Page states of an in-page flow: one more item added to the cart per step."""
+    base = make_page(300)
+    for step in range(steps):
+        cart = "".join(f"<li>Cart item {i}</li>" for i in range(step))
+        yield base.replace("<ul>", f'<div id="cart"><ul>{cart}</ul></div><ul>', 1)
+
+@pytest.mark.parametrize("base,target", [
+    ("", "<p>new</p>"),
+    ("<p>old</p>", ""),
+    ("<div><p>a</p><p>b</p></div>", "<div><p>a</p><span>x</span><p>b</p></div>"),
+    ("<div><p>a</p><p>b</p></div>", "<div><p>b</p></div>tail"),
+    ("no tags at all", "no tags at all, still"),
+])
+def test_delta_round_trip(base, target):
+    assert apply_delta(base, compute_delta(base, target)) == target
+
+def test_delta_round_trip_without_diff():
+    base, target = "<a>1</a><b>2</b>", "<a>1</a><c>3</c><b>2</b>"
+    assert apply_delta(base, compute_delta(base, target, max_diff_tokens=0)) == target
+
+def test_in_page_steps_are_stored_as_small_deltas(tmp_path):
+    pages = list(flow(6))
+    history = HTMLHistoryWriter(str(tmp_path))
+    types = [history.append(step, page, "https://shop.test/") for step, page in enumerate(pages)]
+
+    assert types == ["keyframe"] + ["delta"] * 5
+    assert history.stored_bytes < 1.3 * len(pages[0])
+    reader = HTMLHistoryReader(str(tmp_path))
+    assert reader.steps() == list(range(6))
+    # Random access, in any order.
+    for step in (4, 1, 5, 0, 3, 2):
+        assert reader.read(step) == pages[step]
+
+def test_keyframe_on_navigation_and_chain_limit(tmp_path):
+    pages = list(flow(5))
+    history = HTMLHistoryWriter(str(tmp_path), max_chain=2)
+    urls = ["https://shop.test/", "https://shop.test/", "https://shop.test/", "https://shop.test/", "https://shop.test/cart"]
+    types = [history.append(step, page, url) for step, (page, url) in enumerate(zip(pages, urls))]
+
+    assert types == ["keyframe", "delta", "delta", "keyframe", "keyframe"]
+    reader = HTMLHistoryReader(str(tmp_path))
+    assert [reader.read(step) for step in reader.steps()] == pages
+    assert reader.url(4) == "https://shop.test/cart"
+
+def test_unrelated_page_becomes_keyframe(tmp_path):
+    history = HTMLHistoryWriter(str(tmp_path))
+    history.append(0, make_page(50))
+    assert history.append(1, "<html><body>" + "<p>other</p>" * 100 + "</body></html>") == "keyframe"
+
+def test_storage_writes_history_per_run(tmp_path):
+    writer = SnapshotWriter(max_pending=16)
+    pages = list(flow(3))
+    try:
+        storage = DeltaSnapshotHTMLStorage(str(tmp_path), writer)
+        for run_id in ("a", "b"):
+            for step, page in enumerate(pages):
+                token = set_snapshot_context(run_id, step, "https://shop.test/")
+                try:
+                    storage.save_snapshot(page)
+                finally:
+                    reset_snapshot_context(token)
+        assert writer.flush(5)
+    finally:
+        writer.close()
+
+    for run_id in ("a", "b"):
+        reader = HTMLHistoryReader(str(tmp_path / run_id))
+        assert [reader.read(step) for step in reader.steps()] == pages
+        assert [reader.index[step]["type"] for step in reader.steps()] == ["keyframe", "delta", "delta"]
@@ -1,16 +1,18 @@
 # src/operateXRayTestCases/tests/test_html_parser.py
 import pytest
 from bs4 import BeautifulSoup, Comment, NavigableString
-from app.infrastructure.html_summarizer import HTMLSummarizer
+from app.infrastructure.html_summarizer import HTMLSummarizer, create_html_summarizer
 from pathlib import Path
 
 def create_soup(html):
     return BeautifulSoup(html, 'lxml')  # Updated to lxml for consistency
 
-@pytest.fixture
-def summarizer():
-    """Fixture for HTMLSummarizer instance."""
-    return HTMLSummarizer(parser='lxml')
+@pytest.fixture(params=["beautifulsoup", "lxml"])
+def summarizer(request):
+    """Fixture for each HTMLSummarizerInterface backend (BeautifulSoup and lxml-native)."""
+    if request.param == "beautifulsoup":
+        return HTMLSummarizer(parser='lxml')
+    return create_html_summarizer(request.param)
 
 @pytest.fixture
 def simple_html():
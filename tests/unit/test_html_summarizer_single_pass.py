@@ -0,0 +1,40 @@
+# tests/unit/test_html_summarizer_single_pass.py
+import json
+import pytest
+from pathlib import Path
+from app.infrastructure.html_summarizer import HTMLSummarizer
+from tests.conftest import PARITY_CASES
+
+ROOT = Path(__file__).parent.parent.parent
+
+STATIC_PAGES = [
+    ROOT / "app" / "static" / "index.html",
+    ROOT / "app" / "static" / "web-app.html",
+    ROOT / "app" / "static" / "web-app-v2.html",
+    ROOT / "tests" / "test_data" / "snapshots" / "example_page.html",
+]
+
+
+def _dump(result):
+    return json.dumps(result, indent=2)
+
+
+def test_unknown_engine_rejected():
+    with pytest.raises(ValueError):
+        HTMLSummarizer(engine="quadratic")
+
+
+@pytest.mark.parametrize("parser", ["lxml", "html5lib"])
+@pytest.mark.parametrize("html", PARITY_CASES)
+def test_single_pass_matches_recursive_engine(html, parser):
+    single_pass = HTMLSummarizer(parser=parser, engine="single_pass")
+    recursive = HTMLSummarizer(parser=parser, engine="recursive")
+    assert _dump(single_pass.summarize_html(html)) == _dump(recursive.summarize_html(html))
+
+
+@pytest.mark.parametrize("page", STATIC_PAGES, ids=lambda p: p.name)
+def test_single_pass_matches_recursive_engine_on_pages(page):
+    html = page.read_text(encoding="utf-8")
+    single_pass = HTMLSummarizer(engine="single_pass")
+    recursive = HTMLSummarizer(engine="recursive")
+    assert _dump(single_pass.summarize_html(html)) == _dump(recursive.summarize_html(html))
@@ -0,0 +1,150 @@
+# tests/unit/test_instruction_cache.py
+import json
+import threading
+from unittest.mock import AsyncMock, Mock
+import pytest
+
+from app.infrastructure.ai_generators import GherkinStep
+from app.infrastructure.instruction_cache import InstructionCache, normalize_step, snapshot_fingerprint
+from app.infrastructure.interfaces import HTMLSummarizerInterface
+from app.infrastructure.playwright_manager import ExecutionResult
+from app.infrastructure.response_cache import ResponseCache
+from app.services.operator_runner import OperatorRunnerService
+
+def login_page(updated_at="12:01", button_id="login"):
+    return {"role": "WebArea", "name": "Shop", "children": [
+        {"role": "paragraph", "name": f"Last updated {updated_at}"},
+        {"role": "link", "name": "Cart (3 items)", "attributes": {"href": "/cart"}},
+        {"role": "button", "name": "Login", "attributes": {"id": button_id}},
+    ]}
+
+CLICK_LOGIN = "await page.get_by_role('button', name='Login').click()"
+STEP = GherkinStep(gherkin="When I click the Login button", action="click", target="Login button")
+
+@pytest.fixture
+def cache(tmp_path):
+    store = ResponseCache(str(tmp_path / "instructions.sqlite3"))
+    yield InstructionCache(store)
+    store.close()
+
+def test_step_normalization():
+    assert normalize_step("When  I click the Login button.") == normalize_step("and i click the login button")
+
+def test_fingerprint_ignores_text_and_counters_but_not_structure():
+    assert snapshot_fingerprint(login_page("12:01")) == snapshot_fingerprint(login_page("18:45"))
+    cart_changed = login_page()
+    cart_changed["children"][1]["name"] = "Cart (12 items)"
+    assert snapshot_fingerprint(cart_changed) == snapshot_fingerprint(login_page())
+    assert snapshot_fingerprint(login_page(button_id="sign-in")) != snapshot_fingerprint(login_page())
+
+def test_put_get_invalidate(cache):
+    key = cache.key(STEP.gherkin, login_page())
+    assert cache.get(key) is None
+    cache.put(key, [CLICK_LOGIN], STEP.gherkin)
+    assert cache.get(cache.key("And I click the login button", login_page("09:30"))) == [CLICK_LOGIN]
+    cache.invalidate(key)
+    assert cache.get(key) is None
+    assert cache.stats()["invalidations"] == 1
+
+@pytest.fixture
+def runner(cache, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    summarizer = Mock(spec=HTMLSummarizerInterface)
+    summarizer.summarize_html.return_value = login_page()
+    runner = OperatorRunnerService(
+        ai_client_type="openai",
+        html_summarizer=summarizer,
+        snapshot_storage=Mock(),
+        snapshot_html_storage=Mock(),
+        instruction_cache=cache
+    )
+    runner.playwright_generator = Mock()
+    runner.playwright_generator.generate_instruction = AsyncMock(return_value=json.dumps({
+        "high_precision": [CLICK_LOGIN], "low_precision": ["await page.locator('#login').click()"]
+    }))
+    runner._browser_manager = Mock()
+    runner._browser_manager._page = None
+    runner._browser_manager.get_page_content = AsyncMock(return_value="<html></html>")
+    runner._browser_manager.execute_step = AsyncMock(return_value=ExecutionResult(success=True, screenshot_path=None))
+    return runner
+
+@pytest.mark.asyncio
+async def test_runner_replays_successful_instructions(runner):
+    first = await runner._execute_single_step("click login", STEP)
+    second = await runner._execute_single_step("click login", STEP)
+
+    assert first.execution_result.success and second.execution_result.success
+    assert second.playwright_instruction == CLICK_LOGIN
+    assert runner.playwright_generator.generate_instruction.await_count == 1
+    assert (first.prompt_stats["instruction_cache"], second.prompt_stats["instruction_cache"]) == ("miss", "hit")
+
+@pytest.mark.asyncio
+async def test_runner_regenerates_after_cached_instruction_fails(runner):
+    await runner._execute_single_step("click login", STEP)
+    new_click = "await page.locator('#sign-in').click()"
+    runner.playwright_generator.generate_instruction.return_value = json.dumps(
+        {"high_precision": [new_click], "low_precision": []}
+    )
+    runner._browser_manager.execute_step.side_effect = [
+        ExecutionResult(success=False, screenshot_path=None, error_message="Timeout waiting for Login"),
+        ExecutionResult(success=True, screenshot_path=None),
+    ]
+
+    result = await runner._execute_single_step("click login", STEP)
+
+    assert result.execution_result.success
+    assert result.playwright_instruction == new_click
+    assert result.prompt_stats["instruction_cache"] == "invalidated"
+    assert runner.playwright_generator.generate_instruction.await_count == 2
+
+    runner._browser_manager.execute_step.side_effect = None
+    replay = await runner._execute_single_step("click login", STEP)
+    assert replay.playwright_instruction == new_click
+    assert runner.playwright_generator.generate_instruction.await_count == 2
+
+@pytest.mark.asyncio
+async def test_partial_replay_stops_and_regenerates_from_fresh_snapshot(runner):
+    fill_user = "await page.get_by_label('User').fill('bob')"
+    runner.playwright_generator.generate_instruction.return_value = json.dumps(
+        {"high_precision": [fill_user, CLICK_LOGIN], "low_precision": []}
+    )
+    await runner._execute_single_step("log in", STEP)
+    new_click = "await page.locator('#sign-in').click()"
+    runner.playwright_generator.generate_instruction.return_value = json.dumps(
+        {"high_precision": [new_click], "low_precision": []}
+    )
+    runner._browser_manager.execute_step.reset_mock()
+    runner._browser_manager.execute_step.side_effect = [
+        ExecutionResult(success=True, screenshot_path=None),
+        ExecutionResult(success=False, screenshot_path=None, error_message="Timeout waiting for Login"),
+        ExecutionResult(success=True, screenshot_path=None),
+    ]
+    summaries = runner.html_summarizer.summarize_html.call_count
+
+    result = await runner._execute_single_step("log in", STEP)
+
+    executed = [call.args[0] for call in runner._browser_manager.execute_step.await_args_list]
+    assert executed == [fill_user, CLICK_LOGIN, new_click]
+    assert runner.html_summarizer.summarize_html.call_count == summaries + 2
+    assert result.playwright_instruction == new_click
+    assert result.prompt_stats["replayed"] == [fill_user]
+
+@pytest.mark.asyncio
+async def test_runner_keeps_cache_io_off_the_event_loop(runner, cache):
+    threads = []
+    for name in ("get", "put", "delete"):
+        method = getattr(cache.store, name)
+        def recording(*args, _method=method, _name=name):
+            threads.append((_name, threading.get_ident()))
+            return _method(*args)
+        setattr(cache.store, name, recording)
+    await runner._execute_single_step("click login", STEP)
+    runner._browser_manager.execute_step.side_effect = [
+        ExecutionResult(success=False, screenshot_path=None, error_message="Timeout waiting for Login"),
+        ExecutionResult(success=True, screenshot_path=None),
+    ]
+
+    await runner._execute_single_step("click login", STEP)
+
+    assert {name for name, _ in threads} == {"get", "put", "delete"}
+    assert threading.get_ident() not in {thread for _, thread in threads}
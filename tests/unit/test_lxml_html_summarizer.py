@@ -0,0 +1,71 @@
+# tests/unit/test_lxml_html_summarizer.py
+import json
+import pytest
+from pathlib import Path
+from app.infrastructure.html_summarizer import HTMLSummarizer, create_html_summarizer
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+
+ROOT = Path(__file__).parent.parent.parent
+
+PARITY_CASES = [
+    "",
+    "   ",
+    "<!-- only a comment -->",
+    "<title>No body</title>",
+    "<div>Unclosed tag",
+    '<?xml version="1.0" encoding="utf-8"?><html><body><p>Declared</p></body></html>',
+    "<html><head><title>Test <!-- comment --> Page</title></head><body><p>Text</p></body>",
+    """
+    <body>
+        <div class="mobile-nav"><button>Menu</button><span><a href="#">Deep</a></span></div>
+        <nav aria-hidden="true"><a href="/a">A</a></nav>
+        <div hidden><p>Empty hidden attribute</p></div>
+        <div style="opacity: 0"><div><img src="x.png"></div></div>
+        <div><script>var x = 1;</script><style>p { color: red; }</style><template><p>T</p></template></div>
+        <p>Before <b>bold</b> after <!-- note --> end</p>
+        <button>
+            <span>Go</span>
+        </button>
+        <button><!-- icon --></button>
+        <div class="  a   b "><input type="hidden" value="csrf"></div>
+        <div role="heading" aria-level="x">Bad level</div>
+        <select haspopup="listbox"><option>One</option></select>
+        <textarea focused="true">Notes</textarea>
+    </body>
+    """,
+    "<body><form><input name='q' focus='true'><input name='r'><textarea></textarea></form></body>",
+]
+
+STATIC_PAGES = [
+    ROOT / "app" / "static" / "index.html",
+    ROOT / "app" / "static" / "web-app.html",
+    ROOT / "app" / "static" / "web-app-v2.html",
+    ROOT / "tests" / "test_data" / "snapshots" / "example_page.html",
+]
+
+
+def _dump(result):
+    return json.dumps(result, indent=2)
+
+
+def test_factory_creates_lxml_backend():
+    assert isinstance(create_html_summarizer("lxml"), LxmlHTMLSummarizer)
+    assert isinstance(create_html_summarizer("beautifulsoup"), HTMLSummarizer)
+    with pytest.raises(ValueError):
+        create_html_summarizer("regex")
+
+
+@pytest.mark.parametrize("html", PARITY_CASES)
+def test_lxml_backend_matches_beautifulsoup(html):
+    assert _dump(LxmlHTMLSummarizer().summarize_html(html)) == _dump(HTMLSummarizer().summarize_html(html))
+
+
+@pytest.mark.parametrize("page", STATIC_PAGES, ids=lambda p: p.name)
+def test_lxml_backend_matches_beautifulsoup_on_pages(page):
+    html = page.read_text(encoding="utf-8")
+    assert _dump(LxmlHTMLSummarizer().summarize_html(html)) == _dump(HTMLSummarizer().summarize_html(html))
+
+
+def test_lxml_backend_rejects_none():
+    with pytest.raises(ValueError):
+        LxmlHTMLSummarizer().summarize_html(None)
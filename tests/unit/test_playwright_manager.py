@@ -117,4 +117,32 @@ async def test_screenshot_functionality():
         assert result.screenshot_path.endswith('.png')
         assert result.execution_time > 0
     finally:
-        await browser_manager.stop()
\ No newline at end of file
+        await browser_manager.stop()
+
+@pytest.mark.asyncio
+async def test_in_browser_summary():
+    """Test summarizing the live DOM with the in-page walker."""
+    from app.infrastructure.browser_dom_summarizer import BrowserDOMSummarizer
+    browser_manager = create_browser_manager()
+
+    try:
+        await browser_manager.start()
+        await browser_manager.page.set_content(
+            "<title>Login</title>"
+            "<div id='login-form'><input type='email' placeholder='Email'>"
+            "<button id='login-button'>Login</button></div>"
+            "<p class='note' style='visibility: hidden'>Hidden note</p>"
+            "<script>window.secret = 1;</script>"
+        )
+        summary = await BrowserDOMSummarizer().summarize_page(browser_manager)
+
+        assert summary["role"] == "WebArea"
+        assert summary["name"] == "Login"
+        form, note = summary["children"]
+        assert form["attributes"] == {"id": "login-form"}
+        assert form["children"][0]["role"] == "textbox"
+        assert form["children"][0]["name"] == "Email"
+        assert form["children"][1] == {"role": "button", "name": "Login", "attributes": {"id": "login-button"}}
+        assert note["visibility"] == "hidden"
+    finally:
+        await browser_manager.stop()
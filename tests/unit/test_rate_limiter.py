@@ -0,0 +1,81 @@
+# tests/unit/test_rate_limiter.py
+import asyncio
+import time
+import pytest
+
+from app.infrastructure.ai_client import create_ai_client
+from app.infrastructure.ai_resilience import RetryingAIClient
+from app.infrastructure.rate_limiter import (
+    RateLimiter,
+    RateLimitedAIClient,
+    estimate_tokens,
+    get_rate_limiter,
+    rate_limiter_stats
+)
+from tests.conftest import FakeAIClient
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_admits_in_arrival_order():
+    limiter = RateLimiter(max_concurrency=2)
+    client = FakeAIClient(lambda prompt: prompt, delay=0.02)
+    order = []
+
+    async def call(i):
+        response = await RateLimitedAIClient(client, limiter).send_prompt(str(i))
+        order.append(int(response.content))
+        return response
+
+    responses = await asyncio.gather(*(call(i) for i in range(6)))
+
+    assert client.peak == 2
+    assert order == list(range(6))
+    assert responses[-1].metadata["rate_limit_wait"] > 0
+    stats = limiter.stats()
+    assert stats["admitted"] == 6 and stats["in_flight"] == 0 and stats["queued"] == 0
+    assert stats["max_queue_wait"] > 0
+
+@pytest.mark.asyncio
+async def test_token_bucket_delays_without_overtaking():
+    limiter = RateLimiter(tpm=600)  # 10 tokens per second
+    await limiter.acquire(600)
+    limiter.release()
+
+    start = time.perf_counter()
+    big = asyncio.create_task(limiter.acquire(5))
+    await asyncio.sleep(0)
+    small = asyncio.create_task(limiter.acquire(1))
+    done, _ = await asyncio.wait({big, small}, return_when=asyncio.FIRST_COMPLETED)
+
+    assert done == {big}
+    assert time.perf_counter() - start >= 0.4
+    await small
+    limiter.release()
+    limiter.release()
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = RateLimiter(max_concurrency=1)
+    await limiter.acquire()
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert limiter.stats()["queued"] == 0
+
+    limiter.release()
+    await asyncio.wait_for(limiter.acquire(), 1)
+    limiter.release()
+    assert limiter.stats()["in_flight"] == 0
+
+def test_estimate_counts_prompt_and_reserved_completion():
+    assert estimate_tokens("x" * 400, max_tokens=1000) == 1100
+
+def test_factory_shares_one_limiter_per_provider_model():
+    first = create_ai_client("openai", api_key="test-key", model_name="gpt-4o", cache=False)
+    second = create_ai_client("openai", api_key="test-key", model_name="gpt-4o", cache=False)
+
+    assert isinstance(first, RetryingAIClient)
+    assert isinstance(first.client, RateLimitedAIClient)
+    assert first.client.limiter is second.client.limiter is get_rate_limiter("openai", "gpt-4o")
+    assert "openai/gpt-4o" in rate_limiter_stats()
@@ -0,0 +1,120 @@
+# tests/unit/test_response_cache.py
+import time
+import pytest
+
+from app.infrastructure.ai_client import create_ai_client
+from app.infrastructure.interfaces import AIResponse
+from app.infrastructure.response_cache import CachingAIClient, ResponseCache, response_key
+from tests.conftest import FakeAIClient
+
+def counting_client(temperature=0.0):
+    return FakeAIClient(
+        lambda prompt: f"Feature: {prompt}", metadata={"model": "fake-model", "attempts": 2},
+        max_tokens=500, temperature=temperature
+    )
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=3600, max_bytes=10_000)
+    yield cache
+    cache.close()
+
+@pytest.mark.asyncio
+async def test_repeated_deterministic_prompts_are_served_from_cache(cache):
+    client = counting_client()
+    caching = CachingAIClient(client, "openai", cache, mode="deterministic")
+
+    first = await caching.send_prompt("login test")
+    second = await caching.send_prompt("login test")
+
+    assert client.calls == 1
+    assert second.content == first.content
+    assert second.metadata == {"model": "fake-model", "cached": True}
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_key_covers_generation_parameters(cache):
+    client = counting_client()
+    caching = CachingAIClient(client, "openai", cache, mode="always")
+    await caching.send_prompt("login test")
+    client.max_tokens = 800
+    await caching.send_prompt("login test")
+    client.model_name = "other-model"
+    await caching.send_prompt("login test")
+
+    assert client.calls == 3
+    assert response_key("openai", "m", 0, 10, "p") != response_key("gemini", "m", 0, 10, "p")
+
+@pytest.mark.asyncio
+async def test_sampled_clients_bypass_cache_in_deterministic_mode(cache):
+    client = counting_client(temperature=0.7)
+    caching = CachingAIClient(client, "openai", cache, mode="deterministic")
+    await caching.send_prompt("login test")
+    await caching.send_prompt("login test")
+
+    assert client.calls == 2
+    assert cache.stats()["entries"] == 0
+
+def test_ttl_expires_entries(cache):
+    cache.put("key", AIResponse(content="old"))
+    cache.ttl_seconds = 0.01
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), max_bytes=250, evict_every=1)
+    try:
+        cache.put("a", AIResponse(content="a" * 100))
+        cache.put("b", AIResponse(content="b" * 100))
+        assert cache.get("a") is not None  # b is now the least recently used
+        cache.put("c", AIResponse(content="c" * 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a").content == "a" * 100
+        assert cache.get("c") is not None
+    finally:
+        cache.close()
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "responses.sqlite3")
+    first = ResponseCache(path)
+    first.put("key", AIResponse(content="Feature: Login", metadata={"model": "m"}))
+    first.close()
+
+    second = ResponseCache(path)
+    try:
+        assert second.get("key") == AIResponse(content="Feature: Login", metadata={"model": "m"})
+    finally:
+        second.close()
+
+def test_factory_caches_outermost():
+    client = create_ai_client("openai", api_key="test-key", temperature=0)
+    assert isinstance(client, CachingAIClient)
+    assert client.temperature == 0
+
+@pytest.mark.asyncio
+async def test_streamed_responses_are_cached_once_complete(cache):
+    client = FakeAIClient(chunks=["Feature: ", "login"])
+    caching = CachingAIClient(client, "openai", cache, mode="deterministic")
+
+    assert [text async for text in caching.stream_prompt("login")] == ["Feature: ", "login"]
+    assert [text async for text in caching.stream_prompt("login")] == ["Feature: login"]
+    assert (await caching.send_prompt("login")).content == "Feature: login"
+    assert client.calls == 1
+
+@pytest.mark.asyncio
+async def test_answers_the_validator_rejects_are_not_cached(cache):
+    async def is_feature(content):
+        return content.startswith("Feature:")
+    client = FakeAIClient("Sorry, try again")
+    caching = CachingAIClient(client, "openai", cache, mode="deterministic", validator=is_feature)
+
+    assert (await caching.send_prompt("login")).content == "Sorry, try again"
+    assert [text async for text in caching.stream_prompt("login")] == ["Sorry, try again"]
+    assert (await caching.send_prompt("login")).metadata.get("cached") is None
+    assert client.calls == 3 and cache.stats()["entries"] == 0
+
+    client.content = "Feature: login"
+    await caching.send_prompt("login")
+    assert (await caching.send_prompt("login")).metadata["cached"]
@@ -0,0 +1,112 @@
+# tests/unit/test_snapshot_archive.py
+import json
+import os
+import pytest
+
+from app.infrastructure.snapshot_archive import (
+    SnapshotArchive,
+    ArchiveSnapshotStorage,
+    ArchiveSnapshotHTMLStorage,
+    resolve_codec
+)
+from app.infrastructure.snapshot_storage import (
+    SnapshotWriter,
+    create_snapshot_storages,
+    set_snapshot_context,
+    reset_snapshot_context
+)
+from tests.conftest import make_page
+
+def blob_files(base_dir):
+    return [name for _, _, files in os.walk(os.path.join(base_dir, "blobs")) for name in files]
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = SnapshotArchive(str(tmp_path), max_bytes=0, max_age_seconds=None, codec="gzip", evict_every=0)
+    yield archive
+    archive.close()
+
+def test_round_trip_and_deduplication(archive, tmp_path):
+    page = make_page(200).encode("utf-8")
+    first = archive.put("run-1", 0, "html", page)
+    second = archive.put("run-2", 3, "html", page)
+
+    assert first == second
+    assert archive.get("run-2", 3, "html") == page
+    assert archive.get("run-2", 4, "html") is None
+    assert len(blob_files(tmp_path)) == 1
+
+    stats = archive.stats()
+    assert stats["entries"] == 2 and stats["blobs"] == 1
+    assert stats["logical_bytes"] == 2 * len(page)
+    # Repetitive markup compresses well, and the second copy is free.
+    assert stats["ratio"] > 10
+
+def test_age_eviction(archive, tmp_path):
+    archive.max_age_seconds = 60
+    archive.put("old", 0, "json", b'{"a": 1}')
+    archive.put("new", 0, "json", b'{"a": 2}')
+    archive._db.execute("UPDATE entries SET created = created - 3600 WHERE run_id = 'old'")
+
+    assert archive.evict() == 1
+    assert archive.runs() == ["new"]
+    assert len(blob_files(tmp_path)) == 1
+
+def test_size_eviction_drops_oldest_runs(archive):
+    for run in range(4):
+        for step in range(2):
+            archive.put(f"run-{run}", step, "json", os.urandom(1000))
+    archive.max_bytes = 4500
+
+    archive.evict()
+
+    assert archive.runs() == ["run-2", "run-3"]
+    assert archive.stats()["stored_bytes"] <= 4500
+
+def test_storages_archive_in_background(archive):
+    writer = SnapshotWriter(max_pending=8)
+    try:
+        storage = ArchiveSnapshotStorage(archive, writer)
+        html_storage = ArchiveSnapshotHTMLStorage(archive, writer)
+        snapshot = {"role": "WebArea", "name": "Shop", "children": [{"role": "button", "name": "Buy"}]}
+        token = set_snapshot_context("run-1", 1)
+        try:
+            storage.save_snapshot(snapshot)
+            html_storage.save_snapshot("<html><body>Shop</body></html>")
+        finally:
+            reset_snapshot_context(token)
+        assert writer.flush(5)
+    finally:
+        writer.close()
+
+    assert archive.load_snapshot("run-1", 1) == snapshot
+    assert archive.load_html("run-1", 1) == "<html><body>Shop</body></html>"
+    assert archive.steps("run-1") == [(1, "html"), (1, "json")]
+
+def test_unscoped_saves_of_each_process_are_kept(archive, monkeypatch):
+    writer = SnapshotWriter()
+    try:
+        for pid in (100, 200):
+            monkeypatch.setattr(os, "getpid", lambda pid=pid: pid)
+            ArchiveSnapshotStorage(archive, writer).save_snapshot({"pid": pid})
+        assert writer.flush(5)
+    finally:
+        writer.close()
+
+    runs = archive.runs()
+    assert len(runs) == 2 and all(run.startswith("unscoped-") for run in runs)
+    assert sorted(archive.load_snapshot(run, 0)["pid"] for run in runs) == [100, 200]
+
+def test_equal_snapshots_share_a_blob(archive):
+    storage = ArchiveSnapshotStorage(archive)
+    a = storage.encode({"name": "x", "role": "WebArea"})
+    b = storage.encode(json.loads('{"role": "WebArea", "name": "x"}'))
+    assert a == b
+
+def test_codec_and_backend_validation():
+    assert resolve_codec("gzip") == "gzip"
+    assert resolve_codec("auto") in ("gzip", "zstd")
+    with pytest.raises(ValueError):
+        resolve_codec("brotli")
+    with pytest.raises(ValueError):
+        create_snapshot_storages("s3")
@@ -0,0 +1,86 @@
+# tests/unit/test_snapshot_dataset.py
+import pytest
+
+from app.infrastructure.snapshot_dataset import (
+    SnapshotDataset,
+    SnapshotDatasetWriter,
+    DatasetSnapshotStorage,
+    DatasetSnapshotHTMLStorage
+)
+from app.infrastructure.snapshot_storage import SnapshotWriter, set_snapshot_context, reset_snapshot_context
+
+STEPS = [
+    ("https://shop.test/", "Given I am on the shop page"),
+    ("https://shop.test/", "When I click the Buy button"),
+    ("https://shop.test/cart", "Then I should see the cart"),
+]
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    writer = SnapshotDatasetWriter(str(tmp_path), segment_max_bytes=300)
+    for run_id in ("run-a", "run-b"):
+        for step, (url, gherkin) in enumerate(STEPS):
+            writer.append(run_id, step, "json", {"role": "WebArea", "name": f"{run_id} {step}"}, url, gherkin)
+            writer.append(run_id, step, "html", f"<html><body>{run_id} {step}</body></html>", url, gherkin)
+    return tmp_path
+
+def test_rolls_segments_and_reads_back_in_order(dataset_dir):
+    assert len(list(dataset_dir.glob("segment-*.jsonl"))) > 1
+    with SnapshotDataset(str(dataset_dir)) as dataset:
+        assert len(dataset) == 12
+        assert dataset.runs() == ["run-a", "run-b"]
+        names = [record["data"]["name"] for record in dataset.find(kind="json")]
+    assert names == [f"{run_id} {step}" for run_id in ("run-a", "run-b") for step in range(3)]
+
+def test_seek_by_run_step_url_and_gherkin(dataset_dir):
+    with SnapshotDataset(str(dataset_dir)) as dataset:
+        assert dataset.get("run-b", 1) == {"role": "WebArea", "name": "run-b 1"}
+        assert dataset.get("run-b", 1, "html") == "<html><body>run-b 1</body></html>"
+        assert dataset.get("run-c", 0) is None
+
+        cart = list(dataset.find(url="https://shop.test/cart", kind="json"))
+        assert [record["run_id"] for record in cart] == ["run-a", "run-b"]
+
+        clicks = list(dataset.select(gherkin="buy BUTTON", run_id="run-a"))
+        assert [(entry.step, entry.kind) for entry in clicks] == [(1, "json"), (1, "html")]
+
+def test_writer_resumes_and_reader_sees_growth(dataset_dir):
+    dataset = SnapshotDataset(str(dataset_dir))
+    last_segment = max(entry.segment for entry in dataset.entries)
+    assert dataset.read(dataset.entries[-1])["step"] == 2
+
+    SnapshotDatasetWriter(str(dataset_dir), segment_max_bytes=10_000).append("run-c", 0, "json", {"name": "late"})
+    dataset.close()
+
+    with SnapshotDataset(str(dataset_dir)) as reopened:
+        entry = reopened.entries[-1]
+        assert entry.segment == last_segment
+        assert reopened.read(entry)["data"] == {"name": "late"}
+
+def test_truncated_index_line_is_skipped(dataset_dir):
+    with open(dataset_dir / "index.jsonl", "a") as f:
+        f.write('{"run_id": "run-c", "st')
+    with SnapshotDataset(str(dataset_dir)) as dataset:
+        assert len(dataset) == 12
+
+def test_storages_record_context(tmp_path):
+    writer = SnapshotWriter(max_pending=8)
+    dataset_writer = SnapshotDatasetWriter(str(tmp_path))
+    try:
+        token = set_snapshot_context("run-1", 3, "https://shop.test/", "When I search for shoes")
+        try:
+            DatasetSnapshotStorage(dataset_writer, writer).save_snapshot({"role": "WebArea", "name": "Shop"})
+            DatasetSnapshotHTMLStorage(dataset_writer, writer).save_snapshot("<html></html>")
+        finally:
+            reset_snapshot_context(token)
+        assert writer.flush(5)
+    finally:
+        writer.close()
+
+    with SnapshotDataset(str(tmp_path)) as dataset:
+        record = next(dataset.find(gherkin="shoes", kind="json"))
+        assert record == {
+            "run_id": "run-1", "step": 3, "kind": "json", "url": "https://shop.test/",
+            "gherkin": "When I search for shoes", "data": {"role": "WebArea", "name": "Shop"},
+        }
+        assert dataset.get("run-1", 3, "html") == "<html></html>"
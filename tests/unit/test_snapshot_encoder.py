@@ -0,0 +1,62 @@
+# tests/unit/test_snapshot_encoder.py
+import json
+import pytest
+
+from app.infrastructure.snapshot_encoder import (
+    JSONSnapshotEncoder,
+    CompactJSONSnapshotEncoder,
+    OutlineSnapshotEncoder,
+    create_snapshot_encoder
+)
+from app.infrastructure.snapshot_pruner import SnapshotPruner
+
+SNAPSHOT = {
+    "role": "WebArea",
+    "name": "Login",
+    "children": [
+        {"role": "heading", "name": "Welcome back", "level": 1},
+        {"role": "form", "name": "", "attributes": {"id": "login-form", "class": "card  wide"}, "children": [
+            {"role": "textbox", "name": "Email", "attributes": {"data-testid": "email", "placeholder": "you@example.com"},
+             "focused": True},
+            {"role": "button", "name": "Sign in", "attributes": {"type": "submit", "aria-label": "Sign in now"}},
+            {"role": "link", "name": "Help", "attributes": {"href": "/help"}, "visibility": "hidden"},
+            {"role": "omitted", "name": "12 more", "count": 12},
+        ]},
+    ],
+}
+
+def test_json_encoders_round_trip():
+    pretty = JSONSnapshotEncoder().encode(SNAPSHOT)
+    compact = CompactJSONSnapshotEncoder().encode(SNAPSHOT)
+
+    assert pretty == json.dumps(SNAPSHOT, indent=2)
+    assert json.loads(compact) == SNAPSHOT
+    assert len(compact) < len(pretty)
+
+def test_outline_encoding():
+    assert OutlineSnapshotEncoder().encode(SNAPSHOT).split("\n") == [
+        'WebArea "Login"',
+        ' heading "Welcome back" level=1',
+        ' form #login-form .card.wide',
+        '  textbox "Email" testid=email ph=you@example.com [focused]',
+        '  button "Sign in" type=submit label="Sign in now"',
+        '  link "Help" href=/help [hidden]',
+        '  ... 12 more',
+    ]
+
+def test_outline_quotes_ambiguous_values():
+    node = {"role": "generic", "name": "", "attributes": {"id": "two words", "class": "a.b", "title": ""}}
+    assert OutlineSnapshotEncoder().encode(node) == 'generic id="two words" class=a.b title=""'
+
+def test_outline_is_smallest():
+    sizes = [len(create_snapshot_encoder(name).encode(SNAPSHOT)) for name in ("json", "json_compact", "outline")]
+    assert sizes == sorted(sizes, reverse=True)
+
+def test_pruner_budget_uses_encoder_size():
+    encoder = OutlineSnapshotEncoder()
+    result = SnapshotPruner(encoder=encoder, token_budget=10_000).prune(SNAPSHOT)
+    assert result.text == encoder.encode(SNAPSHOT)
+
+def test_factory_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        create_snapshot_encoder("yaml")
@@ -0,0 +1,89 @@
+# tests/unit/test_snapshot_pruner.py
+import copy
+import json
+import pytest
+
+from app.infrastructure.snapshot_pruner import SnapshotPruner
+from app.utils.config import SNAPSHOT_PRUNER_CONFIG
+
+def make_snapshot(items: int = 3, text: str = "Item") -> dict:
+    return {
+        "role": "WebArea",
+        "name": "Shop",
+        "children": [
+            {"role": "generic", "name": "", "attributes": {"class": "outer"}, "children": [
+                {"role": "generic", "name": "", "children": [
+                    {"role": "button", "name": "Login", "attributes": {"id": "login"}}
+                ]}
+            ]},
+            {"role": "navigation", "name": "", "visibility": "hidden", "children": [
+                {"role": "link", "name": "Hidden link", "visibility": "hidden"}
+            ]},
+            {"role": "list", "name": "", "attributes": {"id": "products"}, "children": [
+                {"role": "link", "name": f"{text} {index}"} for index in range(items)
+            ]},
+        ],
+    }
+
+def tokens(pruner: SnapshotPruner, snapshot: dict) -> int:
+    return pruner.estimate_tokens(pruner.serialize(snapshot))
+
+def test_snapshot_within_budget_is_untouched():
+    snapshot = make_snapshot()
+    result = SnapshotPruner(token_budget=10_000).prune(snapshot)
+
+    assert result.snapshot is snapshot
+    assert result.text == json.dumps(snapshot, indent=2)
+    assert result.steps == []
+    assert result.within_budget
+
+def test_steps_stop_once_budget_is_met():
+    snapshot = make_snapshot()
+    pruner = SnapshotPruner()
+    without_hidden = pruner._drop_hidden(snapshot)
+    result = SnapshotPruner(token_budget=tokens(pruner, without_hidden)).prune(snapshot)
+
+    assert [step.step for step in result.steps] == ["drop_hidden"]
+    assert "Hidden link" not in result.text
+    report = result.steps[0]
+    assert report.chars_after < report.chars_before
+    assert report.tokens_after == result.tokens
+
+def test_collapse_keeps_identifying_wrappers():
+    pruner = SnapshotPruner()
+    collapsed = pruner._collapse_wrappers(make_snapshot())
+
+    assert collapsed["children"][0] == {"role": "button", "name": "Login", "attributes": {"id": "login"}}
+    assert collapsed["children"][2]["attributes"] == {"id": "products"}
+
+def test_truncate_and_summarize_lists():
+    pruner = SnapshotPruner()
+    snapshot = make_snapshot(items=100, text="x" * 500)
+
+    truncated = pruner._truncate_text(snapshot, 50)
+    assert truncated["children"][2]["children"][0]["name"] == "x" * 50 + "..."
+
+    summarized = pruner._summarize_lists(snapshot, 10)
+    links = summarized["children"][2]["children"]
+    assert len(links) == 11
+    assert links[-1] == {"role": "omitted", "name": "90 more", "count": 90}
+    # Summarizing again merges with the existing marker.
+    links = pruner._summarize_lists(summarized, 5)["children"][2]["children"]
+    assert links[-1]["count"] == 95
+
+@pytest.mark.parametrize("budget", [2000, 400, 60])
+def test_large_snapshot_is_pruned_to_budget(budget):
+    snapshot = make_snapshot(items=2000, text="Product with a long description " * 20)
+    original = copy.deepcopy(snapshot)
+    result = SnapshotPruner(token_budget=budget).prune(snapshot)
+
+    assert snapshot == original
+    assert result.within_budget
+    assert result.original_tokens > budget
+    assert result.text == json.dumps(result.snapshot, indent=2)
+    assert result.steps[0].tokens_before == result.original_tokens
+    assert all(step.tokens_after <= step.tokens_before for step in result.steps)
+    assert result.to_dict()["steps"][-1]["tokens_after"] == result.tokens
+
+def test_budget_defaults_to_config():
+    assert SnapshotPruner().token_budget == SNAPSHOT_PRUNER_CONFIG["token_budget"]
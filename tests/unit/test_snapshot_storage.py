@@ -0,0 +1,153 @@
+# tests/unit/test_snapshot_storage.py
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+import pytest
+
+from app.infrastructure.snapshot_storage import (
+    SnapshotWriter,
+    AsyncSnapshotStorage,
+    AsyncSnapshotHTMLStorage,
+    set_snapshot_context,
+    reset_snapshot_context
+)
+from app.services.operator_runner import OperatorRunnerService
+
+@pytest.fixture
+def writer():
+    writer = SnapshotWriter(max_pending=8)
+    yield writer
+    writer.close()
+
+class GatedWriter(SnapshotWriter):
+    """Writer whose thread holds each job until `gate` is set, like a stalled disk."""
+    def __init__(self, **kwargs):
+        self.gate = threading.Event()
+        super().__init__(**kwargs)
+
+    def _write(self, path, content):
+        self.gate.wait(5)
+        super()._write(path, content)
+
+def wait_until_stalled(writer):
+    """Wait until the writer has taken a job and is stuck on the disk."""
+    with writer._condition:
+        writer._condition.wait_for(lambda: writer._in_flight == 1, 5)
+
+def test_writes_per_run_and_step(tmp_path, writer):
+    storage = AsyncSnapshotStorage(str(tmp_path), writer)
+    html_storage = AsyncSnapshotHTMLStorage(str(tmp_path), writer)
+
+    token = set_snapshot_context("run-1", 2)
+    try:
+        storage.save_snapshot({"role": "WebArea", "name": "Shop"})
+        html_storage.save_snapshot("<html></html>")
+    finally:
+        reset_snapshot_context(token)
+
+    assert writer.flush(5)
+    assert json.loads((tmp_path / "run-1" / "step_002.json").read_text()) == {"role": "WebArea", "name": "Shop"}
+    assert (tmp_path / "run-1" / "step_002.html").read_text() == "<html></html>"
+    assert writer.stats()["written"] == 2
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_do_not_overwrite(tmp_path, writer):
+    storage = AsyncSnapshotStorage(str(tmp_path), writer)
+
+    async def run_case(run_id):
+        token = set_snapshot_context(run_id)
+        try:
+            for step in range(3):
+                set_snapshot_context(run_id, step)
+                storage.save_snapshot({"run": run_id, "step": step})
+                await asyncio.sleep(0)
+        finally:
+            reset_snapshot_context(token)
+
+    await asyncio.gather(run_case("a"), run_case("b"))
+
+    assert writer.flush(5)
+    for run_id in ("a", "b"):
+        for step in range(3):
+            saved = json.loads((tmp_path / run_id / f"step_{step:03d}.json").read_text())
+            assert saved == {"run": run_id, "step": step}
+
+def test_unscoped_saves_get_distinct_paths(tmp_path, writer):
+    storage = AsyncSnapshotStorage(str(tmp_path), writer)
+    storage.save_snapshot({"n": 1})
+    storage.save_snapshot({"n": 2})
+    assert writer.flush(5)
+    assert len(list(tmp_path.rglob("*.json"))) == 2
+
+@pytest.mark.parametrize("policy,kept", [
+    ("drop_newest", ["0", "1", "2"]),
+    ("drop_oldest", ["0", "3", "4"]),
+])
+def test_overflow_policy_never_blocks(tmp_path, policy, kept):
+    writer = GatedWriter(max_pending=2, overflow_policy=policy)
+    try:
+        results = []
+        for i in range(5):
+            results.append(writer.submit(str(tmp_path / f"{i}.txt"), lambda i=i: str(i)))
+            if i == 0:
+                wait_until_stalled(writer)
+        writer.gate.set()
+        assert writer.flush(5)
+    finally:
+        writer.close()
+
+    assert sorted(p.stem for p in tmp_path.iterdir()) == kept
+    assert writer.stats()["dropped"] == 2
+    assert results.count(False) == (2 if policy == "drop_newest" else 0)
+
+def test_block_policy_waits_for_room(tmp_path):
+    writer = GatedWriter(max_pending=1, overflow_policy="block", block_timeout=0.05)
+    try:
+        writer.submit(str(tmp_path / "0.txt"), lambda: "0")
+        wait_until_stalled(writer)
+        assert writer.submit(str(tmp_path / "1.txt"), lambda: "1")
+        # Disk still stalled: the third write gives up after block_timeout.
+        assert not writer.submit(str(tmp_path / "2.txt"), lambda: "2")
+        writer.gate.set()
+        assert writer.submit(str(tmp_path / "3.txt"), lambda: "3")
+        assert writer.flush(5)
+    finally:
+        writer.close()
+    assert sorted(p.stem for p in tmp_path.iterdir()) == ["0", "1", "3"]
+
+@pytest.mark.asyncio
+async def test_runner_waits_for_blocked_writer_off_the_event_loop(tmp_path):
+    writer = GatedWriter(max_pending=1, overflow_policy="block", block_timeout=0.3)
+    with patch('app.services.operator_runner.create_nl_to_gherkin_generator'), \
+         patch('app.services.operator_runner.create_playwright_generator'):
+        runner = OperatorRunnerService(
+            snapshot_storage=AsyncSnapshotStorage(str(tmp_path), writer=writer),
+            snapshot_html_storage=AsyncSnapshotHTMLStorage(str(tmp_path), writer=writer)
+        )
+    try:
+        writer.submit(str(tmp_path / "stalled.txt"), lambda: "")
+        wait_until_stalled(writer)
+        writer.submit(str(tmp_path / "queued.txt"), lambda: "")
+
+        start = time.perf_counter()
+        save = asyncio.create_task(runner._save_snapshots({"role": "WebArea"}, "<html></html>"))
+        await asyncio.sleep(0.05)
+
+        assert time.perf_counter() - start < 0.25
+        assert not save.done()
+        await save
+    finally:
+        writer.gate.set()
+        writer.close()
+
+def test_failed_write_is_counted(tmp_path, writer):
+    (tmp_path / "file").write_text("")
+    writer.submit(str(tmp_path / "file" / "step.json"), lambda: "{}")
+    assert writer.flush(5)
+    assert writer.stats()["failed"] == 1
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        SnapshotWriter(overflow_policy="spill")
@@ -0,0 +1,111 @@
+# tests/unit/test_streaming_html_summarizer.py
+import io
+import pytest
+
+from app.infrastructure.html_summarizer import create_html_summarizer
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+from app.infrastructure.snapshot_encoder import (
+    CompactJSONSnapshotEncoder,
+    JSONSnapshotEncoder,
+    OutlineSnapshotEncoder
+)
+from app.infrastructure.snapshot_pruner import SnapshotPruner
+from app.utils.config import SNAPSHOT_PRUNER_CONFIG
+from app.infrastructure.streaming_html_summarizer import (
+    StreamingHTMLSummarizer,
+    build_tree,
+    drop_hidden_records
+)
+from tests.conftest import PARITY_CASES
+
+PAGE = """
+<html><head><title>Shop</title><style>a > b { color: red }</style></head>
+<body>
+  <div class="wrapper"><p>Intro <b>bold</b> text</p>
+    <ul>
+      <li><a href="/a" id="a">Alpha</a></li>
+      <li style="display: none"><a href="/b">Beta</a></li>
+    </ul>
+    <input type="hidden" value="secret"><input type="text" placeholder="Search" focus>
+    <script>if (a < b) { document.write("</p>"); }</script>
+  </div>
+</body></html>
+"""
+
+CASES = [case for case in PARITY_CASES if case.strip()] + [PAGE]
+
+@pytest.mark.parametrize("html", CASES)
+@pytest.mark.parametrize("chunk_size", [1, 13, 64 * 1024])
+def test_matches_lxml_summarizer(html, chunk_size):
+    expected = LxmlHTMLSummarizer().summarize_html(html)
+    assert StreamingHTMLSummarizer(chunk_size=chunk_size).summarize_html(html) == expected
+
+def test_reads_files_and_chunk_iterators():
+    expected = LxmlHTMLSummarizer().summarize_html(PAGE)
+    summarizer = StreamingHTMLSummarizer(chunk_size=16)
+
+    assert summarizer.summarize_html(io.StringIO(PAGE)) == expected
+    assert summarizer.summarize_html(PAGE[i:i + 5] for i in range(0, len(PAGE), 5)) == expected
+    assert summarizer.summarize_html(PAGE.encode("utf-8")) == expected
+
+def test_records_arrive_in_post_order():
+    records = list(StreamingHTMLSummarizer().iter_records(PAGE))
+
+    root = records[-1]
+    assert root.depth == 0
+    assert root.node["role"] == "WebArea" and root.node["name"] == "Shop"
+    assert all("children" not in record.node for record in records)
+    assert all(record.depth > 0 for record in records[:-1])
+    # The <p> is replaced by its text, so its <b> child is never emitted.
+    assert not any(record.node.get("name") == "bold" for record in records)
+
+def test_drop_hidden_records():
+    summarizer = StreamingHTMLSummarizer()
+    visible = build_tree(drop_hidden_records(summarizer.iter_records(PAGE)))
+
+    def names(node):
+        yield node["name"]
+        for child in node.get("children", []):
+            yield from names(child)
+
+    assert "Alpha" in names(visible)
+    assert "Beta" not in list(names(visible))
+    assert "Beta" in list(names(summarizer.summarize_html(PAGE)))
+
+def test_empty_input_and_factory():
+    assert StreamingHTMLSummarizer().summarize_html("") == {"role": "WebArea", "name": "", "visibility": "hidden"}
+    assert isinstance(create_html_summarizer("streaming"), StreamingHTMLSummarizer)
+
+LONG_LIST_PAGE = """
+<html><head><title>Catalog</title></head><body>
+  <ul id="products">""" + "".join(
+    f'<li><a href="/p/{i}">Product {i} {"with a very long description " * (i % 3)}</a>'
+    f'<ul>{"".join(f"<li>Tag {j}</li>" for j in range(i % 7))}</ul></li>'
+    for i in range(40)
+) + """</ul>
+  <nav style="display: none"><a href="/hidden">Hidden</a></nav>
+</body></html>
+"""
+
+@pytest.mark.parametrize("html", CASES + [LONG_LIST_PAGE])
+@pytest.mark.parametrize("encoder", [JSONSnapshotEncoder(), JSONSnapshotEncoder(indent=4),
+                                     CompactJSONSnapshotEncoder(), OutlineSnapshotEncoder()])
+def test_encoders_encode_records_like_the_tree(html, encoder):
+    summarizer = StreamingHTMLSummarizer()
+    expected = encoder.encode(build_tree(summarizer.iter_records(html)))
+    assert encoder.encode_records(summarizer.iter_records(html)) == expected
+
+@pytest.mark.parametrize("html", [PAGE, LONG_LIST_PAGE])
+@pytest.mark.parametrize("encoder", [JSONSnapshotEncoder(), OutlineSnapshotEncoder()])
+def test_prune_records_matches_the_single_pass_steps_on_the_tree(html, encoder):
+    config = dict(SNAPSHOT_PRUNER_CONFIG, max_text_length=20, max_attribute_length=8, max_list_items=3)
+    pruner = SnapshotPruner(config, token_budget=1, encoder=encoder)
+    summarizer = StreamingHTMLSummarizer()
+    tree = summarizer.summarize_html(html)
+    expected = pruner._summarize_lists(pruner._truncate_text(pruner._drop_hidden(tree), 20), 3)
+
+    result = pruner.prune_records(summarizer.iter_records(html))
+
+    assert result.text == encoder.encode(expected)
+    assert result.snapshot is None and result.original_tokens is None
+    assert not result.within_budget
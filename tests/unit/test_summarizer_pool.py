@@ -0,0 +1,98 @@
+# tests/unit/test_summarizer_pool.py
+import asyncio
+import time
+import pytest
+
+from app.infrastructure.html_summarizer import HTMLSummarizer
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+from app.infrastructure import summarizer_pool
+from app.infrastructure.summarizer_pool import (
+    OffloadedHTMLSummarizer,
+    create_offloaded_html_summarizer,
+    shutdown_summarizer_pools
+)
+from tests.conftest import make_page
+
+@pytest.fixture(autouse=True)
+def pools():
+    yield
+    shutdown_summarizer_pools()
+
+async def max_loop_lag(work) -> tuple:
+    """Run `work` while a ticker measures the longest gap between 10 ms ticks."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        result = await work
+    finally:
+        done.set()
+        await ticker_task
+    return result, max(lags)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("summarizer_type,executor_type,reference", [
+    ("beautifulsoup", "process", HTMLSummarizer),
+    ("lxml", "thread", LxmlHTMLSummarizer),
+])
+async def test_event_loop_stays_responsive(summarizer_type, executor_type, reference):
+    page = make_page(3000)
+    summarizer = OffloadedHTMLSummarizer(summarizer_type, executor_type, max_workers=2)
+    # Warm the pool so worker start-up is not part of the measurement.
+    await asyncio.gather(*(summarizer.summarize_html_async("<p>warm</p>") for _ in range(2)))
+
+    start = time.perf_counter()
+    expected = reference().summarize_html(page)
+    inline_time = time.perf_counter() - start
+
+    results, lag = await max_loop_lag(asyncio.gather(*(summarizer.summarize_html_async(page) for _ in range(4))))
+
+    assert all(result == expected for result in results)
+    # Summarized inline, the four pages would block the loop for 4 * inline_time in one go.
+    assert lag < 2 * inline_time
+
+@pytest.mark.asyncio
+async def test_pending_pages_are_bounded(monkeypatch):
+    running = []
+    peak = []
+
+    def slow_summarize(html_content):
+        running.append(html_content)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.pop()
+        return {"role": "WebArea", "name": html_content}
+
+    monkeypatch.setattr(summarizer_pool, "_summarize_in_thread", slow_summarize)
+    summarizer = OffloadedHTMLSummarizer("lxml", "thread", max_workers=3, max_pending=1)
+    results = await asyncio.gather(*(summarizer.summarize_html_async(str(i)) for i in range(3)))
+
+    assert [result["name"] for result in results] == ["0", "1", "2"]
+    assert max(peak) == 1
+
+def test_summarize_html_runs_inline():
+    summarizer = OffloadedHTMLSummarizer("lxml", "thread")
+    assert summarizer.summarize_html("<html><body><button>Go</button></body></html>")["children"] == [
+        {"role": "button", "name": "Go"}
+    ]
+
+@pytest.mark.parametrize("summarizer_type,executor_type", [
+    ("beautifulsoup", "process"),
+    ("lxml", "thread"),
+])
+def test_factory_picks_executor(summarizer_type, executor_type):
+    summarizer = create_offloaded_html_summarizer(summarizer_type, "auto")
+    assert isinstance(summarizer, OffloadedHTMLSummarizer)
+    assert summarizer.executor_type == executor_type
+
+def test_factory_without_pool():
+    assert isinstance(create_offloaded_html_summarizer("lxml", "none"), LxmlHTMLSummarizer)
+    with pytest.raises(ValueError):
+        OffloadedHTMLSummarizer("lxml", "fiber")
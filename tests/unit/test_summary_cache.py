@@ -0,0 +1,93 @@
+# tests/unit/test_summary_cache.py
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from app.infrastructure.browser_dom_summarizer import BrowserDOMSummarizer
+from app.infrastructure.interfaces import AsyncHTMLSummarizerInterface
+from app.infrastructure.lxml_html_summarizer import LxmlHTMLSummarizer
+from app.infrastructure.summary_cache import (
+    SummaryCache,
+    CachingHTMLSummarizer,
+    CachingPageSummarizer,
+    PAGE_FINGERPRINT_SCRIPT,
+    create_caching_summarizer
+)
+
+PAGE = "<html><head><title>Shop</title></head><body><button>Buy</button></body></html>"
+
+class AsyncStubSummarizer(LxmlHTMLSummarizer, AsyncHTMLSummarizerInterface):
+    async def summarize_html_async(self, html_content):
+        raise NotImplementedError
+
+def counting_summarizer():
+    inner = LxmlHTMLSummarizer()
+    inner.summarize_html = Mock(side_effect=inner.summarize_html)
+    return inner
+
+def test_repeated_html_is_summarized_once():
+    cache = SummaryCache(max_bytes=1024 * 1024)
+    inner = counting_summarizer()
+    summarizer = CachingHTMLSummarizer(inner, "lxml", cache)
+
+    first = summarizer.summarize_html(PAGE)
+    second = summarizer.summarize_html(PAGE)
+    summarizer.summarize_html(PAGE.replace("Buy", "Sell"))
+
+    assert first == second == LxmlHTMLSummarizer().summarize_html(PAGE)
+    assert inner.summarize_html.call_count == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+def test_namespaces_are_separate():
+    cache = SummaryCache(max_bytes=1024 * 1024)
+    CachingHTMLSummarizer(LxmlHTMLSummarizer(), "lxml", cache).summarize_html(PAGE)
+    CachingHTMLSummarizer(LxmlHTMLSummarizer(), "beautifulsoup", cache).summarize_html(PAGE)
+    assert cache.stats()["entries"] == 2 and cache.stats()["hits"] == 0
+
+def test_evicts_least_recently_used_by_size():
+    summary = {"role": "WebArea", "name": "x" * 80}
+    cache = SummaryCache(max_bytes=250)
+    cache.put("ns", "a", summary)
+    cache.put("ns", "b", summary)
+    assert cache.get("ns", "a") is summary
+    cache.put("ns", "c", summary)
+
+    assert cache.get("ns", "b") is None
+    assert cache.get("ns", "a") is summary and cache.get("ns", "c") is summary
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] <= 250
+
+def test_oversized_summary_is_not_cached():
+    cache = SummaryCache(max_bytes=10)
+    cache.put("ns", "a", {"name": "x" * 100})
+    assert cache.stats()["entries"] == 0
+
+@pytest.mark.asyncio
+async def test_async_path_uses_inner_async_summarizer():
+    inner = AsyncStubSummarizer()
+    inner.summarize_html_async = AsyncMock(return_value={"role": "WebArea", "name": ""})
+    summarizer = CachingHTMLSummarizer(inner, "lxml", SummaryCache())
+
+    await summarizer.summarize_html_async(PAGE)
+    await summarizer.summarize_html_async(PAGE)
+
+    inner.summarize_html_async.assert_awaited_once_with(PAGE)
+
+@pytest.mark.asyncio
+async def test_page_summaries_keyed_by_fingerprint():
+    inner = BrowserDOMSummarizer()
+    inner.summarize_page = AsyncMock(return_value={"role": "WebArea", "name": "Shop"})
+    browser_manager = Mock()
+    browser_manager.evaluate_script = AsyncMock(side_effect=["abc:10", "abc:10", "def:12"])
+    summarizer = create_caching_summarizer(inner, "browser", SummaryCache())
+
+    assert isinstance(summarizer, CachingPageSummarizer)
+    for _ in range(3):
+        await summarizer.summarize_page(browser_manager)
+
+    assert inner.summarize_page.await_count == 2
+    browser_manager.evaluate_script.assert_awaited_with(PAGE_FINGERPRINT_SCRIPT)
+
+def test_disabled_cache_returns_summarizer():
+    inner = LxmlHTMLSummarizer()
+    assert create_caching_summarizer(inner, "lxml", SummaryCache(max_bytes=0)) is inner
+    assert isinstance(create_caching_summarizer(inner, "lxml", SummaryCache()), CachingHTMLSummarizer)